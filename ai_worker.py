@@ -0,0 +1,97 @@
+import queue
+import threading
+from chess_model import AI
+from move import Move
+
+
+class AIWorker:
+    """Runs AI searches on a background thread and posts the chosen moves to a queue.
+
+    The search works on a copy of the game, so the caller keeps full use of its own
+    model while the AI thinks. One AI is kept for the worker's lifetime and moved to
+    each new copy, so its transposition table and history-heuristic scores carry over
+    between turns. Each result is posted as ''(key, move)'' where ''key'' is the
+    Zobrist key of the searched position, letting the caller drop a move that no
+    longer fits the board.
+
+    Attributes:
+        results (queue.Queue): Finished searches as ''(int, Move | None)'' pairs.
+    """
+    def __init__(self, notify=None, **ai_options) -> None:
+        """Initialize an idle worker.
+
+        Args:
+            notify (Callable[[], None] | None): Called on the worker thread after a result is
+                posted, so an event loop sleeping on its own queue can be woken. Defaults to ''None''.
+            **ai_options: Keyword arguments passed to ''AI'' when it is first needed, such as
+                ''time_limit'' or ''max_depth''.
+        """
+        self.results: queue.Queue = queue.Queue()
+        self._notify = notify
+        self._ai_options = ai_options
+        self._thread: threading.Thread | None = None
+        self._search = None
+        self._ai: AI | None = None
+
+    @property
+    def busy(self) -> bool:
+        """bool: Whether a search is still running."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, model) -> None:
+        """Start searching for the side to move, cancelling any search already running.
+
+        Args:
+            model (ChessModel): The game to find a move in. It is copied before the
+                thread starts and is never touched by the worker.
+        """
+        self.cancel()
+        position = model.copy()
+        if self._ai is None:
+            self._ai = AI(position, position.current_player, **self._ai_options)
+        else:
+            self._ai.bind(position, position.current_player)
+        ai = self._ai
+        self._search = ai._search
+        self._thread = threading.Thread(target=self._run, args=(ai, position.zobrist_key),
+                                        name='ai-search', daemon=True)
+        self._thread.start()
+
+    def _run(self, ai: AI, key: int) -> None:
+        """Search on the worker thread and post the result unless it was cancelled.
+
+        Args:
+            ai (AI): The AI bound to the worker's copy of the game.
+            key (int): Zobrist key of the position being searched.
+        """
+        move = ai.choose_move()
+        if not ai._search.stopped:
+            self.results.put((key, move))
+            if self._notify is not None:
+                self._notify()
+
+    def cancel(self) -> None:
+        """Stop the running search, wait for its thread and discard unread results."""
+        if self._search is not None:
+            self._search.stop()
+        if self._thread is not None:
+            self._thread.join()
+        self._thread = None
+        self._search = None
+        while True:
+            try:
+                self.results.get_nowait()
+            except queue.Empty:
+                break
+
+    def poll(self) -> tuple[int, Move | None] | None:
+        """Collect a finished search without blocking.
+
+        Returns:
+            tuple[int, Move | None] | None: The searched position's key and the chosen move,
+            or ''None'' if no result is waiting.
+        """
+        try:
+            return self.results.get_nowait()
+        except queue.Empty:
+            return None
@@ -0,0 +1,105 @@
+from player import Player
+
+#per-square movement tables, computed once at import time. every table is indexed
+#[row][col] with the same orientation as ChessModel.board: row 0 is black's back rank
+#and white pawns move towards lower rows.
+
+BOARD_SIZE = 8
+
+KNIGHT_OFFSETS = ((2, 1), (1, 2), (-1, 2), (-2, 1), (-2, -1), (-1, -2), (1, -2), (2, -1))
+KING_OFFSETS = ((1, 1), (1, 0), (1, -1), (0, 1), (0, -1), (-1, 1), (-1, 0), (-1, -1))
+DIAGONAL_DIRECTIONS = ((1, 1), (1, -1), (-1, 1), (-1, -1))
+STRAIGHT_DIRECTIONS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+
+
+def on_board(row: int, col: int) -> bool:
+    """Check whether coordinates fall within the board boundaries.
+
+    Args:
+        row (int): Row index to validate.
+        col (int): Column index to validate.
+
+    Returns:
+        bool: ''True'' if the coordinates are on the board, ''False'' otherwise.
+    """
+    return 0 <= row < BOARD_SIZE and 0 <= col < BOARD_SIZE
+
+
+def _offset_table(offsets) -> tuple:
+    """Build the squares reached from every square by fixed offsets.
+
+    Args:
+        offsets (tuple[tuple[int, int], ...]): Row and column offsets to apply.
+
+    Returns:
+        tuple: ''table[row][col]'' is a tuple of ''(row, col)'' destinations.
+    """
+    return tuple(
+        tuple(tuple((row + dr, col + dc) for dr, dc in offsets if on_board(row + dr, col + dc))
+              for col in range(BOARD_SIZE))
+        for row in range(BOARD_SIZE)
+    )
+
+
+def _ray_table(direction) -> tuple:
+    """Build the squares along a ray from every square, nearest first.
+
+    Args:
+        direction (tuple[int, int]): Row and column step of the ray.
+
+    Returns:
+        tuple: ''table[row][col]'' is a tuple of ''(row, col)'' squares, not including the origin.
+    """
+    dr, dc = direction
+    table = []
+    for row in range(BOARD_SIZE):
+        table_row = []
+        for col in range(BOARD_SIZE):
+            ray = []
+            r, c = row + dr, col + dc
+            while on_board(r, c):
+                ray.append((r, c))
+                r += dr
+                c += dc
+            table_row.append(tuple(ray))
+        table.append(tuple(table_row))
+    return tuple(table)
+
+
+def _to_masks(table) -> tuple[int, ...]:
+    """Convert a coordinate table into one bitboard per square index ''row * 8 + col''.
+
+    Args:
+        table (tuple): A ''[row][col]'' table of ''(row, col)'' squares.
+
+    Returns:
+        tuple[int, ...]: Bitboards of the listed squares for each of the 64 squares.
+    """
+    return tuple(sum(1 << (r * BOARD_SIZE + c) for r, c in squares)
+                 for table_row in table for squares in table_row)
+
+
+KNIGHT_TARGETS = _offset_table(KNIGHT_OFFSETS)
+KING_TARGETS = _offset_table(KING_OFFSETS)
+
+#squares a pawn of the given player standing on a square would attack
+PAWN_ATTACKS = {
+    Player.WHITE: _offset_table(((-1, -1), (-1, 1))),
+    Player.BLACK: _offset_table(((1, -1), (1, 1))),
+}
+
+RAYS = {direction: _ray_table(direction) for direction in DIAGONAL_DIRECTIONS + STRAIGHT_DIRECTIONS}
+
+#every ray from a square, grouped by the pieces that slide along them
+DIAGONAL_RAYS = tuple(tuple(tuple(RAYS[d][row][col] for d in DIAGONAL_DIRECTIONS) for col in range(BOARD_SIZE))
+                      for row in range(BOARD_SIZE))
+STRAIGHT_RAYS = tuple(tuple(tuple(RAYS[d][row][col] for d in STRAIGHT_DIRECTIONS) for col in range(BOARD_SIZE))
+                      for row in range(BOARD_SIZE))
+QUEEN_RAYS = tuple(tuple(DIAGONAL_RAYS[row][col] + STRAIGHT_RAYS[row][col] for col in range(BOARD_SIZE))
+                   for row in range(BOARD_SIZE))
+
+#the same tables as bitboards for the bitboard backend
+KNIGHT_MASKS = _to_masks(KNIGHT_TARGETS)
+KING_MASKS = _to_masks(KING_TARGETS)
+PAWN_ATTACK_MASKS = {player: _to_masks(table) for player, table in PAWN_ATTACKS.items()}
+RAY_MASKS = {direction: _to_masks(table) for direction, table in RAYS.items()}
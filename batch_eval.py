@@ -0,0 +1,287 @@
+import numpy as np
+from attack_tables import BOARD_SIZE, DIAGONAL_DIRECTIONS, KING_OFFSETS, KNIGHT_OFFSETS, STRAIGHT_DIRECTIONS
+from bishop import Bishop
+from chess_model import ChessModel, iter_fen_positions
+from chess_piece import BISHOP, KING, KNIGHT, PAWN, QUEEN, ROOK, ChessPiece
+from evaluation import ENDGAME_VALUES, MIDDLEGAME_VALUES, PHASE_TOTAL, PHASE_WEIGHTS, PIECE_SCORES, unpack_score
+from fen import format_placement
+from king import King
+from knight import Knight
+from pawn import Pawn
+from pgn import read_games
+from player import Player
+from queen import Queen
+from rook import Rook
+
+#positions are (N, 8, 8) int8 arrays laid out like ChessModel.board, each square holding the
+#piece's type code, positive for white and negative for black, and 0 when empty
+SIDES = (Player.WHITE, Player.BLACK)
+SIGNS = {Player.WHITE: 1, Player.BLACK: -1}
+
+#signed codes shifted by this offset index the lookup tables below
+_OFFSET = KING
+
+_PIECES = {SIGNS[player] * piece_class.code: piece_class(player)
+           for piece_class in (Pawn, Knight, Bishop, Rook, Queen, King) for player in SIDES}
+_CODES = {piece: code for code, piece in _PIECES.items()}
+
+
+def _tables() -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Spread the scalar evaluation tables into arrays indexed by signed code and square.
+
+    Returns:
+        tuple[np.ndarray, ...]: Middlegame and endgame square scores, each ''(13, 64)'', then
+        middlegame values, endgame values and phase weights, each ''(13,)''.
+    """
+    middlegame = np.zeros((2 * _OFFSET + 1, BOARD_SIZE * BOARD_SIZE), dtype=np.int32)
+    endgame = np.zeros_like(middlegame)
+    middlegame_values = np.zeros(2 * _OFFSET + 1, dtype=np.int32)
+    endgame_values = np.zeros_like(middlegame_values)
+    phases = np.zeros(2 * _OFFSET + 1, dtype=np.int32)
+    for piece, scores in PIECE_SCORES.items():
+        index = _CODES[piece] + _OFFSET
+        middlegame[index], endgame[index] = zip(*(unpack_score(score) for score in scores))
+        middlegame_values[index] = SIGNS[piece.player] * MIDDLEGAME_VALUES[piece.code]
+        endgame_values[index] = SIGNS[piece.player] * ENDGAME_VALUES[piece.code]
+        phases[index] = PHASE_WEIGHTS[piece.code]
+    return middlegame, endgame, middlegame_values, endgame_values, phases
+
+
+_MIDDLEGAME, _ENDGAME, _MIDDLEGAME_VALUES, _ENDGAME_VALUES, _PHASES = _tables()
+_SQUARES = np.arange(BOARD_SIZE * BOARD_SIZE)
+
+
+def encode_board(board: list[list[ChessPiece | None]]) -> np.ndarray:
+    """Pack one board into an array.
+
+    Args:
+        board (list[list[ChessPiece | None]]): Rows of pieces from black's back rank down.
+
+    Returns:
+        np.ndarray: The ''(8, 8)'' int8 position.
+
+    Raises:
+        KeyError: If the board holds a piece outside the standard set.
+    """
+    return np.array([[0 if piece is None else _CODES[piece] for piece in row] for row in board], dtype=np.int8)
+
+
+def decode_board(position: np.ndarray) -> list[list[ChessPiece | None]]:
+    """Unpack one position into a board of flyweight pieces.
+
+    Args:
+        position (np.ndarray): An ''(8, 8)'' position.
+
+    Returns:
+        list[list[ChessPiece | None]]: Rows of pieces from black's back rank down.
+    """
+    return [[_PIECES.get(code) for code in row] for row in position.tolist()]
+
+
+def encode_models(models) -> tuple[np.ndarray, np.ndarray]:
+    """Pack the positions of many models.
+
+    Args:
+        models (Iterable[ChessModel]): The games, read one at a time, so a generator that
+            reuses one model works.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The ''(N, 8, 8)'' positions and an ''(N,)'' int8 array
+        holding ''1'' where white is to move and ''-1'' where black is.
+    """
+    rows = []
+    to_move = []
+    for model in models:
+        rows.append([0 if piece is None else _CODES[piece] for row in model.board for piece in row])
+        to_move.append(SIGNS[model.current_player])
+    positions = np.array(rows, dtype=np.int8).reshape(-1, BOARD_SIZE, BOARD_SIZE)
+    return positions, np.array(to_move, dtype=np.int8)
+
+
+def encode_fens(lines) -> tuple[np.ndarray, np.ndarray]:
+    """Pack a file of FEN records.
+
+    Args:
+        lines (Iterable[str]): FEN records, one per line, such as an open file.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The positions and the side to move of each.
+
+    Raises:
+        ValueError: If a record is not valid FEN.
+    """
+    return encode_models(iter_fen_positions(lines))
+
+
+def _replay(games):
+    """Step through every position of each game, from its start to its final move.
+
+    Args:
+        games (Iterable[tuple[dict[str, str], ChessModel]]): Games from ''read_games''.
+
+    Yields:
+        ChessModel: The game's model at each position in turn.
+    """
+    for _, model in games:
+        history = model.move_history
+        for _ in history:
+            model._unmake_move()
+        yield model
+        for move in history:
+            model._make_move(move)
+            yield model
+
+
+def encode_games(lines, skip_invalid: bool = True) -> tuple[np.ndarray, np.ndarray]:
+    """Pack every position of every game in a PGN file.
+
+    Args:
+        lines (Iterable[str]): Lines of PGN text, such as an open file.
+        skip_invalid (bool): Skip games the engine cannot replay instead of raising.
+            Defaults to True.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The positions and the side to move of each.
+
+    Raises:
+        ValueError: If a game cannot be replayed and ''skip_invalid'' is not set.
+    """
+    return encode_models(_replay(read_games(lines, skip_invalid=skip_invalid)))
+
+
+def to_model(position: np.ndarray, player: Player = Player.WHITE, model: ChessModel | None = None) -> ChessModel:
+    """Load a position into a model.
+
+    Args:
+        position (np.ndarray): An ''(8, 8)'' position.
+        player (Player): The side to move. Defaults to white.
+        model (ChessModel | None): Model to load into, reusing its board, or ''None'' to
+            create one without an AI.
+
+    Returns:
+        ChessModel: The model holding the position with no moves to undo.
+    """
+    if model is None:
+        model = ChessModel(ai_player=None)
+    side = 'w' if player == Player.WHITE else 'b'
+    model.load_fen(f'{format_placement(decode_board(position))} {side} - - 0 1')
+    return model
+
+
+def game_phase(positions: np.ndarray) -> np.ndarray:
+    """Measure how much material is left in each position.
+
+    Args:
+        positions (np.ndarray): ''(N, 8, 8)'' positions.
+
+    Returns:
+        np.ndarray: ''(N,)'' phases, ''PHASE_TOTAL'' with every piece on the board and ''0''
+        with only kings and pawns, capped at ''PHASE_TOTAL''.
+    """
+    index = positions.reshape(len(positions), -1).astype(np.intp) + _OFFSET
+    return np.minimum(_PHASES[index].sum(axis=1), PHASE_TOTAL)
+
+
+def _taper(middlegame: np.ndarray, endgame: np.ndarray, phase: np.ndarray) -> np.ndarray:
+    """Blend middlegame and endgame scores by phase, rounding as the scalar evaluation does.
+
+    Args:
+        middlegame (np.ndarray): ''(N,)'' middlegame scores.
+        endgame (np.ndarray): ''(N,)'' endgame scores.
+        phase (np.ndarray): ''(N,)'' phases.
+
+    Returns:
+        np.ndarray: ''(N,)'' tapered scores.
+    """
+    return (middlegame * phase + endgame * (PHASE_TOTAL - phase)) // PHASE_TOTAL
+
+
+def material(positions: np.ndarray) -> np.ndarray:
+    """Count the material balance of every position.
+
+    Args:
+        positions (np.ndarray): ''(N, 8, 8)'' positions.
+
+    Returns:
+        np.ndarray: ''(N,)'' tapered piece values in centipawns, positive when white is ahead.
+    """
+    index = positions.reshape(len(positions), -1).astype(np.intp) + _OFFSET
+    return _taper(_MIDDLEGAME_VALUES[index].sum(axis=1), _ENDGAME_VALUES[index].sum(axis=1),
+                  game_phase(positions))
+
+
+def evaluate(positions: np.ndarray, to_move: np.ndarray | None = None) -> np.ndarray:
+    """Score every position by material and piece-square tables.
+
+    The scores match ''ChessModel.evaluate'' and ''evaluation.evaluate_board'' exactly.
+
+    Args:
+        positions (np.ndarray): ''(N, 8, 8)'' positions.
+        to_move (np.ndarray | None): ''(N,)'' array of ''1'' or ''-1'' to score each position for
+            its side to move, or ''None'' to score for white. Defaults to ''None''.
+
+    Returns:
+        np.ndarray: ''(N,)'' scores in centipawns.
+    """
+    index = positions.reshape(len(positions), -1).astype(np.intp) + _OFFSET
+    scores = _taper(_MIDDLEGAME[index, _SQUARES].sum(axis=1), _ENDGAME[index, _SQUARES].sum(axis=1),
+                    game_phase(positions))
+    return scores if to_move is None else scores * to_move
+
+
+def _shift(planes: np.ndarray, dr: int, dc: int) -> np.ndarray:
+    """Move every square of a stack of boards by an offset, dropping what leaves the board.
+
+    Args:
+        planes (np.ndarray): ''(N, 8, 8)'' boards.
+        dr (int): Rows to move by.
+        dc (int): Columns to move by.
+
+    Returns:
+        np.ndarray: The shifted boards, empty where nothing moved in.
+    """
+    shifted = np.zeros_like(planes)
+    shifted[:, max(dr, 0):BOARD_SIZE + min(dr, 0), max(dc, 0):BOARD_SIZE + min(dc, 0)] = \
+        planes[:, max(-dr, 0):BOARD_SIZE + min(-dr, 0), max(-dc, 0):BOARD_SIZE + min(-dc, 0)]
+    return shifted
+
+
+def attack_counts(positions: np.ndarray) -> np.ndarray:
+    """Count the pieces of each side attacking every square of every position.
+
+    Squares are attacked whether or not a piece stands on them, so the counts include
+    defenders. Sliding pieces stop at the first occupied square on each ray.
+
+    Args:
+        positions (np.ndarray): ''(N, 8, 8)'' positions.
+
+    Returns:
+        np.ndarray: ''(N, 2, 8, 8)'' uint8 attacker counts, white's at index 0 and black's at
+        index 1 of the second axis. ''counts > 0'' gives the attacked squares.
+    """
+    counts = np.zeros((len(positions), len(SIDES), BOARD_SIZE, BOARD_SIZE), dtype=np.uint8)
+    empty = positions == 0
+    for side, player in enumerate(SIDES):
+        own = positions * np.int8(SIGNS[player])
+        target = counts[:, side]
+        #pawns capture towards the opponent's back rank
+        forward = -SIGNS[player]
+        for offsets, code in (((forward, -1), (forward, 1)), PAWN), (KNIGHT_OFFSETS, KNIGHT), (KING_OFFSETS, KING):
+            pieces = own == code
+            if pieces.any():
+                for dr, dc in offsets:
+                    target += _shift(pieces, dr, dc)
+        for directions, codes in ((DIAGONAL_DIRECTIONS, (BISHOP, QUEEN)), (STRAIGHT_DIRECTIONS, (ROOK, QUEEN))):
+            sliders = np.isin(own, codes)
+            if not sliders.any():
+                continue
+            for dr, dc in directions:
+                #walk every ray one step at a time, continuing only through empty squares
+                frontier = sliders
+                for _ in range(BOARD_SIZE - 1):
+                    frontier = _shift(frontier, dr, dc)
+                    target += frontier
+                    frontier &= empty
+                    if not frontier.any():
+                        break
+    return counts
@@ -0,0 +1,275 @@
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from bitboard_model import BitboardChessModel
+from chess_model import AI, ChessModel
+from fen import START_FEN
+from move import Move
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'perft_baseline.json')
+
+#perft positions as (FEN, expected leaf counts by depth). the engine has no castling or en passant,
+#so only positions and depths where those rules never come up are used. deeper counts for
+#'pinned-rook' drop the two en passant captures.
+PERFT_POSITIONS = {
+    'start': (START_FEN, (20, 400, 8902, 197281)),
+    'pinned-rook': ('8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1', (14, 191, 2810)),
+    'promotions': ('n1n5/PPPk4/8/8/8/8/4Kppp/5N1N b - - 0 1', (24, 496, 9483, 182838)),
+}
+
+#positions reached from the opening by fixed move sequences, as (row, col, row, col) tuples
+SEARCH_POSITIONS = {
+    'start': (),
+    'open-center': ((6, 4, 4, 4), (1, 4, 3, 4), (7, 6, 5, 5), (0, 1, 2, 2), (7, 5, 4, 2), (0, 6, 2, 5)),
+    'queens-out': ((6, 3, 4, 3), (1, 3, 3, 3), (7, 2, 4, 5), (0, 6, 2, 5), (6, 4, 5, 4), (1, 4, 2, 4),
+                   (7, 3, 5, 5), (0, 5, 4, 1)),
+}
+
+
+def play(moves) -> ChessModel:
+    """Set up a model by playing a sequence of moves from the opening.
+
+    Args:
+        moves (tuple[tuple[int, int, int, int], ...]): Moves as from and to coordinates.
+
+    Returns:
+        ChessModel: A model without an AI opponent, positioned after the moves.
+
+    Raises:
+        ValueError: If one of the moves is illegal.
+    """
+    model = ChessModel()
+    model.AI_player = None
+    for coords in moves:
+        if not model.move(Move(*coords)):
+            raise ValueError(f'illegal move in benchmark position: {coords}')
+    return model
+
+
+def bench_perft(max_depth: int, model_class: type[ChessModel] = ChessModel) -> list[dict]:
+    """Run perft on every benchmark position up to a depth.
+
+    Args:
+        max_depth (int): Deepest perft to run; positions stop at their last known count.
+        model_class (type[ChessModel]): Board backend to run on. Defaults to ''ChessModel''.
+
+    Returns:
+        list[dict]: One row per position and depth with nodes, expected nodes and speed.
+    """
+    results = []
+    for name, (fen, expected) in PERFT_POSITIONS.items():
+        model = model_class.from_fen(fen)
+        for depth in range(1, min(max_depth, len(expected)) + 1):
+            start = time.perf_counter()
+            nodes = model.perft(depth)
+            elapsed = time.perf_counter() - start
+            results.append({'position': name, 'depth': depth, 'nodes': nodes,
+                            'expected': expected[depth - 1], 'seconds': elapsed,
+                            'nps': nodes / elapsed if elapsed > 0 else 0.0})
+    return results
+
+
+def bench_backends(max_depth: int) -> list[dict]:
+    """Time perft and check detection on the list board and the bitboard backend.
+
+    Args:
+        max_depth (int): Deepest perft to run; positions stop at their last known count.
+
+    Returns:
+        list[dict]: One row per position with the nodes per second and check tests per
+        second of each backend.
+    """
+    results = []
+    for name, (fen, expected) in PERFT_POSITIONS.items():
+        depth = min(max_depth, len(expected))
+        row = {'position': name, 'depth': depth}
+        for label, model_class in (('list', ChessModel), ('bitboard', BitboardChessModel)):
+            model = model_class.from_fen(fen)
+            start = time.perf_counter()
+            nodes = model.perft(depth)
+            elapsed = time.perf_counter() - start
+            row[f'{label}_nps'] = nodes / elapsed if elapsed > 0 else 0.0
+            #the uncached test, since in_check memoises its answer for the side to move
+            start = time.perf_counter()
+            for _ in range(10000):
+                model._king_attacked(model.current_player)
+            elapsed = time.perf_counter() - start
+            row[f'{label}_checks'] = 10000 / elapsed if elapsed > 0 else 0.0
+        results.append(row)
+    return results
+
+
+def bench_search(depth: int) -> list[dict]:
+    """Search each benchmark position to a fixed depth with and without move ordering.
+
+    Args:
+        depth (int): Depth in plies to search.
+
+    Returns:
+        list[dict]: One row per position and ordering setting with nodes and seconds.
+    """
+    results = []
+    for name, moves in SEARCH_POSITIONS.items():
+        for ordering in (False, True):
+            model = play(moves)
+            ai = AI(model, model.current_player, max_depth=depth, time_limit=None)
+            ai._search.ordering = ordering
+            start = time.perf_counter()
+            ai.choose_move()
+            elapsed = time.perf_counter() - start
+            results.append({'position': name, 'ordering': ordering, 'depth': ai._search.depth,
+                            'nodes': ai._search.nodes, 'seconds': elapsed})
+    return results
+
+
+def random_fens(count: int, max_plies: int = 80, seed: int = 0) -> list[str]:
+    """Collect every position of random games played from the opening, as an archive would hold.
+
+    Args:
+        count (int): Number of positions.
+        max_plies (int): Length after which a game is abandoned for a new one. Defaults to 80.
+        seed (int): Seed for the random moves. Defaults to 0.
+
+    Returns:
+        list[str]: The positions as FEN records.
+    """
+    rng = random.Random(seed)
+    model = ChessModel(ai_player=None)
+    fens = []
+    while len(fens) < count:
+        moves = model._legal_moves()
+        if not moves or len(model.move_history) == max_plies:
+            model.load_fen(START_FEN)
+            continue
+        model._make_move(rng.choice(moves))
+        fens.append(model.to_fen())
+    return fens
+
+
+def bench_batch(count: int, seed: int = 0) -> dict:
+    """Score positions and map their attacked squares one model at a time and as one batch.
+
+    The scalar path loads each position into a bitboard model, reads its evaluation and
+    asks whether each side attacks each square. The batch path does the same work with
+    array operations over every position at once.
+
+    Args:
+        count (int): Number of random positions.
+        seed (int): Seed for the random positions. Defaults to 0.
+
+    Returns:
+        dict: Positions, seconds for the scalar path, for packing the batch and for scoring
+        it, and the speedup of the batch path over the scalar one.
+    """
+    #numpy is only needed for this benchmark
+    import batch_eval
+
+    fens = random_fens(count, seed=seed)
+    model = BitboardChessModel()
+    start = time.perf_counter()
+    for fen in fens:
+        model.load_fen(fen)
+        model.evaluate()
+        for by in batch_eval.SIDES:
+            for sq in range(64):
+                model.is_attacked(sq, by)
+    scalar = time.perf_counter() - start
+
+    start = time.perf_counter()
+    positions, to_move = batch_eval.encode_fens(fens)
+    packing = time.perf_counter() - start
+    start = time.perf_counter()
+    batch_eval.evaluate(positions, to_move)
+    batch_eval.attack_counts(positions)
+    batch = time.perf_counter() - start
+    return {'positions': count, 'scalar_seconds': scalar, 'packing_seconds': packing,
+            'batch_seconds': batch, 'speedup': scalar / batch if batch > 0 else 0.0}
+
+
+def main(argv=None) -> int:
+    """Run the benchmarks from the command line.
+
+    Args:
+        argv (list[str] | None): Command line arguments, defaults to ''sys.argv''.
+
+    Returns:
+        int: Process exit status, non-zero if a perft count was wrong.
+    """
+    parser = argparse.ArgumentParser(description='Chess engine benchmarks.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    search = commands.add_parser('search', help='compare search node counts with and without move ordering')
+    search.add_argument('--depth', type=int, default=3, help='search depth in plies')
+    perft = commands.add_parser('perft', help='check move generation counts and report nodes per second')
+    perft.add_argument('--depth', type=int, default=3, help='deepest perft to run')
+    perft.add_argument('--save-baseline', action='store_true', help=f'record the results in {BASELINE_PATH}')
+    divide = commands.add_parser('divide', help='break a perft count down by root move')
+    divide.add_argument('position', choices=sorted(PERFT_POSITIONS), help='position to expand')
+    divide.add_argument('depth', type=int, help='perft depth')
+    backends = commands.add_parser('backends', help='compare the list board with the bitboard backend')
+    backends.add_argument('--depth', type=int, default=3, help='deepest perft to run')
+    batch = commands.add_parser('batch', help='compare scalar and vectorised scoring of many positions')
+    batch.add_argument('--positions', type=int, default=2000, help='number of random positions')
+    args = parser.parse_args(argv)
+
+    if args.command == 'search':
+        print(f'{"position":<14}{"ordering":>10}{"nodes":>10}{"seconds":>10}')
+        for row in bench_search(args.depth):
+            ordering = 'on' if row['ordering'] else 'off'
+            print(f'{row["position"]:<14}{ordering:>10}{row["nodes"]:>10}{row["seconds"]:>10.2f}')
+        return 0
+
+    if args.command == 'backends':
+        print(f'{"position":<14}{"depth":>6}{"list nps":>12}{"bitboard nps":>14}{"list checks/s":>15}'
+              f'{"bitboard checks/s":>19}')
+        for row in bench_backends(args.depth):
+            print(f'{row["position"]:<14}{row["depth"]:>6}{row["list_nps"]:>12.0f}{row["bitboard_nps"]:>14.0f}'
+                  f'{row["list_checks"]:>15.0f}{row["bitboard_checks"]:>19.0f}')
+        return 0
+
+    if args.command == 'batch':
+        row = bench_batch(args.positions)
+        print(f'{row["positions"]} positions')
+        print(f'scalar    {row["scalar_seconds"]:>8.3f}s')
+        print(f'packing   {row["packing_seconds"]:>8.3f}s')
+        print(f'batch     {row["batch_seconds"]:>8.3f}s  ({row["speedup"]:.1f}x)')
+        return 0
+
+    if args.command == 'divide':
+        fen, _ = PERFT_POSITIONS[args.position]
+        counts = ChessModel.from_fen(fen).divide(args.depth)
+        for move, nodes in counts:
+            print(f'{move}: {nodes}')
+        print(f'total: {sum(nodes for _, nodes in counts)}')
+        return 0
+
+    baseline = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH) as f:
+            baseline = json.load(f)
+
+    status = 0
+    print(f'{"position":<14}{"depth":>6}{"nodes":>10}{"expected":>10}{"nps":>10}{"baseline":>10}')
+    results = bench_perft(args.depth)
+    for row in results:
+        previous = baseline.get(row['position'], {}).get(str(row['depth']))
+        change = f'{row["nps"] / previous:>9.2f}x' if previous else f'{"-":>10}'
+        mark = '' if row['nodes'] == row['expected'] else '  WRONG'
+        if mark:
+            status = 1
+        print(f'{row["position"]:<14}{row["depth"]:>6}{row["nodes"]:>10}{row["expected"]:>10}'
+              f'{row["nps"]:>10.0f}{change}{mark}')
+
+    if args.save_baseline:
+        for row in results:
+            baseline.setdefault(row['position'], {})[str(row['depth'])] = round(row['nps'])
+        with open(BASELINE_PATH, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write('\n')
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
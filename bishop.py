@@ -1,4 +1,5 @@
-from chess_piece import ChessPiece
+from attack_tables import DIAGONAL_RAYS
+from chess_piece import BISHOP, ChessPiece
 from move import Move
 
 class Bishop(ChessPiece):
@@ -7,13 +8,8 @@ class Bishop(ChessPiece):
     Attributes:
         player (Player): Owner of the Bishop.
     """
-    def __init__(self, player):
-        """Initialize a bishop chess piece.
-
-        Args:
-            player (Player): Owner of the bishop.
-        """
-        super().__init__(player)
+    __slots__ = ()
+    code = BISHOP
 
     def __str__(self) -> str:
         """Return the readable name of the bishop.
@@ -65,3 +61,16 @@ class Bishop(ChessPiece):
 
         #our destination is either empty or enemy :(
         return True
+
+    def possible_moves(self, row: int, col: int, board: list[list[ChessPiece]]):
+        """Yield the pseudo-legal moves for a bishop standing on the given square.
+
+        Args:
+            row (int): Row index the bishop stands on.
+            col (int): Column index the bishop stands on.
+            board (list[list[ChessPiece]]): The current board state.
+
+        Yields:
+            Move: Each diagonal move up to and including the first blocker.
+        """
+        yield from self._slide_moves(row, col, board, DIAGONAL_RAYS[row][col])
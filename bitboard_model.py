@@ -0,0 +1,361 @@
+from attack_tables import (BOARD_SIZE, DIAGONAL_DIRECTIONS, KING_MASKS, KNIGHT_MASKS, PAWN_ATTACK_MASKS, RAY_MASKS,
+                           STRAIGHT_DIRECTIONS)
+from bishop import Bishop
+from chess_model import ChessModel
+from chess_piece import TYPE_CODES, ChessPiece
+from king import King
+from knight import Knight
+from move import PROMOTION_TYPES, Move
+from pawn import Pawn
+from player import Player
+from queen import Queen
+from rook import Rook
+
+#bitboard slots, one per piece type for each player, at the piece's type code less one
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING = range(6)
+
+#each player's pieces in slot order, so a position's bitboards are found without hashing players
+SIDE_PIECES = {player: tuple(piece_class(player) for piece_class in (Pawn, Knight, Bishop, Rook, Queen, King))
+               for player in Player}
+_WHITE_PIECES = SIDE_PIECES[Player.WHITE]
+_BLACK_PIECES = SIDE_PIECES[Player.BLACK]
+
+#looking a member up on the enum class is slow, so hot paths compare against these
+_WHITE = Player.WHITE
+_BLACK = Player.BLACK
+_WHITE_PAWN_MASKS = PAWN_ATTACK_MASKS[Player.WHITE]
+_BLACK_PAWN_MASKS = PAWN_ATTACK_MASKS[Player.BLACK]
+
+#ray directions split by whether stepping along them raises or lowers the square index
+POSITIVE_DIAGONALS = ((1, 1), (1, -1))
+NEGATIVE_DIAGONALS = ((-1, 1), (-1, -1))
+POSITIVE_STRAIGHTS = ((1, 0), (0, 1))
+NEGATIVE_STRAIGHTS = ((-1, 0), (0, -1))
+
+#every square on a bishop or rook line from a square, whatever stands in between
+DIAGONAL_LINES = tuple(sum(RAY_MASKS[d][sq] for d in DIAGONAL_DIRECTIONS) for sq in range(BOARD_SIZE * BOARD_SIZE))
+STRAIGHT_LINES = tuple(sum(RAY_MASKS[d][sq] for d in STRAIGHT_DIRECTIONS) for sq in range(BOARD_SIZE * BOARD_SIZE))
+
+
+def _between_masks() -> tuple[tuple[int, ...], ...]:
+    """Build the squares strictly between every pair of squares sharing a line.
+
+    Returns:
+        tuple[tuple[int, ...], ...]: Bitboards indexed by both squares, ''0'' for squares
+        that are adjacent or share no line.
+    """
+    between = [[0] * (BOARD_SIZE * BOARD_SIZE) for _ in range(BOARD_SIZE * BOARD_SIZE)]
+    for rays in RAY_MASKS.values():
+        for sq, ray in enumerate(rays):
+            squares = ray
+            while squares:
+                target = (squares & -squares).bit_length() - 1
+                squares &= squares - 1
+                #the ray beyond the target and the target itself are not between
+                between[sq][target] = ray ^ rays[target] ^ 1 << target
+    return tuple(tuple(row) for row in between)
+
+
+BETWEEN = _between_masks()
+
+
+def square(row: int, col: int) -> int:
+    """Convert board coordinates into a bit index.
+
+    Args:
+        row (int): Row index of the square.
+        col (int): Column index of the square.
+
+    Returns:
+        int: The index of the square's bit, ''row * 8 + col''.
+    """
+    return row * BOARD_SIZE + col
+
+
+def slider_attacks(sq: int, occupied: int, positive, negative) -> int:
+    """Compute the squares a sliding piece attacks from a square.
+
+    Each ray is cut at its first occupied square, which is itself attacked.
+
+    Args:
+        sq (int): Bit index of the sliding piece.
+        occupied (int): Bitboard of every occupied square.
+        positive (tuple[tuple[int, int], ...]): Directions that raise the square index.
+        negative (tuple[tuple[int, int], ...]): Directions that lower the square index.
+
+    Returns:
+        int: Bitboard of attacked squares.
+    """
+    attacks = 0
+    for direction in positive:
+        rays = RAY_MASKS[direction]
+        ray = rays[sq]
+        blockers = ray & occupied
+        if blockers:
+            #nearest blocker is the lowest set bit
+            ray ^= rays[(blockers & -blockers).bit_length() - 1]
+        attacks |= ray
+    for direction in negative:
+        rays = RAY_MASKS[direction]
+        ray = rays[sq]
+        blockers = ray & occupied
+        if blockers:
+            #nearest blocker is the highest set bit
+            ray ^= rays[blockers.bit_length() - 1]
+        attacks |= ray
+    return attacks
+
+
+class BitboardChessModel(ChessModel):
+    """Chess model that keeps a 64-bit integer bitboard for every piece.
+
+    The list based ''board'' is still kept so pieces, the GUI and the AI can read it,
+    but legal moves are generated and attacks tested with shifts and masks instead of
+    walking squares and playing every candidate move. Boards holding pieces outside
+    the standard set fall back to the list based generator.
+
+    Attributes:
+        _pieces (dict[ChessPiece, int]): Bitboard of the squares each flyweight piece stands on.
+        _others (int): Squares holding pieces outside the standard set.
+        _occupied (int): Every occupied square.
+    """
+    def __init__(self, ai_player: Player | None = Player.BLACK):
+        """Initialize empty bitboards, then set up the standard position.
+
+        Args:
+            ai_player (Player | None): Side the built-in AI opponent plays, or ''None'' for a
+                game between two outside players. Defaults to black.
+        """
+        self._pieces = {piece: 0 for pieces in SIDE_PIECES.values() for piece in pieces}
+        self._others = 0
+        self._occupied = 0
+        super().__init__(ai_player)
+
+    def _place(self, row: int, col: int, piece: ChessPiece | None) -> None:
+        """Write a square of the board and update the bitboards to match.
+
+        Args:
+            row (int): Target row index.
+            col (int): Target column index.
+            piece (ChessPiece | None): The piece to place or ''None'' to clear the square.
+        """
+        bit = 1 << (row * BOARD_SIZE + col)
+        old = self.board[row][col]
+        #pieces are flyweights, so they key the bitboards without hashing their player
+        if old is not None:
+            self._occupied &= ~bit
+            if old.code:
+                self._pieces[old] ^= bit
+            else:
+                self._others &= ~bit
+        if piece is not None:
+            self._occupied |= bit
+            if piece.code:
+                self._pieces[piece] |= bit
+            else:
+                self._others |= bit
+        super()._place(row, col, piece)
+
+    def copy(self) -> 'BitboardChessModel':
+        """Make an independent copy of the game, bitboards included.
+
+        Returns:
+            BitboardChessModel: A model with the same position and move history.
+        """
+        clone = super().copy()
+        clone._pieces = dict(self._pieces)
+        return clone
+
+    def bitboard(self, p: Player, piece_type: str) -> int:
+        """Return the bitboard of one player's pieces of a given type.
+
+        Args:
+            p (Player): Owner of the pieces.
+            piece_type (str): Display type of the pieces, such as ''"Knight"''.
+
+        Returns:
+            int: Bitboard with a bit set for every matching piece.
+
+        Raises:
+            KeyError: If ''piece_type'' is not a standard chess piece.
+        """
+        return self._pieces[SIDE_PIECES[p][TYPE_CODES[piece_type] - 1]]
+
+    def occupancy(self, p: Player) -> int:
+        """Return every square a player's standard pieces stand on.
+
+        Args:
+            p (Player): Owner of the pieces.
+
+        Returns:
+            int: Bitboard of the player's pieces.
+        """
+        pieces = self._pieces
+        occupied = 0
+        for piece in SIDE_PIECES[p]:
+            occupied |= pieces[piece]
+        return occupied
+
+    def _attacked(self, sq: int, by: Player, occupied: int, removed: int = 0) -> bool:
+        """Test whether a player attacks a square, given which squares are occupied.
+
+        Args:
+            sq (int): Bit index of the square to test.
+            by (Player): The attacking player.
+            occupied (int): Bitboard of every occupied square.
+            removed (int): Squares whose pieces are ignored as attackers, such as a piece
+                about to be captured. Defaults to ''0''.
+
+        Returns:
+            bool: ''True'' if one of ''by'''s pieces attacks the square, ''False'' otherwise.
+        """
+        bitboards = self._pieces
+        #players hash slowly, so sides are told apart by identity
+        if by is _WHITE:
+            pieces, pawn_masks = _WHITE_PIECES, _BLACK_PAWN_MASKS
+        else:
+            pieces, pawn_masks = _BLACK_PIECES, _WHITE_PAWN_MASKS
+        keep = ~removed
+        if KNIGHT_MASKS[sq] & bitboards[pieces[KNIGHT]] & keep:
+            return True
+        if KING_MASKS[sq] & bitboards[pieces[KING]] & keep:
+            return True
+        #a pawn attacks the square if the defender's pawn would attack the pawn from it
+        if pawn_masks[sq] & bitboards[pieces[PAWN]] & keep:
+            return True
+
+        #a slider on one of the square's lines attacks it when nothing stands in between
+        queens = bitboards[pieces[QUEEN]]
+        sliders = ((bitboards[pieces[BISHOP]] | queens) & DIAGONAL_LINES[sq]
+                   | (bitboards[pieces[ROOK]] | queens) & STRAIGHT_LINES[sq]) & keep
+        between = BETWEEN[sq]
+        while sliders:
+            slider = sliders & -sliders
+            if not between[slider.bit_length() - 1] & occupied:
+                return True
+            sliders ^= slider
+        return False
+
+    def is_attacked(self, sq: int, by: Player) -> bool:
+        """Determine whether a square is attacked by any piece of a player.
+
+        Args:
+            sq (int): Bit index of the square to test.
+            by (Player): The attacking player.
+
+        Returns:
+            bool: ''True'' if one of ''by'''s pieces attacks the square, ''False'' otherwise.
+        """
+        return self._attacked(sq, by, self._occupied)
+
+    def _king_attacked(self, p: Player) -> bool:
+        """Test whether any enemy piece attacks a player's king using the bitboards.
+
+        Args:
+            p (Player): Owner of the king.
+
+        Returns:
+            bool: ''True'' if the king is attacked, ''False'' if it is safe or missing.
+        """
+        if self._others:
+            return super()._king_attacked(p)
+        if p is _WHITE:
+            king, enemy = self._pieces[_WHITE_PIECES[KING]], _BLACK
+        else:
+            king, enemy = self._pieces[_BLACK_PIECES[KING]], _WHITE
+        if not king:
+            return False
+        return self._attacked((king & -king).bit_length() - 1, enemy, self._occupied)
+
+    def _iter_legal_moves(self, captures_only: bool = False):
+        """Generate the legal moves for the current player from the bitboards.
+
+        Moves are checked for legality on the bitboards rather than by playing them. A
+        piece off every line through its own king can only expose the king when it is
+        already in check, so most moves need no test at all.
+
+        Args:
+            captures_only (bool): Only generate moves that capture a piece. Defaults to False.
+
+        Yields:
+            Move: Each move that obeys the piece rules and does not leave the mover in check.
+        """
+        if self._others:
+            yield from super()._iter_legal_moves(captures_only)
+            return
+
+        us = self.current_player
+        them = _BLACK if us is _WHITE else _WHITE
+        bitboards = self._pieces
+        mine = SIDE_PIECES[us]
+        own = self.occupancy(us)
+        occupied = self._occupied
+        enemy = occupied ^ own
+        targets = enemy if captures_only else ~own
+
+        king = bitboards[mine[KING]]
+        king_sq = (king & -king).bit_length() - 1 if king else None
+        checked = king_sq is not None and self._attacked(king_sq, them, occupied)
+        lines = DIAGONAL_LINES[king_sq] | STRAIGHT_LINES[king_sq] if king_sq is not None else 0
+        attacked = self._attacked
+
+        def legal(from_sq: int, to_sq: int) -> bool:
+            from_bit = 1 << from_sq
+            to_bit = 1 << to_sq
+            if from_sq == king_sq:
+                return not attacked(to_sq, them, occupied ^ from_bit | to_bit, to_bit)
+            if king_sq is None or not checked and not from_bit & lines:
+                return True
+            return not attacked(king_sq, them, occupied ^ from_bit | to_bit, to_bit)
+
+        for slot in (KNIGHT, BISHOP, ROOK, QUEEN, KING):
+            pieces = bitboards[mine[slot]]
+            while pieces:
+                from_sq = (pieces & -pieces).bit_length() - 1
+                pieces &= pieces - 1
+                if slot == KNIGHT:
+                    reach = KNIGHT_MASKS[from_sq]
+                elif slot == KING:
+                    reach = KING_MASKS[from_sq]
+                elif slot == BISHOP:
+                    reach = slider_attacks(from_sq, occupied, POSITIVE_DIAGONALS, NEGATIVE_DIAGONALS)
+                elif slot == ROOK:
+                    reach = slider_attacks(from_sq, occupied, POSITIVE_STRAIGHTS, NEGATIVE_STRAIGHTS)
+                else:
+                    reach = slider_attacks(from_sq, occupied, POSITIVE_DIAGONALS + POSITIVE_STRAIGHTS,
+                                           NEGATIVE_DIAGONALS + NEGATIVE_STRAIGHTS)
+                reach &= targets
+                while reach:
+                    to_sq = (reach & -reach).bit_length() - 1
+                    reach &= reach - 1
+                    if legal(from_sq, to_sq):
+                        yield Move(from_sq >> 3, from_sq & 7, to_sq >> 3, to_sq & 7)
+
+        #white pawns move towards row 0 and black pawns towards the last row
+        if us is _WHITE:
+            step, start_row, last_row, captures = -BOARD_SIZE, 6, 0, _WHITE_PAWN_MASKS
+        else:
+            step, start_row, last_row, captures = BOARD_SIZE, 1, 7, _BLACK_PAWN_MASKS
+        pawns = bitboards[mine[PAWN]]
+        while pawns:
+            from_sq = (pawns & -pawns).bit_length() - 1
+            pawns &= pawns - 1
+            ahead = from_sq + step
+            if not 0 <= ahead < BOARD_SIZE * BOARD_SIZE:
+                continue
+            destinations = captures[from_sq] & enemy
+            if not captures_only and not occupied >> ahead & 1:
+                destinations |= 1 << ahead
+                if from_sq >> 3 == start_row and not occupied >> ahead + step & 1:
+                    destinations |= 1 << ahead + step
+            while destinations:
+                to_sq = (destinations & -destinations).bit_length() - 1
+                destinations &= destinations - 1
+                if not legal(from_sq, to_sq):
+                    continue
+                fr, fc, tr, tc = from_sq >> 3, from_sq & 7, to_sq >> 3, to_sq & 7
+                if tr == last_row:
+                    for promotion in PROMOTION_TYPES:
+                        yield Move(fr, fc, tr, tc, promotion)
+                else:
+                    yield Move(fr, fc, tr, tc)
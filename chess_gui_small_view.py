@@ -1,12 +1,26 @@
-import copy
+import os
 from enum import Enum
 import pygame as pg
-import pygame_gui as gui
+from ai_worker import AIWorker
 from chess_model import ChessModel, MoveValidity, UndoException
 from move import Move
 from player import Player
 
 IMAGE_SIZE = 52  #small format - images 52 X 52
+BOARD_PIXELS = IMAGE_SIZE * 8
+
+SPRITE_SHEET = './images/pieces.png'
+SHEET_CELL = 105 #size of one piece on the sprite sheet
+ATLAS_PATH = f'./images/pieces_{IMAGE_SIZE}.png' #sprite sheet already scaled to IMAGE_SIZE
+
+FRAME_RATE = 30
+ACTIVE_SECONDS = 0.5 #keep drawing this long after the last event so UI transitions can finish
+AI_MOVE_EVENT = pg.event.custom_type() #posted by the AI worker when a move is ready
+
+BACKGROUND_COLOR = (80, 67, 57)
+LIGHT_SQUARE = (255, 255, 255)
+DARK_SQUARE = (127, 127, 127)
+SELECTED_COLOR = (255, 0, 0)
 
 
 class SpriteType(Enum):
@@ -23,9 +37,19 @@ class SpriteColor(Enum):
 
 class GUI:
     first = True
+    white_sprites = None
+    black_sprites = None
+
     def __init__(self) -> None:
+        #pygame_gui is only needed once a window opens, so it stays off the import path
+        import pygame_gui as gui
+        self._gui = gui
         pg.init()
-        self.__model = ChessModel()
+        #the worker plays the AI's side so the window never blocks, so the model needs no AI of its own
+        self._ai_side = Player.BLACK
+        self.__model = ChessModel(ai_player=None)
+        self._ai_worker = AIWorker(notify=lambda: pg.event.post(pg.event.Event(AI_MOVE_EVENT)))
+        self._ai_enabled = True
         self._screen = pg.display.set_mode((800, 600))
         pg.display.set_caption("Laker Chess")
         self._ui_manager = gui.UIManager((800, 600))
@@ -45,32 +69,69 @@ class GUI:
         self._AI_toggle = gui.elements.UIButton(relative_rect=pg.Rect((310, 425), (110, 180)),
                                                     text='AI Toggle',
                                                     manager=self._ui_manager)
+        self._ui_elements = [self._side_box, self._undo_button, self._restart_button,
+                             self._castle_button, self._AI_toggle]
         self._piece_selected = False
         self._first_selected = (0, 0)
         self._second_selected = (0, 0)
+        self._board_surface = self.__render_board_surface()
+        self._drawn = [[None] * 8 for _ in range(8)] #(piece, selected) last drawn on each square
     
     @classmethod
-    def load_images(cls):
-        def load_image(color, ptype):
-            SS = pg.image.load('./images/pieces.png')
-            a = 105
-            surf = pg.Surface((a,a), pg.SRCALPHA)
-            surf.blit(SS, (0, 0), pg.rect.Rect(a*ptype.value, color.value*a, a, a))
-            surf_scaled = pg.transform.scale(surf, (IMAGE_SIZE, IMAGE_SIZE))
-            return surf_scaled
+    def load_images(cls, persist_atlas: bool = False):
+        #the sprites are sliced once from a single scaled atlas and shared by every window
+        if cls.white_sprites is not None:
+            return
+        atlas = cls.load_atlas(persist_atlas)
         cls.white_sprites = {}
         cls.black_sprites = {}
         for st in SpriteType:
-            cls.white_sprites[st.name] = load_image(SpriteColor.WHITE, st)
-            cls.black_sprites[st.name] = load_image(SpriteColor.BLACK, st)
+            for color, sprites in ((SpriteColor.WHITE, cls.white_sprites), (SpriteColor.BLACK, cls.black_sprites)):
+                rect = pg.rect.Rect(IMAGE_SIZE * st.value, IMAGE_SIZE * color.value, IMAGE_SIZE, IMAGE_SIZE)
+                sprites[st.name] = atlas.subsurface(rect)
 
-    def run_game(self) -> None:
+    @staticmethod
+    def load_atlas(persist_atlas: bool = False) -> pg.Surface:
+        #reuse a saved atlas unless the sprite sheet is newer
+        if os.path.exists(ATLAS_PATH) and os.path.getmtime(ATLAS_PATH) >= os.path.getmtime(SPRITE_SHEET):
+            return pg.image.load(ATLAS_PATH)
+
+        #decode the sheet once and scale all twelve pieces in one pass
+        sheet = pg.image.load(SPRITE_SHEET)
+        pieces = sheet.subsurface(pg.rect.Rect(0, 0, SHEET_CELL * len(SpriteType), SHEET_CELL * len(SpriteColor)))
+        atlas = pg.transform.scale(pieces, (IMAGE_SIZE * len(SpriteType), IMAGE_SIZE * len(SpriteColor)))
+        if persist_atlas:
+            try:
+                pg.image.save(atlas, ATLAS_PATH)
+            except (OSError, pg.error):
+                pass #a read-only install simply scales the sheet on every start
+        return atlas
+
+    def run_game(self, event_driven: bool = True) -> None:
         running = True
         time_delta = 0
+        idle_time = 0
         clock = pg.time.Clock()
+        self._screen.fill(BACKGROUND_COLOR)
+        pg.display.flip()
         while running:
-            for event in pg.event.get():
+            #once the UI has settled, sleep until input or the AI worker wakes us
+            if event_driven and idle_time >= ACTIVE_SECONDS:
+                events = [pg.event.wait()]
+                events.extend(pg.event.get())
+            else:
+                events = pg.event.get()
+            idle_time = 0 if events else idle_time + time_delta
+            exposed = False
+
+            for event in events:
+                self._ui_manager.process_events(event)
+                if event.type in (pg.WINDOWEXPOSED, pg.VIDEOEXPOSE):
+                    self._screen.fill(BACKGROUND_COLOR)
+                    self._drawn = [[None] * 8 for _ in range(8)]
+                    exposed = True
                 if event.type == pg.QUIT:
+                    self._ai_worker.cancel()
                     running = False
                 if event.type == pg.MOUSEBUTTONDOWN:
                     x, y = pg.mouse.get_pos()
@@ -90,49 +151,96 @@ class GUI:
                             self._piece_selected = piece
                     elif self._piece_selected:
                         mv = Move(self._first_selected[0], self._first_selected[1], y, x)
-                        if self.__model.is_valid_move(mv):
-                            target = self.__model.piece_at(y, x)
-                            self.__model.move(mv)
-                            if target is not None:
-                                msg = f'Moved {self._piece_selected} and captured {target}'
+                        result = self.__model.submit_move(mv)
+                        if result.legal:
+                            if result.captured is not None:
+                                msg = f'Moved {self._piece_selected} and captured {result.captured}'
                             else:
                                 msg = f'Moved {self._piece_selected}'
                             self._side_box.append_html_text(msg + '<br />')
+                            self.__report_status(result)
+                            self.__start_ai_if_needed()
                         
                         else:
-                            self._side_box.append_html_text(f'{self.__model.message_code}<br />') # CHANGED THIS LINE self.__model.messageCode to message_code
-                        incheck = self.__model.in_check(self.__model.current_player)
-                        complete = self.__model.is_complete()
-
-                        if incheck:
-                            player_color = self.__model.current_player.name
-                            if complete:
-                                self._side_box.append_html_text(f'{player_color} is in CHECKMATE!<br />GAME OVER!')
-                            else:
-                                self._side_box.append_html_text(f'{player_color} is in CHECK!<br />')
+                            self._side_box.append_html_text(f'{result.validity}<br />')
                         
                         self._piece_selected = False
                     else:
                         self._piece_selected = False
-                if event.type == gui.UI_BUTTON_PRESSED:
+                if event.type == self._gui.UI_BUTTON_PRESSED:
                     if event.ui_element == self._restart_button:
-                        self.__model = ChessModel()
+                        self._ai_worker.cancel()
+                        self.__model = ChessModel(ai_player=None)
                         self._side_box.set_text("<b>Laker Chess</b><br /><br />White moves first.<br /></n>Restarting game...<br />") # reset text box
                     if event.ui_element == self._undo_button:
+                        self._ai_worker.cancel()
                         try:
                             self.__model.undo()
                             self._side_box.append_html_text('Undoing move.<br />')
                         except UndoException as e:
                             self._side_box.append_html_text(f'{e}<br />')
-            self._ui_manager.process_events(event)
+                    if event.ui_element == self._AI_toggle:
+                        self._ai_worker.cancel()
+                        self._ai_enabled = not self._ai_enabled
+                        state = 'on' if self._ai_enabled else 'off'
+                        self._side_box.append_html_text(f'AI opponent turned {state}.<br />')
+                        self.__start_ai_if_needed()
+
+            self.__play_ai_result()
 
-            self._screen.fill((80, 67, 57)) #FOR BACKGROUND COLOR
-            self.__draw_board__()
-            self._ui_manager.draw_ui(self._screen)
+            #only squares that changed are redrawn, and the UI only while events or its transitions
+            #can still change it, repainting over its own background
+            dirty = self.__draw_board__()
+            ui_rects = []
+            if exposed or idle_time < ACTIVE_SECONDS:
+                ui_rects = [element.rect for element in self._ui_elements]
+                for rect in ui_rects:
+                    self._screen.fill(BACKGROUND_COLOR, rect)
+                self._ui_manager.draw_ui(self._screen)
             self._ui_manager.update(time_delta)
 
-            pg.display.flip()
-            time_delta = clock.tick(30) / 1000.0
+            if exposed:
+                pg.display.flip()
+            elif dirty or ui_rects:
+                pg.display.update(dirty + ui_rects)
+            #the delta includes any time spent waiting, so pygame_gui's timers stay accurate
+            time_delta = clock.tick(FRAME_RATE) / 1000.0
+
+    def __report_status(self, result) -> None:
+        player_color = self.__model.current_player.name
+        if result.checkmate:
+            self._side_box.append_html_text(f'{player_color} is in CHECKMATE!<br />GAME OVER!')
+        elif result.check:
+            self._side_box.append_html_text(f'{player_color} is in CHECK!<br />')
+        elif result.stalemate:
+            self._side_box.append_html_text(f'{player_color} is in STALEMATE!<br />GAME OVER!')
+
+    def __start_ai_if_needed(self) -> None:
+        #search in the background whenever it is the AI's turn and the game goes on
+        model = self.__model
+        if not self._ai_enabled or model.current_player != self._ai_side:
+            return
+        if not self._ai_worker.busy and not model.is_complete():
+            self._ai_worker.start(model)
+
+    def __play_ai_result(self) -> None:
+        result = self._ai_worker.poll()
+        if result is None:
+            return
+        key, mv = result
+        #a result for a position that has since changed is stale
+        if mv is None or key != self.__model.zobrist_key:
+            return
+        piece = self.__model.piece_at(mv.from_row, mv.from_col)
+        result = self.__model.submit_move(mv)
+        if not result.legal:
+            return
+        if result.captured is not None:
+            msg = f'AI moved {piece} and captured {result.captured}'
+        else:
+            msg = f'AI moved {piece}'
+        self._side_box.append_html_text(msg + '<br />')
+        self.__report_status(result)
 
     def __get_coords__(self, y, x):
         grid_x = x // IMAGE_SIZE
@@ -140,37 +248,44 @@ class GUI:
         return grid_y, grid_x
 
     def __is_on_board(self, x: int, y: int) -> bool:
-        board_size = IMAGE_SIZE * 8
-        return 0 <= x < board_size and 0 <= y < board_size
-
-    def __draw_board__(self) -> None:
-        count = 0
-        color = (255, 255, 255)
-        for x in range(0, 8):
-            for y in range(0, 8):
-                if count % 2 == 0:
-                    color = (255, 255, 255)
-                else:
-                    color = (127, 127, 127)
-                count = count + 1
-                pg.draw.rect(self._screen, color, pg.rect.Rect(x * IMAGE_SIZE, y * IMAGE_SIZE, IMAGE_SIZE, IMAGE_SIZE))
-                if self._piece_selected and (y, x) == self._first_selected:
-                    pg.draw.rect(self._screen, (255, 0, 0), pg.rect.Rect(x * IMAGE_SIZE, y * IMAGE_SIZE, IMAGE_SIZE, IMAGE_SIZE), 2)
+        return 0 <= x < BOARD_PIXELS and 0 <= y < BOARD_PIXELS
+
+    def __render_board_surface(self) -> pg.Surface:
+        surface = pg.Surface((BOARD_PIXELS, BOARD_PIXELS))
+        for y in range(8):
+            for x in range(8):
+                color = LIGHT_SQUARE if (x + y) % 2 == 0 else DARK_SQUARE
+                surface.fill(color, pg.rect.Rect(x * IMAGE_SIZE, y * IMAGE_SIZE, IMAGE_SIZE, IMAGE_SIZE))
+        return surface
+
+    def __draw_board__(self) -> list[pg.Rect]:
+        #pieces are shared flyweights, so identity tells whether a square changed
+        dirty = []
+        for y in range(8):
+            for x in range(8):
                 draw_piece = self.__model.piece_at(y, x)
+                selected = bool(self._piece_selected) and (y, x) == self._first_selected
+                state = (draw_piece, selected)
+                if self._drawn[y][x] == state:
+                    continue
+                self._drawn[y][x] = state
+                rect = pg.rect.Rect(x * IMAGE_SIZE, y * IMAGE_SIZE, IMAGE_SIZE, IMAGE_SIZE)
+                self._screen.blit(self._board_surface, rect, rect)
+                if selected:
+                    pg.draw.rect(self._screen, SELECTED_COLOR, rect, 2)
                 if draw_piece is not None:
                     if draw_piece.player == Player.BLACK:
                         d = GUI.black_sprites
                     else:
                         d = GUI.white_sprites
-                    self._screen.blit(copy.deepcopy(d[draw_piece.type()]), (x * IMAGE_SIZE, y * IMAGE_SIZE))
-            count = count + 1
-        pg.draw.line(self._screen, (0, 0, 0), (0, 840), (840, 840))
-        pg.draw.line(self._screen, (0, 0, 0), (840, 840), (840, 0))
+                    self._screen.blit(d[draw_piece.type()], rect)
+                dirty.append(rect)
         GUI.first = False
+        return dirty
 
 
 def main():
-    GUI.load_images()
+    GUI.load_images(persist_atlas=True)
     g = GUI()
     g.run_game()
 
@@ -1,13 +1,21 @@
+import copy
+from array import array
 from enum import Enum
+from attack_tables import DIAGONAL_RAYS, KING_TARGETS, KNIGHT_TARGETS, PAWN_ATTACKS, STRAIGHT_RAYS
 from player import Player
-from chess_piece import ChessPiece
+from chess_piece import BISHOP, KING, KNIGHT, PAWN, QUEEN, ROOK, ChessPiece
+from evaluation import PHASE_WEIGHTS, piece_score, taper
+from fen import format_placement, parse_fen
 from pawn import Pawn
 from rook import Rook
 from knight import Knight
 from bishop import Bishop
 from queen import Queen
 from king import King
-from move import Move
+from move import Move, pack_moves
+from search import Search
+from transposition import TranspositionTable
+from zobrist import SIDE_KEY, piece_key
 
 class AI:
     """A default constructor for the opposing AI opponent.
@@ -16,8 +24,28 @@ class AI:
         _player (Player): What player the AI opponent will be assigned to
         _model: Copy of the game state for the AI to read from
         _piece_values (dict): Serialized structure storing the piece type with the associated value.
+        _search (Search): Alpha-beta search that picks the AI's moves within its budget.
+        book (OpeningBook | None): Opening book consulted before searching.
+        tablebase (Tablebase | None): Endgame tables played from instead of searching.
     """
-    def __init__(self, model, player: Player) -> None:
+    def __init__(self, model, player: Player, max_depth: int = 32,
+                 time_limit: float | None = 1.0, max_nodes: int | None = None,
+                 tt_size_mb: float = 8, book=None, tablebase=None) -> None:
+        """Initialize an AI opponent.
+
+        Args:
+            model (ChessModel): The game the AI plays in.
+            player (Player): The side the AI plays.
+            max_depth (int): Deepest search iteration to attempt. Defaults to 32.
+            time_limit (float | None): Seconds the AI may think per move. Defaults to 1.0.
+            max_nodes (int | None): Positions the AI may visit per move. Defaults to ''None''.
+            tt_size_mb (float): Memory budget of the transposition table in megabytes, or 0 to
+                search without one. Defaults to 8.
+            book (OpeningBook | None): Opening book to play from while the position is in it.
+                Defaults to ''None''.
+            tablebase (Tablebase | None): Endgame tables to play from when the material on the
+                board matches one of them. Defaults to ''None''.
+        """
         self._player = player
         self._model = model
         self._piece_values = {
@@ -28,63 +56,47 @@ class AI:
             'Queen': 9,
             'King': 1000,
         }
+        tt = TranspositionTable(tt_size_mb) if tt_size_mb > 0 else None
+        self._search = Search(model, self._piece_values, max_depth, time_limit, max_nodes, tt=tt)
+        self.book = book
+        self.tablebase = tablebase
+
+    def bind(self, model, player: Player) -> None:
+        """Move the AI to another game, keeping what its search has learned.
+
+        Args:
+            model (ChessModel): The game the AI plays in from now on.
+            player (Player): The side the AI plays.
+        """
+        self._model = model
+        self._player = player
+        self._search.bind(model)
 
     def choose_move(self):
-        """Have the AI choose and return the first legal move present
+        """Have the AI play from its opening book or endgame tables, or else search within its
+        time and node budget.
 
         Returns:
-            first_legal (Move): The first legal move present that would pass our base checks.
+            Move: The book or tablebase move, or the best move of the deepest completed search,
+            or ''None'' if it is not the AI's turn or no move is available.
         """
         #make sure we only try to move when it is actually our turn
         if self._model.current_player != self._player:
             return None
 
-        best_capture = None
-        first_legal = None
-
-        #step 1: scan every square on the board
-        for from_row in range(self._model.nrows):
-            for from_col in range(self._model.ncols):
-                piece = self._model.board[from_row][from_col]
-
-                #skip empty squares and the opponent's pieces.
-                if piece is None or piece.player != self._player:
-                    continue
-
-                #step 2: try moving that piece to every other square.
-                for to_row in range(self._model.nrows):
-                    for to_col in range(self._model.ncols):
-                        #ignore the trivial 'move' that keeps the piece still
-                        if from_row == to_row and from_col == to_col:
-                            continue
+        #a book move is played straight away, as long as it is legal here
+        if self.book is not None:
+            move = self.book.choose(self._model.zobrist_key)
+            if move is not None and self._model._assess_move(move)[0]:
+                return move
 
-                        candidate = Move(from_row, from_col, to_row, to_col)
+        #a solved ending needs no search
+        if self.tablebase is not None:
+            move = self.tablebase.best_move(self._model)
+            if move is not None:
+                return move
 
-                        #ask the model if the move is legal without changing the board
-                        legal, _ = self._model._assess_move(candidate)
-                        if not legal:
-                            continue
-
-                        #remember the first legal move so we always return something
-                        if first_legal is None:
-                            first_legal = candidate
-
-                        #check whether we could capture a piece on the destination square
-                        target = self._model.board[to_row][to_col]
-                        if target is None:
-                            #no capture means no need to evaluate further - continue scanning
-                            continue
-
-                        #convert the class name into a numeric value
-                        target_value = self._piece_values.get(target.__class__.__name__, 0)
-
-                        # if this capture is better than the best we have seen so far, remember it
-                        if best_capture is None or target_value > best_capture[0]:
-                            best_capture = (target_value, candidate)
-
-        if best_capture is not None:
-            return best_capture[1]
-        return first_legal
+        return self._search.best_move()
 
     def make_move(self) -> bool:
         """Perform the move given if there is one possible.
@@ -154,30 +166,205 @@ class UndoException(Exception):
 
         return self.message
 
+class MoveResult:
+    """Everything a front end needs to know after submitting a move.
+
+    Attributes:
+        move (Move): The move that was submitted.
+        validity (MoveValidity): Outcome of validating the move.
+        captured (ChessPiece | None): Piece the move captured, if any.
+        ai_move (Move | None): The AI's reply, or ''None'' if the AI did not move.
+        ai_captured (ChessPiece | None): Piece the AI's reply captured, if any.
+        check (bool): Whether the side now to move is in check.
+        checkmate (bool): Whether the side now to move is checkmated.
+        stalemate (bool): Whether the side now to move is stalemated.
+    """
+    __slots__ = ('move', 'validity', 'captured', 'ai_move', 'ai_captured', 'check', 'checkmate', 'stalemate')
+
+    def __init__(self, move: Move, validity: MoveValidity) -> None:
+        """Initialize a result with no capture, reply or game status yet.
+
+        Args:
+            move (Move): The move that was submitted.
+            validity (MoveValidity): Outcome of validating the move.
+        """
+        self.move = move
+        self.validity = validity
+        self.captured = None
+        self.ai_move = None
+        self.ai_captured = None
+        self.check = False
+        self.checkmate = False
+        self.stalemate = False
+
+    @property
+    def legal(self) -> bool:
+        """bool: Whether the move was accepted and played."""
+        return self.validity == MoveValidity.Valid
+
+    @property
+    def game_over(self) -> bool:
+        """bool: Whether the game ended by checkmate or stalemate."""
+        return self.checkmate or self.stalemate
+
+#pieces a pawn may promote to, by the name a move carries
+PROMOTION_PIECES = {'Knight': Knight, 'Bishop': Bishop, 'Rook': Rook, 'Queen': Queen}
+
+#bits of a packed move holding its from and to squares, without the promotion piece
+SQUARE_BITS = 0xFFF
+
+#undo stack slots per ply: the move, the moving piece and the captured piece
+UNDO_SLOTS = 3
+
 class ChessModel:
     """Game Engine responsible for move validation, execution, and status.
 
     Attributes:
         board (list[list[ChessPiece | None]]): Active pieces arranged by board square.
+        _piece_index (dict): Squares of each player's pieces keyed by type code, kept in step
+            with ''board'' by every move, undo and ''set_piece''.
         __message_code (MoveValidity): Outcome of the most recent validiation.
         __ncols (int): Number of columns on the chess board.
         __nrows (int): Number of rows on the chess board.
+        ai_autoplay (bool): Whether ''move'' asks the AI to reply straight away. Front ends
+            that run the AI in the background turn this off and play its moves themselves.
     """
-    def __init__(self):
-        """Initialize a new chess model with the standard setup."""
+    def __init__(self, ai_player: Player | None = Player.BLACK):
+        """Initialize a new chess model with the standard setup.
+
+        Args:
+            ai_player (Player | None): Side the built-in AI opponent plays, or ''None'' for a
+                game between two outside players. Defaults to black.
+        """
         self.__player = Player.WHITE
         self.__nrows = 8
         self.__ncols = 8
         self.__message_code = MoveValidity.Valid
-        self.__move_history: list[dict] = []
+
+        #undo information for every move made, UNDO_SLOTS entries per ply
+        self._undo_stack: list = [None] * (UNDO_SLOTS * 256)
+        self._ply = 0
+
+        #squares of every piece, grouped by player and then by type code
+        self._piece_index: dict[Player, dict[int, dict[tuple[int, int], ChessPiece]]] = {
+            Player.WHITE: {},
+            Player.BLACK: {},
+        }
+
+        #hash of the current position, updated by XOR on every board edit
+        self._zobrist = 0
+
+        #packed material and square score for white and the game phase, kept by every board edit
+        self._score = 0
+        self._phase = 0
+
+        #facts about the current position, dropped by every board edit and change of turn
+        self._memo: dict | None = None
+
+        #halfmove clock, fullmove number and side to move of the position play started from
+        self._fen_start = (0, 1, Player.WHITE)
 
         #initialize board
         self.board = [[None] * self.__ncols for _ in range(self.__nrows)]
         self.initialize_board()
 
-        #initialize AI that will play as black
-        self._ai_player = Player.BLACK
-        self.AI_player = AI(self, self._ai_player)
+        #initialize AI that will play as black unless told otherwise
+        self._ai_player = ai_player
+        self.AI_player = AI(self, ai_player) if ai_player is not None else None
+        self.ai_autoplay = True
+
+    def copy(self) -> 'ChessModel':
+        """Make an independent copy of the game for another thread or process to work on.
+
+        Pieces are shared flyweights, so only the containers that hold them are copied.
+        The copy has no AI opponent of its own.
+
+        Returns:
+            ChessModel: A model with the same position, side to move and move history.
+        """
+        clone = copy.copy(self)
+        clone.board = [row[:] for row in self.board]
+        clone._undo_stack = self._undo_stack[:]
+        clone._piece_index = {p: {code: dict(squares) for code, squares in index.items()}
+                              for p, index in self._piece_index.items()}
+        clone._memo = None
+        clone.AI_player = None
+        return clone
+
+    @classmethod
+    def from_fen(cls, fen: str, ai_player: Player | None = None) -> 'ChessModel':
+        """Create a model holding a position written in FEN.
+
+        Args:
+            fen (str): The FEN record.
+            ai_player (Player | None): Side the built-in AI plays. Defaults to ''None''.
+
+        Returns:
+            ChessModel: A model set up at the position with no moves to undo.
+
+        Raises:
+            ValueError: If the record is not valid FEN.
+        """
+        model = cls(ai_player=ai_player)
+        model.load_fen(fen)
+        return model
+
+    def load_fen(self, fen: str) -> None:
+        """Replace the game with a position written in FEN, reusing this model.
+
+        Only squares that differ from the current board are rewritten, and the AI,
+        board and undo stack are kept, so loading many positions in turn is cheap.
+        The castling and en passant fields are ignored since the engine has neither rule.
+
+        Args:
+            fen (str): The FEN record.
+
+        Raises:
+            ValueError: If the record is not valid FEN.
+        """
+        rows, player, halfmove, fullmove = parse_fen(fen)
+        board = self.board
+        for r, row in enumerate(rows):
+            current = board[r]
+            for c, piece in enumerate(row):
+                #pieces are flyweights, so identity tells whether the square changes
+                if current[c] is not piece:
+                    self._place(r, c, piece)
+        if player != self.__player:
+            self.set_next_player()
+        self._ply = 0
+        self._memo = None
+        self._fen_start = (halfmove, fullmove, player)
+        self.__message_code = MoveValidity.Valid
+
+    def to_fen(self) -> str:
+        """Write the current position in FEN.
+
+        The move counters continue from the position play started from. Castling and
+        en passant are always written as ''-''.
+
+        Returns:
+            str: The FEN record.
+
+        Raises:
+            ValueError: If the board holds a piece outside the standard set.
+        """
+        start_halfmove, start_fullmove, start_player = self._fen_start
+
+        #the halfmove clock counts back to the last pawn move or capture
+        halfmove = 0
+        stack = self._undo_stack
+        for ply in range(self._ply - 1, -1, -1):
+            base = ply * UNDO_SLOTS
+            if stack[base + 1].code == PAWN or stack[base + 2] is not None:
+                break
+            halfmove += 1
+        else:
+            halfmove += start_halfmove
+
+        fullmove = start_fullmove + (self._ply + (start_player == Player.BLACK)) // 2
+        side = 'w' if self.__player == Player.WHITE else 'b'
+        return f'{format_placement(self.board)} {side} - - {halfmove} {fullmove}'
 
     #Read Only Properties
     @property
@@ -200,6 +387,11 @@ class ChessModel:
         """MoveValidity: Outcome of the most recent move validation."""
         return self.__message_code
 
+    @property
+    def zobrist_key(self) -> int:
+        """int: 64-bit Zobrist hash of the pieces and side to move."""
+        return self._zobrist
+
     #start of our ChessModel main methods
     def is_complete(self) -> bool:
         """Determine whether the current player has any legal moves remaining.
@@ -207,28 +399,115 @@ class ChessModel:
         Returns:
             bool: ''True'' if the game is over (checkmate or stalemate), ''False'' otherwise.
         """
-        for r in range(self.__nrows):
-            for c in range(self.__ncols):
-                piece = self.board[r][c]
-                if piece is None or piece.player != self.__player:
+        return not self._legal_moves()
+
+    def legal_moves(self) -> list[Move]:
+        """List every legal move for the current player.
+
+        Returns:
+            list[Move]: The moves that obey piece movement rules and keep the king safe.
+        """
+        return list(self._legal_moves())
+
+    def legal_move_codes(self) -> array:
+        """List every legal move for the current player in packed form.
+
+        Returns:
+            array: An ''array('H')'' of 16-bit moves as produced by ''Move.pack''.
+        """
+        return pack_moves(self._legal_moves())
+
+    def _position_memo(self) -> dict:
+        """Return the facts memoised for the current position.
+
+        Results must be computed before the memo is fetched, since working them out
+        makes and unmakes moves, which drops the memo.
+
+        Returns:
+            dict: Cached results for the position on the board.
+        """
+        if self._memo is None:
+            self._memo = {}
+        return self._memo
+
+    def _legal_moves(self) -> list[Move]:
+        """Return the memoised legal moves of the current position.
+
+        Returns:
+            list[Move]: The shared list of legal moves, which callers must not change.
+        """
+        if self._memo is not None and 'moves' in self._memo:
+            return self._memo['moves']
+        moves = list(self._iter_legal_moves())
+        self._position_memo()['moves'] = moves
+        return moves
+
+    def _legal_squares(self) -> set[int]:
+        """Return the from and to squares of every legal move, packed without promotion.
+
+        Returns:
+            set[int]: The low twelve bits of ''Move.pack'' for each legal move.
+        """
+        if self._memo is not None and 'squares' in self._memo:
+            return self._memo['squares']
+        squares = {move.pack() & SQUARE_BITS for move in self._legal_moves()}
+        self._position_memo()['squares'] = squares
+        return squares
+
+    def _iter_legal_moves(self, captures_only: bool = False):
+        """Lazily generate the legal moves for the current player.
+
+        Args:
+            captures_only (bool): Only generate moves that capture a piece. Defaults to False.
+
+        Yields:
+            Move: Each pseudo-legal move that does not leave the mover in check.
+        """
+        board = self.board
+        for (r, c), piece in self._pieces_of(self.__player):
+            for move in piece.possible_moves(r, c, board):
+                if captures_only and board[move.to_row][move.to_col] is None:
                     continue
+                if not self._leaves_king_in_check(move):
+                    yield move
 
-                for tr in range(self.__nrows):
-                    for tc in range(self.__ncols):
-                        piece = self.board[r][c]
-                        if piece is None or piece.player != self.__player:
-                            continue
-
-                        for tr in range(self.__nrows):
-                            for tc in range(self.__ncols):
-                                if r == tr and c == tc:
-                                    continue
-
-                                potential_move = Move(r,c,tr,tc)
-                                legal, _ = self._assess_move(potential_move)
-                                if legal:
-                                    return False
-        return True
+    def perft(self, depth: int) -> int:
+        """Count the leaf positions of the legal move tree to a fixed depth.
+
+        Args:
+            depth (int): Number of plies to expand.
+
+        Returns:
+            int: The number of move sequences of length ''depth''.
+        """
+        if depth <= 0:
+            return 1
+        moves = self._legal_moves()
+        if depth == 1:
+            return len(moves)
+
+        nodes = 0
+        for move in moves:
+            self._make_move(move)
+            nodes += self.perft(depth - 1)
+            self._unmake_move()
+        return nodes
+
+    def divide(self, depth: int) -> list[tuple[Move, int]]:
+        """Break a perft count down by root move.
+
+        Args:
+            depth (int): Number of plies to expand, including the root move.
+
+        Returns:
+            list[tuple[Move, int]]: Each legal root move with the leaves found below it.
+        """
+        counts = []
+        for move in self.legal_moves():
+            self._make_move(move)
+            counts.append((move, self.perft(depth - 1)))
+            self._unmake_move()
+        return counts
 
     def is_valid_move(self, move: Move) -> bool:
         """Validate a move request at the game level.
@@ -258,50 +537,110 @@ class ChessModel:
         if not legal:
             return False
 
-        piece = self.board[move.from_row][move.from_col]
-        captured_piece = self.board[move.to_row][move.to_col]
-        piece_snapshot = self._snapshot_piece_state(piece)
-
-        history_entry = {
-            'move': move,
-            'piece': piece,
-            'captured': captured_piece,
-            'piece_snapshot': piece_snapshot,
-            'player_before': self.__player,
-            'promotion': False,
-        }
-        self.board[move.from_row][move.from_col] = None
+        self._make_move(move)
+        self._trigger_ai_move_if_needed()
+        return True
+
+    def submit_move(self, move: Move) -> MoveResult:
+        """Validate and play a move, then report the resulting game state in one call.
+
+        The move is validated once. If it is legal it is played, the AI replies when it
+        is its turn, and the check and game-over status of the final position is filled in.
+
+        Args:
+            move (Move): The move to play.
+
+        Returns:
+            MoveResult: The validity code, captures, AI reply and status of the game.
+        """
+        legal, code = self._assess_move(move)
+        self.__message_code = code
+        result = MoveResult(move, code)
+        if not legal:
+            return result
+
+        result.captured = self.board[move.to_row][move.to_col]
+        self._make_move(move)
+        reply = self._trigger_ai_move_if_needed()
+        if reply is not None:
+            result.ai_move = reply
+            result.ai_captured = self._undo_stack[(self._ply - 1) * UNDO_SLOTS + 2]
+
+        result.check = self.in_check(self.__player)
+        if self.is_complete():
+            result.checkmate = result.check
+            result.stalemate = not result.check
+        return result
+
+    def _make_move(self, move: Move) -> None:
+        """Apply a move already known to be legal and push its undo information.
+
+        No validation is done and the AI is not asked to reply, which lets the search
+        and the legality test play moves and take them back with ''_unmake_move''.
 
-        if isinstance(piece, Pawn):
-            piece.first_move = False
-            if (piece.player == Player.WHITE and move.to_row == 0) or (
-                piece.player == Player.BLACK and move.to_row == self.__nrows - 1
+        Args:
+            move (Move): The legal move to apply.
+        """
+        fr, fc, tr, tc = move.from_row, move.from_col, move.to_row, move.to_col
+        piece = self.board[fr][fc]
+        captured_piece = self.board[tr][tc]
+
+        base = self._ply * UNDO_SLOTS
+        stack = self._undo_stack
+        if base == len(stack):
+            stack.extend([None] * len(stack))
+        stack[base] = move
+        stack[base + 1] = piece
+        stack[base + 2] = captured_piece
+        self._ply += 1
+
+        self._place(fr, fc, None)
+        if piece.code == PAWN:
+            if (piece.player == Player.WHITE and tr == 0) or (
+                piece.player == Player.BLACK and tr == self.__nrows - 1
             ):
-                self.board[move.to_row][move.to_col] = Queen(piece.player)
-                history_entry['promotion'] = True
-            else:
-                self.board[move.to_row][move.to_col] = piece
-        else:
-            self.board[move.to_row][move.to_col] = piece
+                piece = PROMOTION_PIECES[move.promotion or 'Queen'](piece.player)
+        self._place(tr, tc, piece)
 
-        self.__move_history.append(history_entry)
+        self.set_next_player()
+
+    def _unmake_move(self) -> None:
+        """Take back the move on top of the undo stack.
+
+        The caller must make sure there is a move to take back.
+        """
+        self._ply -= 1
+        base = self._ply * UNDO_SLOTS
+        stack = self._undo_stack
+        move = stack[base]
+
+        self._place(move.to_row, move.to_col, stack[base + 2])
+        self._place(move.from_row, move.from_col, stack[base + 1])
 
         self.set_next_player()
-        self._trigger_ai_move_if_needed()
-        return True
 
-    def _trigger_ai_move_if_needed(self):
-        """Ask the AI to respond when it is it's turn."""
-        if self.AI_player is None:
-            return
+    @property
+    def move_history(self) -> list[Move]:
+        """list[Move]: Moves played so far, oldest first."""
+        return self._undo_stack[0:self._ply * UNDO_SLOTS:UNDO_SLOTS]
 
-        if self.__player != self._ai_player:
-            return
+    def _trigger_ai_move_if_needed(self) -> Move | None:
+        """Ask the AI to respond when it is it's turn.
 
-        #let the AI try to move; we ignore the return value because it simply
-        #indicates whether a move was available, which does not change the game flow.
+        Returns:
+            Move | None: The AI's reply, or ''None'' if the AI did not move.
+        """
+        if self.AI_player is None or not self.ai_autoplay:
+            return None
 
-        self.AI_player.make_move()
+        if self.__player != self._ai_player:
+            return None
+
+        #the search only returns legal moves, so the reply is played without validating it again
+        reply = self.AI_player.choose_move()
+        if reply is not None:
+            self._make_move(reply)
+        return reply
 
     def _assess_move(self, move: Move) -> tuple[bool, MoveValidity]:
         """Evaluate a move without mutating persistent state.
@@ -322,148 +661,172 @@ class ChessModel:
         if piece is None or piece.player != self.__player:
             return False, MoveValidity.Invalid
 
-        captured_piece = self.board[tr][tc]
-
-        snapshot = self._snapshot_piece_state(piece)
-        if not piece.is_valid_move(move, self.board):
-            self._restore_piece_state(piece, snapshot)
+        #a move in the memoised legal set needs no further rule checks, anything else
+        #is either against the piece's rules or exposes the king
+        legal = (fr * 8 + fc | (tr * 8 + tc) << 6) in self._legal_squares()
+        if not legal and not any(candidate.to_row == tr and candidate.to_col == tc
+                                 for candidate in piece.possible_moves(fr, fc, self.board)):
             return False, MoveValidity.Invalid
-        self._restore_piece_state(piece, snapshot)
-
-        currently_in_check = self.in_check(piece.player)
 
-        self.board[fr][fc] = None
-        self.board[tr][tc] = piece
-        still_in_check = self.in_check(piece.player)
-        self.board[fr][fc] = piece
-        self.board[tr][tc] = captured_piece
+        #a promotion piece may only be named when a pawn reaches the far rank
+        if move.promotion is not None:
+            last_row = 0 if piece.player == Player.WHITE else self.__nrows - 1
+            if piece.code != PAWN or tr != last_row or move.promotion not in PROMOTION_PIECES:
+                return False, MoveValidity.Invalid
 
-        if still_in_check:
-            if currently_in_check:
+        if not legal:
+            if self.in_check(piece.player):
                 return False, MoveValidity.StayingInCheck
             return False, MoveValidity.MovingIntoCheck
         return True, MoveValidity.Valid
 
+    def _leaves_king_in_check(self, move: Move) -> bool:
+        """Check whether playing a pseudo-legal move would leave the mover in check.
 
-    def _snapshot_piece_state(self, piece: ChessPiece) -> dict:
-        """Capture mutable attributes of a piece for later restoration.
+        The move is made on the board for the test and unmade before returning.
 
         Args:
-            piece (ChessPiece): The piece whose state should be recorded.
+            move (Move): A move that already satisfies the piece movement rules.
 
         Returns:
-            dict: Serialized state needed to undo a move for the piece.
+            bool: ''True'' if the moving player's king would be attacked, ''False'' otherwise.
         """
-        if isinstance(piece, Pawn):
-            return {'first_move': piece.first_move}
-        return {}
+        mover = self.__player
+        self._make_move(move)
+        exposed = self._king_attacked(mover)
+        self._unmake_move()
+        return exposed
 
-    def _restore_piece_state(self, piece: ChessPiece, snapshot: dict) -> None:
-        """Restore mutable piece attributes from a snapshot.
+    def _place(self, row: int, col: int, piece: ChessPiece | None) -> None:
+        """Write a single square of the board.
+
+        Every board edit goes through this method so that subclasses keeping
+        another representation of the position can mirror the change.
+
+        Args:
+            row (int): Target row index.
+            col (int): Target column index.
+            piece (ChessPiece | None): The piece to place or ''None'' to clear the square.
+        """
+        self._memo = None
+        old = self.board[row][col]
+        if old is not None:
+            del self._piece_index[old.player][old.code][(row, col)]
+            self._zobrist ^= piece_key(old, row, col)
+            self._score -= piece_score(old, row, col)
+            self._phase -= PHASE_WEIGHTS[old.code]
+        if piece is not None:
+            self._piece_index[piece.player].setdefault(piece.code, {})[(row, col)] = piece
+            self._zobrist ^= piece_key(piece, row, col)
+            self._score += piece_score(piece, row, col)
+            self._phase += PHASE_WEIGHTS[piece.code]
+        self.board[row][col] = piece
+
+    def _pieces_of(self, p: Player) -> list[tuple[tuple[int, int], ChessPiece]]:
+        """List the pieces a player owns using the piece index.
+
+        A list is returned so callers may edit the board while walking it.
+
+        Args:
+            p (Player): Owner of the pieces.
+
+        Returns:
+            list[tuple[tuple[int, int], ChessPiece]]: Pairs of ''(row, col)'' and piece.
+        """
+        return [entry for squares in self._piece_index[p].values() for entry in squares.items()]
+
+    def king_square(self, p: Player) -> tuple[int, int] | None:
+        """Look up where a player's king stands.
 
         Args:
-            piece (ChessPiece): The piece whose state should be restored.
-            snapshot (dict): The snapshot previously returned by ''_snapshot_piece_state''.
+            p (Player): Owner of the king.
+
+        Returns:
+            tuple[int, int] | None: The king's ''(row, col)'', or ''None'' if it has no king.
         """
-        if isinstance(piece, Pawn) and 'first_move' in snapshot:
-            piece.first_move = snapshot['first_move']
+        kings = self._piece_index[p].get(KING)
+        if not kings:
+            return None
+        return next(iter(kings))
+
+    def evaluate(self) -> int:
+        """Score the position from the side to move's point of view.
+
+        Material and piece-square scores are kept up to date by every board edit, so this
+        only blends the middlegame and endgame scores by how much material is left.
+
+        Returns:
+            int: The score in centipawns, positive when the side to move is better.
+        """
+        score = taper(self._score, self._phase)
+        return score if self.__player == Player.WHITE else -score
 
     def in_check(self, p: Player):
         """Determine whether the specified player is in check.
 
+        The answer for the side to move is memoised until the position changes.
+
         Args:
             p (Player): The player to evaluate.
 
         Returns:
             bool: ''True'' if the player's king is threatened, ''False'' otherwise.
         """
-        king_position = None
+        if p != self.__player:
+            return self._king_attacked(p)
+        if self._memo is not None and 'check' in self._memo:
+            return self._memo['check']
+        check = self._king_attacked(p)
+        self._position_memo()['check'] = check
+        return check
 
-        #locate king for the current player
-        for r in range(self.__nrows):
-            for c in range(self.__ncols):
-                piece = self.board[r][c]
-                if isinstance(piece, King) and piece.player == p:
-                    king_position = (r, c)
-                    break
-            if king_position is not None:
-                break
-        if king_position is None:
-            return False
-
-        #local method for our movement checks so that they dont check off screen
-        def on_board(row: int, col: int) -> bool:
-            """Check whether coordinates fall within the board boundaries.
-
-            Args:
-                row (int): Row index to validate.
-                col (Int): Column index to validate.
+    def _king_attacked(self, p: Player) -> bool:
+        """Test whether any enemy piece attacks a player's king.
 
-            Returns:
-                bool: ''True'' if the coordinates are on the board, ''False'' otherwise.
-            """
-            return 0 <= row < self.__nrows and 0 <= col < self.__ncols
+        Args:
+            p (Player): Owner of the king.
 
-        #check every opponent piece to see if it can attack the king :D
-        for r in range(self.__nrows):
-            for c in range(self.__ncols):
-                piece = self.board[r][c]
-                if piece is None or piece.player == p: # if we find an empty piece or our own piece go next iter
-                    continue
+        Returns:
+            bool: ''True'' if the king is attacked, ''False'' if it is safe or missing.
+        """
+        king_position = self.king_square(p)
+        if king_position is None:
+            return False
 
-                #pawn possible attacks
-                if isinstance(piece, Pawn):
-                    direction = -1 if piece.player == Player.WHITE else 1
-                    for dc in (-1, 1):
-                        attack_row = r + direction
-                        attack_col = c + dc
-                        if (attack_row, attack_col) == king_position:
-                            return True
-
-                #knight possible attacks
-                elif isinstance(piece, Knight):
-                    #every single possible knight movement lol, could prob be made better??
-                    for dr, dc in ((2,1), (1,2), (-1,2), (-2,1),
-                                   (-2,-1), (-1,-2), (1,-2), (2,-1)):
-                        if (r+dr, c+dc) == king_position:
-                            return True
-
-                #bishop or queen's diagonal attacks
-                elif isinstance(piece, (Bishop, Queen)):
-                    for dr, dc in ((1,1), (1,-1), (-1,1), (-1,-1)):
-                        nr, nc = r + dr, c + dc
-                        while on_board(nr,nc): # check every tile diagonally
-                            target = self.board[nr][nc]
-                            if (nr, nc) == king_position: #if we are checking a tile with a king, then its check
-                                return True
-                            if target is not None: #if theres another piece on the tile it cant be a king then
-                                break
-                            #keep iterating through tiles
-                            nr += dr
-                            nc += dc
-
-                #rook our queen's straight attacks
-                if isinstance(piece, (Rook, Queen)):
-                    for dr, dc in ((1,0), (-1,0), (0,1), (0,-1)):
-                        nr, nc = r + dr, c + dc
-                        while on_board(nr, nc):  # check every tile straight
-                            target = self.board[nr][nc]
-                            if (nr, nc) == king_position:  # if we are checking a tile with a king, then its check
-                                return True
-                            if target is not None:  # if theres another piece on the tile it cant be a king then
-                                break
-                            # keep iterating through tiles
-                            nr += dr
-                            nc += dc
-
-                #enemy king adjacent
-                if isinstance(piece, King):
-                    for dr in (-1, 0, 1):
-                        for dc in (-1, 0, 1):
-                            if dr == 0 and dc == 0:
-                                continue
-                            if (r+dr, c+dc) == king_position:
-                                return True
+        kr, kc = king_position
+        board = self.board
+
+        #knights and the enemy king can only reach the king from their fixed offsets
+        for r, c in KNIGHT_TARGETS[kr][kc]:
+            piece = board[r][c]
+            if piece is not None and piece.code == KNIGHT and piece.player != p:
+                return True
+        for r, c in KING_TARGETS[kr][kc]:
+            piece = board[r][c]
+            if piece is not None and piece.code == KING and piece.player != p:
+                return True
+
+        #an enemy pawn attacks the king from the squares our own pawn would attack
+        for r, c in PAWN_ATTACKS[p][kr][kc]:
+            piece = board[r][c]
+            if piece is not None and piece.code == PAWN and piece.player != p:
+                return True
+
+        #walk out from the king along every ray, only the first piece hit can attack
+        for ray in DIAGONAL_RAYS[kr][kc]:
+            for r, c in ray:
+                piece = board[r][c]
+                if piece is not None:
+                    if (piece.code == BISHOP or piece.code == QUEEN) and piece.player != p:
+                        return True
+                    break
+        for ray in STRAIGHT_RAYS[kr][kc]:
+            for r, c in ray:
+                piece = board[r][c]
+                if piece is not None:
+                    if (piece.code == ROOK or piece.code == QUEEN) and piece.player != p:
+                        return True
+                    break
         return False
 
     def piece_at(self, row: int, col: int) -> ChessPiece:
@@ -487,6 +850,8 @@ class ChessModel:
     def set_next_player(self):
         """Advance the active player to the opponent."""
         self.__player = self.__player.next()
+        self._zobrist ^= SIDE_KEY
+        self._memo = None
 
     def set_piece(self, row:int, col:int, piece:ChessPiece):
         """Place a piece on the board at the specified location.
@@ -505,7 +870,7 @@ class ChessModel:
 
         if piece is not None and not isinstance(piece, ChessPiece):
             raise TypeError('piece must be ChessPiece or None')
-        self.board[row][col] = piece
+        self._place(row, col, piece)
 
     def undo(self):
         """Undo the most recent move.
@@ -513,32 +878,56 @@ class ChessModel:
         Raises:
             UndoException: If there is no move to undo.
         """
-        if not self.__move_history:
+        if self._ply == 0:
             raise UndoException('No moves to undo.')
 
-        last_move = self.__move_history.pop()
-        move = last_move['move']
-        piece = last_move['piece']
-        captured_piece = last_move['captured']
-
-        self.board[move.to_row][move.to_col] = captured_piece
-        self.board[move.from_row][move.from_col] = piece
-
-        self._restore_piece_state(piece, last_move['piece_snapshot'])
-        self.__player = last_move['player_before']
+        self._unmake_move()
         self.__message_code = MoveValidity.Valid
 
-
     def initialize_board(self):
         """Populate the board with the standard chess starting arrangement."""
 
-        #BLACK ROWS
-        self.board[0] = [Rook(Player.BLACK), Knight(Player.BLACK), Bishop(Player.BLACK), Queen(Player.BLACK),
-                         King(Player.BLACK), Bishop(Player.BLACK), Knight(Player.BLACK), Rook(Player.BLACK)]
-        self.board[1] = [Pawn(Player.BLACK) for col in range(self.ncols)]
+        #clear anything left over in the middle of the board
+        for row in range(2, self.__nrows - 2):
+            for col in range(self.__ncols):
+                self._place(row, col, None)
 
+        #BLACK ROWS
+        black_back = [Rook(Player.BLACK), Knight(Player.BLACK), Bishop(Player.BLACK), Queen(Player.BLACK),
+                      King(Player.BLACK), Bishop(Player.BLACK), Knight(Player.BLACK), Rook(Player.BLACK)]
+        for col in range(self.__ncols):
+            self._place(0, col, black_back[col])
+            self._place(1, col, Pawn(Player.BLACK))
 
         #WHITE ROWS
-        self.board[7] = [Rook(Player.WHITE), Knight(Player.WHITE), Bishop(Player.WHITE), Queen(Player.WHITE),
-                         King(Player.WHITE), Bishop(Player.WHITE), Knight(Player.WHITE), Rook(Player.WHITE)]
-        self.board[6] = [Pawn(Player.WHITE) for col in range(self.ncols)]
\ No newline at end of file
+        white_back = [Rook(Player.WHITE), Knight(Player.WHITE), Bishop(Player.WHITE), Queen(Player.WHITE),
+                      King(Player.WHITE), Bishop(Player.WHITE), Knight(Player.WHITE), Rook(Player.WHITE)]
+        for col in range(self.__ncols):
+            self._place(7, col, white_back[col])
+            self._place(6, col, Pawn(Player.WHITE))
+
+
+def iter_fen_positions(lines, model: ChessModel | None = None):
+    """Stream FEN records into one reused model.
+
+    Blank lines and lines starting with ''#'' are skipped. The same model is yielded
+    for every record, so read what you need from it before asking for the next one.
+
+    Args:
+        lines (Iterable[str]): FEN records, such as an open file.
+        model (ChessModel | None): Model to load into, or ''None'' to create one without an AI.
+
+    Yields:
+        ChessModel: The model holding each position in turn.
+
+    Raises:
+        ValueError: If a record is not valid FEN.
+    """
+    if model is None:
+        model = ChessModel(ai_player=None)
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        model.load_fen(line)
+        yield model
@@ -2,19 +2,65 @@ from abc import ABC, abstractmethod
 from move import Move
 from player import Player
 
+#small integer type codes, 0 is left for pieces outside the standard set
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING = range(1, 7)
+TYPE_CODES = {'Pawn': PAWN, 'Knight': KNIGHT, 'Bishop': BISHOP, 'Rook': ROOK, 'Queen': QUEEN, 'King': KING}
+TYPE_NAMES = {code: name for name, code in TYPE_CODES.items()}
+
 class ChessPiece(ABC):
     """Abstract base class for all chess pieces.
 
+    Pieces are immutable flyweights: constructing a piece returns the one shared
+    instance for its class and player, so boards can hold and copy references freely.
+
     Attributes:
         player (Player): Owner of the piece.
+        code (int): Small integer identifying the piece type.
     """
-    def __init__(self, player: Player):
-        """Initialize a chess piece.
+    __slots__ = ('__player',)
+    code = 0
+
+    _instances: dict = {}
+
+    def __new__(cls, player: Player):
+        """Return the shared instance for a piece class and player.
 
         Args:
             player (Player): Owner of the piece.
+
+        Returns:
+            ChessPiece: The flyweight piece.
+        """
+        instance = ChessPiece._instances.get((cls, player))
+        if instance is None:
+            instance = super().__new__(cls)
+            object.__setattr__(instance, '_ChessPiece__player', player)
+            ChessPiece._instances[(cls, player)] = instance
+        return instance
+
+    def __setattr__(self, name, value):
+        """Reject attribute changes, since every square holding the piece shares it.
+
+        Raises:
+            AttributeError: Always.
+        """
+        raise AttributeError(f'{type(self).__name__} pieces are immutable')
+
+    def __reduce__(self):
+        """Rebuild the piece through its constructor so copies and pickles stay shared.
+
+        Returns:
+            tuple: The class and the constructor arguments.
         """
-        self.__player = player
+        return type(self), (self.__player,)
+
+    def __copy__(self):
+        """Return the piece itself, as flyweights are never copied."""
+        return self
+
+    def __deepcopy__(self, memo):
+        """Return the piece itself, as flyweights are never copied."""
+        return self
 
     @property
     def player(self) -> Player:
@@ -61,3 +107,63 @@ class ChessPiece(ABC):
         if dest_piece is not None and dest_piece.player == self.player:
             return False
         return True
+
+    def possible_moves(self, row: int, col: int, board: list[list['ChessPiece']]):
+        """Yield every pseudo-legal move for the piece standing on the given square.
+
+        Pseudo-legal moves follow the piece's movement rules but may still leave the
+        owner's king in check. The base version probes every square with
+        ''is_valid_move''; concrete pieces override it to walk only reachable squares.
+
+        Args:
+            row (int): Row index the piece stands on.
+            col (int): Column index the piece stands on.
+            board (list[list['ChessPiece']]): The board to generate moves against.
+
+        Yields:
+            Move: Each move that satisfies the piece's movement rules.
+        """
+        for to_row in range(len(board)):
+            for to_col in range(len(board[to_row])):
+                move = Move(row, col, to_row, to_col)
+                if self.is_valid_move(move, board):
+                    yield move
+
+    def _step_moves(self, row: int, col: int, board: list[list['ChessPiece']], targets):
+        """Yield single step moves for pieces that jump to fixed squares.
+
+        Args:
+            row (int): Row index the piece stands on.
+            col (int): Column index the piece stands on.
+            board (list[list['ChessPiece']]): The board to generate moves against.
+            targets (tuple[tuple[int, int], ...]): Precomputed destination squares.
+
+        Yields:
+            Move: Each move landing on an empty or enemy occupied square.
+        """
+        for tr, tc in targets:
+            target = board[tr][tc]
+            if target is None or target.player != self.player:
+                yield Move(row, col, tr, tc)
+
+    def _slide_moves(self, row: int, col: int, board: list[list['ChessPiece']], rays):
+        """Yield moves along rays for sliding pieces, stopping at the first blocker.
+
+        Args:
+            row (int): Row index the piece stands on.
+            col (int): Column index the piece stands on.
+            board (list[list['ChessPiece']]): The board to generate moves against.
+            rays (tuple[tuple[tuple[int, int], ...], ...]): Precomputed rays, nearest square first.
+
+        Yields:
+            Move: Each move to an empty square or onto the first enemy piece of a ray.
+        """
+        for ray in rays:
+            for tr, tc in ray:
+                target = board[tr][tc]
+                if target is not None:
+                    #enemy pieces can be captured, but nothing past them is reachable
+                    if target.player != self.player:
+                        yield Move(row, col, tr, tc)
+                    break
+                yield Move(row, col, tr, tc)
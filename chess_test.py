@@ -1,14 +1,33 @@
+import copy
+import io
+import pickle
+import random
+import threading
+
 import pytest
 
+from ai_worker import AIWorker
+from attack_tables import DIAGONAL_RAYS, KING_TARGETS, KNIGHT_TARGETS, PAWN_ATTACKS
+from benchmark import PERFT_POSITIONS, SEARCH_POSITIONS, play, random_fens
 from bishop import Bishop
-from chess_piece import ChessPiece
+from bitboard_model import BitboardChessModel
+from chess_model import AI, ChessModel, MoveValidity, UndoException, iter_fen_positions
+from chess_piece import BISHOP, KING, KNIGHT, PAWN, QUEEN, ROOK, ChessPiece
+from evaluation import PHASE_TOTAL, evaluate_board
+from fen import START_FEN
 from king import King
 from knight import Knight
-from move import Move
+from move import Move, pack_moves, unpack_moves
 from pawn import Pawn
+from opening_book import BookBuilder, OpeningBook
+from pgn import game_to_pgn, move_to_san, read_games, san_to_move
 from player import Player
 from queen import Queen
 from rook import Rook
+from tablebase import DRAW, LOSS, TABLE_SIZE, WIN, Tablebase, generate_all
+from tournament import RESULT_POINTS, play_game, run_tournament, summarize
+from transposition import EXACT, LOWER, UPPER, TranspositionTable
+from zobrist import hash_board
 
 
 class DummyPiece(ChessPiece):
@@ -56,6 +75,45 @@ def test_chess_piece_base_constraints():
     assert piece.is_valid_move(Move(0,0,0,1), board)
 
 
+def test_pieces_are_shared_immutable_flyweights():
+    """Constructing, copying or pickling a piece hands back the one shared instance."""
+
+    pawn = Pawn(Player.WHITE)
+    assert pawn is Pawn(Player.WHITE)
+    assert pawn is not Pawn(Player.BLACK)
+    assert copy.copy(pawn) is pawn and copy.deepcopy(pawn) is pawn
+    assert pickle.loads(pickle.dumps(pawn)) is pawn
+    assert not hasattr(pawn, '__dict__')
+    with pytest.raises(AttributeError):
+        pawn.player = Player.BLACK
+
+    #Type codes are distinct small integers.
+    codes = [cls.code for cls in (Pawn, Knight, Bishop, Rook, Queen, King)]
+    assert codes == [PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING] == list(range(1, 7))
+
+
+#MOVE
+
+
+def test_move_value_semantics_and_packing():
+    """Moves compare by value and survive a round trip through their packed form."""
+
+    move = Move(6,4,4,4)
+    assert move == Move(6,4,4,4)
+    assert move != Move(6,4,5,4)
+    assert len({move, Move(6,4,4,4)}) == 1
+    assert not hasattr(move, '__dict__')
+
+    promotion = Move(1,0,0,1,'Knight')
+    assert promotion.pack() == (1*8 + 0) | (0*8 + 1) << 6 | 1 << 12
+    assert Move.unpack(promotion.pack()) == promotion
+    assert Move.unpack(promotion.pack()) != Move(1,0,0,1)
+
+    codes = pack_moves([move, promotion])
+    assert codes.typecode == 'H' and codes.itemsize == 2
+    assert unpack_moves(codes) == [move, promotion]
+
+
 #PAWN
 
 
@@ -66,11 +124,12 @@ def test_pawn_first_and_subseqeunt_moves():
     pawn = Pawn(Player.WHITE)
     board[6][4] = pawn
 
-    #White pawns should move up
+    #White pawns should move up, and checking a move leaves the pawn able to double step.
     assert pawn.is_valid_move(Move(6,4,5,4), board)
-    assert not pawn.first_move
+    assert pawn.is_valid_move(Move(6,4,4,4), board)
 
-    #After moving once, a second forward move of two squares must fail.
+    #Off its starting rank, a forward move of two squares must fail.
+    board[6][4] = None
     board[5][4] = pawn
     assert not pawn.is_valid_move(Move(5,4,3,4), board)
 
@@ -86,10 +145,9 @@ def test_pawn_double_step_requires_clear_path():
     board[2][3] = DummyPiece(Player.WHITE)
     assert not pawn.is_valid_move(Move(1,3,3,3), board)
 
-    #Clearing the path allows the move to succeed and toggles ''first_move''.
+    #Clearing the path allows the move to succeed.
     board[2][3] = None
     assert pawn.is_valid_move(Move(1,3,3,3), board)
-    assert not pawn.first_move
 
 
 def test_pawn_captures_diagonally():
@@ -216,3 +274,830 @@ def test_king_single_square_movement():
     assert king.is_valid_move(Move(4,4,3,3), board)
     board[5][5] = DummyPiece(Player.BLACK)
     assert not king.is_valid_move(Move(4,4,5,5), board)
+
+
+#CHESS_MODEL
+
+
+def brute_force_moves(model: ChessModel):
+    """Collect legal moves by validating every from/to square pair."""
+
+    found = set()
+    for fr in range(model.nrows):
+        for fc in range(model.ncols):
+            piece = model.piece_at(fr, fc)
+            if piece is None or piece.player != model.current_player:
+                continue
+            for tr in range(model.nrows):
+                for tc in range(model.ncols):
+                    move = Move(fr, fc, tr, tc)
+                    if piece.is_valid_move(move, model.board) and not model._leaves_king_in_check(move):
+                        found.add((fr, fc, tr, tc))
+    return found
+
+
+def as_tuples(moves):
+    """Convert moves into comparable coordinate tuples."""
+
+    return {(m.from_row, m.from_col, m.to_row, m.to_col) for m in moves}
+
+
+def test_legal_moves_match_square_probing():
+    """The piece generators should find exactly the moves the validators accept."""
+
+    model = ChessModel()
+    model.AI_player = None
+    assert len(model.legal_moves()) == 20
+    assert as_tuples(model.legal_moves()) == brute_force_moves(model)
+
+    #open up the position so every piece type has moves, captures and pins to consider.
+    for move in (Move(6,4,4,4), Move(1,3,3,3), Move(4,4,3,3), Move(0,3,3,3),
+                 Move(7,5,3,1), Move(0,1,2,2), Move(7,3,3,7)):
+        assert model.move(move)
+    assert as_tuples(model.legal_moves()) == brute_force_moves(model)
+
+
+def test_is_complete_detects_checkmate():
+    """Fool's mate leaves white without any legal move."""
+
+    model = ChessModel()
+    model.AI_player = None
+    for move in (Move(6,5,5,5), Move(1,4,3,4), Move(6,6,4,6), Move(0,3,4,7)):
+        assert not model.is_complete()
+        assert model.move(move)
+    assert model.in_check(Player.WHITE)
+    assert model.is_complete()
+    assert model.legal_moves() == []
+
+
+def test_submit_move_reports_everything_in_one_call():
+    """submit_move carries validity, captures, the AI reply and the game status."""
+
+    model = ChessModel()
+    model.AI_player = AI(model, Player.BLACK, max_depth=1, time_limit=None)
+    result = model.submit_move(Move(6,4,3,4))
+    assert not result.legal and result.validity == MoveValidity.Invalid
+    assert model.move_history == []
+
+    result = model.submit_move(Move(6,4,4,4))
+    assert result.legal and result.captured is None
+    assert result.ai_move is not None and model.move_history == [Move(6,4,4,4), result.ai_move]
+    assert model.current_player == Player.WHITE
+    assert not (result.check or result.game_over)
+
+    #fool's mate is reported as checkmate, a boxed in king as stalemate.
+    model = ChessModel()
+    model.AI_player = None
+    for move in (Move(6,5,5,5), Move(1,4,3,4), Move(6,6,4,6)):
+        model.move(move)
+    result = model.submit_move(Move(0,3,4,7))
+    assert result.check and result.checkmate and not result.stalemate
+
+    model = empty_model()
+    model.set_piece(0, 0, King(Player.BLACK))
+    model.set_piece(7, 7, King(Player.WHITE))
+    model.set_piece(4, 1, Queen(Player.WHITE))
+    result = model.submit_move(Move(4,1,2,1))
+    assert result.stalemate and result.game_over and not result.check
+
+
+def test_position_status_is_memoised_until_the_board_changes():
+    """Status queries reuse one enumeration and are refreshed by move, undo and set_piece."""
+
+    model = ChessModel()
+    model.AI_player = None
+    moves = model._legal_moves()
+    assert model._legal_moves() is moves
+    assert model.is_valid_move(Move(6,4,4,4)) and not model.is_complete()
+    assert model._legal_moves() is moves
+
+    #the returned list is a copy, so callers cannot corrupt the memo.
+    model.legal_moves().clear()
+    assert len(model.legal_moves()) == 20
+
+    assert model.move(Move(6,5,5,5))
+    assert model._legal_moves() is not moves
+    for move in (Move(1,4,3,4), Move(6,6,4,6), Move(0,3,4,7)):
+        assert model.move(move)
+    assert model.in_check(Player.WHITE) and model.is_complete()
+
+    model.undo()
+    assert not model.in_check(Player.BLACK) and not model.is_complete()
+
+    #removing the checking queen by hand must clear the memo as well.
+    assert model.move(Move(0,3,4,7))
+    model.set_piece(4, 7, None)
+    assert not model.in_check(Player.WHITE) and not model.is_complete()
+
+
+def test_piece_index_tracks_moves_and_undo():
+    """The piece index should always describe the same pieces as the board."""
+
+    rng = random.Random(3)
+    model = ChessModel()
+    model.AI_player = None
+    assert model.king_square(Player.WHITE) == (7, 4)
+    assert model.king_square(Player.BLACK) == (0, 4)
+
+    for _ in range(40):
+        moves = model.legal_moves()
+        if not moves:
+            break
+        model.move(rng.choice(moves))
+    for _ in range(15):
+        model.undo()
+    model.set_piece(4, 4, Knight(Player.WHITE))
+    model.set_piece(*model.king_square(Player.BLACK), None)
+
+    indexed = {square: piece for p in Player for square, piece in model._pieces_of(p)}
+    on_board = {(r, c): model.piece_at(r, c) for r in range(8) for c in range(8)
+                if model.piece_at(r, c) is not None}
+    assert indexed == on_board
+    assert model.king_square(Player.BLACK) is None
+
+
+def test_attack_tables_geometry():
+    """Spot check the precomputed tables against hand counted squares."""
+
+    assert sorted(KNIGHT_TARGETS[0][0]) == [(1, 2), (2, 1)]
+    assert len(KNIGHT_TARGETS[4][4]) == 8
+    assert len(KING_TARGETS[7][7]) == 3
+    assert PAWN_ATTACKS[Player.WHITE][6][0] == ((5, 1),)
+    assert sorted(PAWN_ATTACKS[Player.BLACK][1][4]) == [(2, 3), (2, 5)]
+
+    #rays list the nearest square first and stop at the edge.
+    assert DIAGONAL_RAYS[7][0][2] == ((6, 1), (5, 2), (4, 3), (3, 4), (2, 5), (1, 6), (0, 7))
+
+
+def test_in_check_respects_blockers():
+    """Sliding attacks stop at the first piece in the way."""
+
+    model = ChessModel()
+    model.AI_player = None
+    for row in range(8):
+        for col in range(8):
+            model.set_piece(row, col, None)
+    model.set_piece(7, 4, King(Player.WHITE))
+    model.set_piece(0, 4, Rook(Player.BLACK))
+    assert model.in_check(Player.WHITE)
+
+    model.set_piece(4, 4, Pawn(Player.WHITE))
+    assert not model.in_check(Player.WHITE)
+
+    model.set_piece(5, 5, Pawn(Player.BLACK))
+    assert not model.in_check(Player.WHITE)
+    model.set_piece(6, 5, Pawn(Player.BLACK))
+    assert model.in_check(Player.WHITE)
+
+
+def test_undo_stack_grows_and_unwinds():
+    """Long games outgrow the preallocated undo stack and still undo cleanly."""
+
+    model = ChessModel()
+    model.AI_player = None
+    start = model.zobrist_key
+    shuffle = (Move(7,6,5,5), Move(0,6,2,5), Move(5,5,7,6), Move(2,5,0,6))
+    for ply in range(300):
+        assert model.move(shuffle[ply % 4])
+    assert len(model.move_history) == 300
+    assert model.move_history[1] is shuffle[1]
+
+    for _ in range(300):
+        model.undo()
+    assert model.zobrist_key == start
+    assert model.move_history == []
+    with pytest.raises(UndoException):
+        model.undo()
+
+
+@pytest.mark.parametrize('model_class', (ChessModel, BitboardChessModel))
+@pytest.mark.parametrize('name', sorted(PERFT_POSITIONS))
+def test_perft_matches_known_counts(name, model_class):
+    """Move generation reproduces the reference leaf counts of the perft positions."""
+
+    fen, expected = PERFT_POSITIONS[name]
+    model = model_class.from_fen(fen)
+    key = model.zobrist_key
+    for depth, nodes in enumerate(expected[:3], start=1):
+        assert model.perft(depth) == nodes
+    assert model.zobrist_key == key
+
+    counts = model.divide(2)
+    assert len(counts) == expected[0]
+    assert sum(nodes for _, nodes in counts) == expected[1]
+
+
+def test_legal_move_codes_and_promotion_choice():
+    """Packed move lists match the move objects, and a named promotion piece is honored."""
+
+    model = empty_model()
+    model.set_piece(7, 4, King(Player.WHITE))
+    model.set_piece(0, 7, King(Player.BLACK))
+    model.set_piece(1, 0, Pawn(Player.WHITE))
+    assert unpack_moves(model.legal_move_codes()) == model.legal_moves()
+    #every promotion piece is a legal move of its own, and the packed codes keep them apart
+    promotions = [move.uci() for move in model.legal_moves() if move.from_row == 1]
+    assert promotions == ['a7a8q', 'a7a8r', 'a7a8b', 'a7a8n']
+    assert len(set(model.legal_move_codes())) == len(model.legal_moves())
+
+    #naming a promotion piece for a move that does not promote is rejected.
+    assert not model.is_valid_move(Move(7,4,6,4,'Queen'))
+
+    assert model.move(Move(1,0,0,0,'Knight'))
+    assert model.piece_at(0, 0).type() == 'Knight'
+    model.undo()
+    assert model.move(Move(1,0,0,0))
+    assert model.piece_at(0, 0).type() == 'Queen'
+
+
+#BITBOARD BACKEND
+
+
+def test_bitboard_model_agrees_with_list_board():
+    """Playing the same random game on both backends gives the same answers."""
+
+    rng = random.Random(7)
+    plain = ChessModel()
+    bitboard = BitboardChessModel()
+    plain.AI_player = bitboard.AI_player = None
+
+    for _ in range(60):
+        moves = plain.legal_moves()
+        assert as_tuples(moves) == as_tuples(bitboard.legal_moves())
+        if not moves:
+            break
+        move = rng.choice(moves)
+        assert plain.move(move) and bitboard.move(move)
+        for player in Player:
+            assert plain.in_check(player) == bitboard.in_check(player)
+
+    #undo must keep the bitboards in step with the list board.
+    for _ in range(10):
+        bitboard.undo()
+    for row in range(8):
+        for col in range(8):
+            piece = bitboard.piece_at(row, col)
+            bit = 1 << (row * 8 + col)
+            if piece is None:
+                assert not any(bitboard.occupancy(p) & bit for p in Player)
+            else:
+                assert bitboard.bitboard(piece.player, piece.type()) & bit
+
+
+def test_bitboard_model_checks_legality_without_playing_moves(monkeypatch):
+    """The bitboard generator tests pins and checks on the bitboards instead of making each move."""
+
+    fen = PERFT_POSITIONS['pinned-rook'][0]
+    expected = as_tuples(ChessModel.from_fen(fen).legal_moves())
+    played = []
+    monkeypatch.setattr(ChessModel, '_make_move', lambda self, move: played.append(move))
+    assert as_tuples(BitboardChessModel.from_fen(fen).legal_moves()) == expected
+    assert played == []
+
+
+#ZOBRIST HASHING
+
+
+def test_zobrist_key_is_incremental_and_reversible():
+    """The running key matches a full recompute through moves and undos."""
+
+    rng = random.Random(11)
+    model = ChessModel()
+    model.AI_player = None
+    start = model.zobrist_key
+    assert start == hash_board(model.board, Player.WHITE)
+
+    for _ in range(30):
+        moves = model.legal_moves()
+        if not moves:
+            break
+        model.move(rng.choice(moves))
+        assert model.zobrist_key == hash_board(model.board, model.current_player)
+
+    while True:
+        try:
+            model.undo()
+        except UndoException:
+            break
+        assert model.zobrist_key == hash_board(model.board, model.current_player)
+    assert model.zobrist_key == start
+
+
+def test_zobrist_key_identifies_transpositions():
+    """Different move orders reaching the same position share a key."""
+
+    first = ChessModel()
+    second = ChessModel()
+    first.AI_player = second.AI_player = None
+    for move in (Move(7,6,5,5), Move(0,6,2,5), Move(7,1,5,2), Move(0,1,2,2)):
+        first.move(move)
+    for move in (Move(7,1,5,2), Move(0,1,2,2), Move(7,6,5,5), Move(0,6,2,5)):
+        second.move(move)
+    assert first.zobrist_key == second.zobrist_key
+
+    #the same placement with the other side to move hashes differently.
+    second.set_next_player()
+    assert first.zobrist_key != second.zobrist_key
+
+
+#AI SEARCH
+
+
+def empty_model() -> ChessModel:
+    """Create a model with no AI opponent and an empty board."""
+
+    model = ChessModel()
+    model.AI_player = None
+    for row in range(8):
+        for col in range(8):
+            model.set_piece(row, col, None)
+    return model
+
+
+def test_ai_finds_mate_in_one():
+    """A back rank mate is found even though a free knight capture is on offer."""
+
+    model = empty_model()
+    model.set_piece(0, 6, King(Player.BLACK))
+    for col in (5, 6, 7):
+        model.set_piece(1, col, Pawn(Player.BLACK))
+    model.set_piece(7, 6, King(Player.WHITE))
+    model.set_piece(7, 0, Rook(Player.WHITE))
+    model.set_piece(7, 2, Knight(Player.BLACK))
+
+    ai = AI(model, Player.WHITE, max_depth=3, time_limit=None)
+    move = ai.choose_move()
+    assert (move.from_row, move.from_col, move.to_row, move.to_col) == (7, 0, 0, 0)
+
+
+def test_ai_does_not_hang_its_queen():
+    """Taking a pawn defended by a pawn would lose the queen, so the search avoids it."""
+
+    model = empty_model()
+    model.set_piece(0, 4, King(Player.BLACK))
+    model.set_piece(7, 4, King(Player.WHITE))
+    model.set_piece(3, 3, Pawn(Player.BLACK))
+    model.set_piece(2, 2, Pawn(Player.BLACK))
+    model.set_piece(5, 3, Queen(Player.WHITE))
+
+    ai = AI(model, Player.WHITE, max_depth=2, time_limit=None)
+    move = ai.choose_move()
+    assert (move.to_row, move.to_col) != (3, 3)
+
+    #the search takes back every move it tries.
+    assert model.piece_at(5, 3).type() == 'Queen'
+    assert model.current_player == Player.WHITE
+
+
+def test_ai_respects_node_budget():
+    """The node budget stops deeper iterations but a completed move is still returned."""
+
+    model = ChessModel()
+    model.AI_player = None
+    key = model.zobrist_key
+    ai = AI(model, Player.WHITE, time_limit=None, max_nodes=500)
+    move = ai.choose_move()
+    assert as_tuples([move]) <= as_tuples(model.legal_moves())
+    assert ai._search.depth >= 1
+    assert ai._search.nodes <= 500
+    assert model.zobrist_key == key
+
+
+def test_budget_can_cut_the_first_iteration_short():
+    """Once a root move has been scored, the budget stops even the first iteration."""
+
+    model = ChessModel.from_fen('r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w - - 0 1')
+    full = AI(model, Player.WHITE, max_depth=1, time_limit=None)
+    full.choose_move()
+
+    ai = AI(model, Player.WHITE, time_limit=None, max_nodes=50)
+    move = ai.choose_move()
+    assert as_tuples([move]) <= as_tuples(model.legal_moves())
+    assert ai._search.depth == 0
+    assert ai._search.nodes < full._search.nodes
+
+
+def test_move_ordering_searches_fewer_nodes():
+    """Ordering changes how many nodes are visited, not which score is found."""
+
+    results = {}
+    for ordering in (False, True):
+        model = play(SEARCH_POSITIONS['open-center'])
+        ai = AI(model, model.current_player, max_depth=2, time_limit=None)
+        ai._search.ordering = ordering
+        ai.choose_move()
+        results[ordering] = (ai._search.nodes, ai._search.score)
+
+    assert results[True][0] < results[False][0]
+    assert results[True][1] == results[False][1]
+
+
+#TRANSPOSITION TABLE
+
+
+def test_transposition_table_is_bounded_and_round_trips():
+    """Entries are packed into fixed buffers that fit the megabyte budget."""
+
+    tt = TranspositionTable(size_mb=1)
+    assert tt.size == (1 << 20) // 16
+    assert len(tt._keys) == len(tt._data) == tt.size
+
+    key = (1 << 63) | 12345
+    tt.store(key, 5, -250, LOWER, 0x0ABC)
+    assert tt.probe(key) == (5, -250, LOWER, 0x0ABC)
+    assert tt.probe(key ^ 1) is None
+
+    #clearing empties the same buffers rather than allocating new ones.
+    keys = tt._keys
+    tt.clear()
+    assert tt.probe(key) is None and tt._keys is keys
+
+
+def test_transposition_table_replacement_policy():
+    """Deeper entries survive shallower ones until a newer search ages them out."""
+
+    tt = TranspositionTable(size_mb=1)
+    first = 7
+    clash = first + tt.size
+
+    tt.store(first, 6, 10, EXACT)
+    tt.store(clash, 2, 20, UPPER)
+    assert tt.probe(first) == (6, 10, EXACT, 0)
+    assert tt.probe(clash) is None
+
+    tt.new_search()
+    tt.store(clash, 2, 20, UPPER)
+    assert tt.probe(clash) == (2, 20, UPPER, 0)
+    assert tt.probe(first) is None
+
+
+def test_search_with_transposition_table_agrees():
+    """The table saves nodes without changing the result of a fixed depth search."""
+
+    results = {}
+    for size in (0, 1):
+        model = play(SEARCH_POSITIONS['open-center'])
+        ai = AI(model, model.current_player, max_depth=3, time_limit=None, tt_size_mb=size)
+        move = ai.choose_move()
+        results[size] = (ai._search.nodes, ai._search.score, as_tuples([move]))
+
+    assert results[1][0] < results[0][0]
+    assert results[1][1:] == results[0][1:]
+
+
+#FEN
+
+
+def test_fen_round_trips_and_counts_moves():
+    """FEN loads and writes positions, and the move counters follow the game."""
+
+    model = ChessModel.from_fen(START_FEN)
+    assert model.to_fen() == START_FEN
+    assert model.zobrist_key == ChessModel().zobrist_key
+
+    for move in (Move(7,6,5,5), Move(0,6,2,5), Move(6,4,4,4)):
+        model.move(move)
+    assert model.to_fen() == 'rnbqkb1r/pppppppp/5n2/8/4P3/5N2/PPPP1PPP/RNBQKB1R b - - 0 2'
+
+    fen = '8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 b - - 12 40'
+    model.load_fen(fen)
+    assert model.to_fen() == fen and model.move_history == []
+    assert model.zobrist_key == hash_board(model.board, Player.BLACK)
+    model.move(Move(4,7,3,6))
+    assert model.to_fen().endswith(' w - - 13 41')
+
+    for bad in ('8/8/8 w - - 0 1', 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNX w', START_FEN.replace(' w ', ' x ')):
+        with pytest.raises(ValueError):
+            ChessModel.from_fen(bad)
+
+
+def test_fen_round_trips_through_the_bitboard_model():
+    """The bitboard backend loads FEN through the shared classmethod and keeps its bitboards in step."""
+
+    fen = '8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 b - - 12 40'
+    model = BitboardChessModel.from_fen(fen)
+    assert isinstance(model, BitboardChessModel) and model.AI_player is None
+    assert model.to_fen() == fen
+    assert model.bitboard(Player.WHITE, 'Rook') == 1 << (4 * 8 + 1)
+    assert model.in_check(Player.BLACK) == ChessModel.from_fen(fen).in_check(Player.BLACK)
+
+
+def test_bulk_fen_loader_reuses_one_model():
+    """The bulk loader streams every record through the same model instance."""
+
+    lines = ['# perft positions', START_FEN, '', '8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1']
+    seen = [(id(model), len(model.legal_moves())) for model in iter_fen_positions(lines)]
+    assert [count for _, count in seen] == [20, 14]
+    assert seen[0][0] == seen[1][0]
+
+
+#PGN
+
+
+def test_san_disambiguates_and_marks_check():
+    """SAN names the moving piece's file or rank when needed and marks checks and promotions."""
+
+    model = ChessModel.from_fen('k7/4P3/8/8/8/8/4K3/1R5R w - - 0 1')
+    assert move_to_san(model, Move(7,1,7,3)) == 'Rbd1'
+    assert move_to_san(model, Move(7,1,0,1)) == 'Rb8+'
+    assert move_to_san(model, Move(1,4,0,4)) == 'e8=Q+'
+    assert move_to_san(model, Move(1,4,0,4,'Knight')) == 'e8=N'
+    assert san_to_move(model, 'Rhf1') == Move(7,7,7,5)
+    assert san_to_move(model, 'e8=N') == Move(1,4,0,4,'Knight')
+    for bad in ('Rd1', 'O-O', 'Nf3', 'Ra1=Q'):
+        with pytest.raises(ValueError):
+            san_to_move(model, bad)
+
+
+def test_pgn_export_and_streaming_reader_round_trip():
+    """Exported games read back into one reused model, skipping comments and variations."""
+
+    model = ChessModel(ai_player=None)
+    for move in (Move(6,5,5,5), Move(1,4,3,4), Move(6,6,4,6), Move(0,3,4,7)):
+        model.move(move)
+    text = game_to_pgn(model, {'White': 'Fool'})
+    assert '[White "Fool"]' in text and '[Result "0-1"]' in text
+    assert text.endswith('1. f3 e5 2. g4 Qh4# 0-1\n')
+
+    archive = text + '''
+[Event "annotated"]
+1. e4 {a comment
+that runs on} e5 (1... c5 2. Nf3) 2. Nf3 $1 Nc6 ; rest of line
+3. Bc4 *
+
+[Event "castles"]
+1. e4 e5 2. Nf3 Nc6 3. Bc4 Nf6 4. O-O 1-0
+'''
+    games = [(tags['Event'], tags['Result'], game.to_fen(), id(game))
+             for tags, game in read_games(io.StringIO(archive), skip_invalid=True)]
+    assert [(event, result) for event, result, _, _ in games] == [('?', '0-1'), ('annotated', '*')]
+    assert games[0][2] == model.to_fen()
+    assert games[1][2] == 'r1bqkbnr/pppp1ppp/2n5/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R b - - 3 3'
+    assert games[0][3] == games[1][3]
+
+    with pytest.raises(ValueError):
+        list(read_games(io.StringIO(archive)))
+
+
+#OPENING BOOK
+
+
+def test_opening_book_build_probe_and_ai(tmp_path):
+    """Books are sorted on disk, searched in place and played by the AI without searching."""
+
+    builder = BookBuilder(max_plies=2)
+    assert builder.add_move_lists(['# openings', 'h2h4 e7e5 g1f3', 'h2h4 d7d5', 'e2e4 e7e5']) == 3
+    assert builder.add_pgn(io.StringIO('1. h4 e5 2. Nf3 *\n')) == 1
+    path = str(tmp_path / 'book.bin')
+    assert builder.write(path) == 5
+
+    with OpeningBook(path) as book:
+        start = ChessModel(ai_player=None)
+        assert sorted((move.uci(), weight) for move, weight in book.entries(start.zobrist_key)) == [
+            ('e2e4', 1), ('h2h4', 3)]
+        assert book.choose(start.zobrist_key) == Move.from_uci('h2h4')
+        assert book.choose(12345) is None
+        assert pickle.loads(pickle.dumps(book)).size == book.size == 5
+
+        ai = AI(start, Player.WHITE, time_limit=None, max_depth=2, book=book)
+        assert ai.choose_move() == Move.from_uci('h2h4') and ai._search.nodes == 0
+        start.move(Move.from_uci('a2a3'))
+        start.move(Move.from_uci('a7a6'))
+        assert ai.choose_move() is not None and ai._search.nodes > 0
+
+
+#EVALUATION
+
+
+def test_evaluation_is_kept_incrementally():
+    """Moves, undos and FEN loads keep the score equal to a full rescan of the board."""
+
+    rng = random.Random(7)
+    for model in (ChessModel(ai_player=None), BitboardChessModel()):
+        assert model.evaluate() == 0 and model._phase == PHASE_TOTAL
+        for _ in range(40):
+            moves = model.legal_moves()
+            if not moves:
+                break
+            model._make_move(rng.choice(moves))
+            white_score = model.evaluate() if model.current_player == Player.WHITE else -model.evaluate()
+            assert white_score == evaluate_board(model.board)
+        while model.move_history:
+            model.undo()
+        assert model.evaluate() == 0
+
+    model = ChessModel.from_fen('4k3/8/8/8/8/8/PPP5/4K3 w - - 0 1')
+    assert model.evaluate() == evaluate_board(model.board) > 0
+    #the same position with colours swapped scores the same for the side to move
+    mirrored = ChessModel.from_fen('4k3/ppp5/8/8/8/8/8/4K3 b - - 0 1')
+    assert mirrored.evaluate() == model.evaluate()
+
+
+def test_evaluation_tapers_to_the_endgame():
+    """Pushed pawns gain more once the pieces are off, and kings head for the centre."""
+
+    middlegame = ChessModel.from_fen('rnbqkbnr/pppppppp/8/8/8/P7/1PPPPPPP/RNBQKBNR b - - 0 1')
+    pushed = ChessModel.from_fen('rnbqkbnr/pppppppp/P7/8/8/8/1PPPPPPP/RNBQKBNR b - - 0 1')
+    endgame = ChessModel.from_fen('4k3/8/8/8/8/P7/8/4K3 b - - 0 1')
+    pushed_endgame = ChessModel.from_fen('4k3/8/P7/8/8/8/8/4K3 b - - 0 1')
+    assert endgame.evaluate() - pushed_endgame.evaluate() > middlegame.evaluate() - pushed.evaluate()
+
+    corner = ChessModel.from_fen('4k3/8/8/8/8/8/8/K7 w - - 0 1')
+    centre = ChessModel.from_fen('4k3/8/8/8/3K4/8/8/8 w - - 0 1')
+    assert centre.evaluate() > corner.evaluate()
+
+
+#BATCH EVALUATION
+
+
+def test_batch_evaluation_matches_the_models():
+    """Vectorised scores and attack maps agree with the scalar engine on every position."""
+
+    np = pytest.importorskip('numpy')
+    import batch_eval
+
+    fens = random_fens(60, seed=3)
+    positions, to_move = batch_eval.encode_fens(fens)
+    assert positions.shape == (60, 8, 8) and positions.dtype == np.int8
+    scores = batch_eval.evaluate(positions, to_move)
+    counts = batch_eval.attack_counts(positions)
+    model = BitboardChessModel()
+    for i, fen in enumerate(fens):
+        model.load_fen(fen)
+        assert scores[i] == model.evaluate()
+        for side, player in enumerate(batch_eval.SIDES):
+            attacked = [model.is_attacked(sq, player) for sq in range(64)]
+            assert (counts[i, side] > 0).ravel().tolist() == attacked
+        player = Player.WHITE if to_move[i] == 1 else Player.BLACK
+        assert batch_eval.to_model(positions[i], player).to_fen().split()[:2] == fen.split()[:2]
+        assert batch_eval.decode_board(positions[i]) == model.board
+
+    start, _ = batch_eval.encode_models([ChessModel(ai_player=None)])
+    assert (start[0] == batch_eval.encode_board(ChessModel(ai_player=None).board)).all()
+    assert start[0, 7].tolist() == [ROOK, KNIGHT, BISHOP, QUEEN, KING, BISHOP, KNIGHT, ROOK]
+    assert start[0, 0, 4] == -KING
+    #d2 is covered by the queen, king, bishop and knight, the e-pawn's square by four pieces too
+    assert counts.dtype == np.uint8
+    assert batch_eval.attack_counts(start)[0, 0, 6].tolist() == [1, 1, 1, 4, 4, 1, 1, 1]
+    assert batch_eval.material(start).tolist() == [0]
+    assert batch_eval.game_phase(start).tolist() == [PHASE_TOTAL]
+
+
+def test_batch_encodes_every_position_of_a_game_archive():
+    """Archives unpack into one row per position."""
+
+    pytest.importorskip('numpy')
+    import batch_eval
+
+    archive = '[Event "a"]\n\n1. e4 e5 2. Nf3 *\n\n[Event "b"]\n\n1. d4 1-0\n'
+    positions, to_move = batch_eval.encode_games(io.StringIO(archive))
+    assert positions.shape == (6, 8, 8)
+    assert to_move.tolist() == [1, -1, 1, -1, 1, -1]
+    assert positions[3, 3, 4] == -PAWN and positions[5, 4, 3] == PAWN
+
+
+#TABLEBASE
+
+
+@pytest.fixture(scope='module')
+def tablebase(tmp_path_factory):
+    """Solve every ending once for the tablebase tests."""
+
+    directory = str(tmp_path_factory.mktemp('tablebase'))
+    generate_all(directory)
+    with Tablebase(directory) as tables:
+        yield tables
+
+
+def test_tablebase_scores_endings(tablebase):
+    """Tables give the known longest mates and score positions for either colour."""
+
+    assert tablebase.endings == ('KQK', 'KRK', 'KPK')
+    longest = {}
+    for name in tablebase.endings:
+        with open(f'{tablebase.directory}/{name}.tb', 'rb') as f:
+            table = f.read()
+        assert len(table) == TABLE_SIZE
+        longest[name] = max(table[:TABLE_SIZE // 2]) - 1
+    #mate in 10 with a queen, 16 with a rook and 28 with a pawn, counted in plies
+    assert longest == {'KQK': 19, 'KRK': 31, 'KPK': 55}
+
+    assert tablebase.probe(ChessModel.from_fen('k7/8/1K6/8/8/8/8/7R w - - 0 1')) == (WIN, 1)
+    assert tablebase.probe(ChessModel.from_fen('k7/8/1K6/8/8/8/8/7R b - - 0 1')) == (LOSS, 2)
+    assert tablebase.probe(ChessModel.from_fen('4k3/8/8/4K3/4P3/8/8/8 b - - 0 1')) == (DRAW, 0)
+    #the same ending with colours swapped scores the same
+    assert tablebase.probe(ChessModel.from_fen('4k3/8/4K3/4P3/8/8/8/8 b - - 0 1')) == \
+        tablebase.probe(ChessModel.from_fen('8/8/8/8/4p3/4k3/8/4K3 w - - 0 1'))
+    assert tablebase.probe(ChessModel.from_fen('k7/8/1K6/8/8/8/8/6RR w - - 0 1')) is None
+    assert tablebase.probe(ChessModel.from_fen('k7/8/1K6/8/8/8/8/8 w - - 0 1')) == (DRAW, 0)
+    assert pickle.loads(pickle.dumps(tablebase)).endings == tablebase.endings
+
+
+def test_tablebase_play_mates_in_announced_plies(tablebase):
+    """Both sides playing table moves reach mate in exactly the announced number of plies."""
+
+    for fen in ('7k/8/8/8/8/8/P7/K7 w - - 0 1', '8/8/3k4/8/8/8/7r/K7 b - - 0 1',
+                '8/8/8/8/4q3/8/2k5/K7 w - - 0 1'):
+        model = ChessModel.from_fen(fen)
+        outcome, plies = tablebase.probe(model)
+        assert outcome != DRAW
+        for _ in range(plies):
+            model._make_move(tablebase.best_move(model))
+        assert model.is_complete() and model.in_check(model.current_player), fen
+
+
+def test_ai_plays_tablebase_moves_without_searching(tablebase):
+    """The AI takes the fastest mate from the tables instead of searching."""
+
+    model = ChessModel.from_fen('k7/8/1K6/8/8/8/8/7R w - - 0 1')
+    ai = AI(model, Player.WHITE, time_limit=None, max_depth=2, tablebase=tablebase)
+    assert ai.choose_move() == Move.from_uci('h1h8') and ai._search.nodes == 0
+
+
+#BACKGROUND AI
+
+
+def test_model_copy_is_independent():
+    """Moves on a copy leave the original game untouched, and the copy has no AI."""
+
+    model = play(SEARCH_POSITIONS['open-center'])
+    clone = model.copy()
+    assert clone.AI_player is None
+    assert clone.zobrist_key == model.zobrist_key
+    assert clone.move_history == model.move_history
+
+    clone.move(clone.legal_moves()[0])
+    clone.undo()
+    clone.undo()
+    assert model.zobrist_key == hash_board(model.board, model.current_player)
+    assert len(model.move_history) == len(SEARCH_POSITIONS['open-center'])
+
+    bitboard = BitboardChessModel()
+    bitboard_clone = bitboard.copy()
+    bitboard_clone.move(Move(6,4,4,4))
+    assert bitboard.bitboard(Player.WHITE, 'Pawn') != bitboard_clone.bitboard(Player.WHITE, 'Pawn')
+
+
+def test_ai_worker_posts_moves_and_cancels():
+    """The worker searches a copy in the background and stays quiet once cancelled."""
+
+    model = play(SEARCH_POSITIONS['open-center'])
+    model.ai_autoplay = False
+    woken = threading.Event()
+    worker = AIWorker(notify=woken.set, max_depth=2, time_limit=None)
+    worker.start(model)
+    assert woken.wait(timeout=30)
+    key, move = worker.poll()
+    assert key == model.zobrist_key
+    assert model.is_valid_move(move)
+
+    #the next turn reuses the same AI and its table on a fresh copy of the game.
+    ai = worker._ai
+    model.move(move)
+    woken.clear()
+    worker.start(model)
+    assert woken.wait(timeout=30)
+    key, move = worker.poll()
+    assert worker._ai is ai and ai._model is not model
+    assert key == model.zobrist_key
+    assert model.is_valid_move(move)
+
+    #a search stopped straight away never reports a move.
+    worker = AIWorker(time_limit=None)
+    worker.start(model)
+    worker.cancel()
+    assert not worker.busy
+    assert worker.poll() is None
+    assert worker._ai._search.stopped
+    worker.start(model)
+    assert not worker._ai._search.stopped
+    worker.cancel()
+
+
+#TOURNAMENT
+
+
+def test_move_coordinate_notation_round_trips():
+    """Coordinate notation names files a-h and counts ranks up from white's side."""
+
+    assert Move(6,4,4,4).uci() == 'e2e4'
+    assert Move(1,0,0,0,'Knight').uci() == 'a7a8n'
+    assert Move.from_uci('a7a8n') == Move(1,0,0,0,'Knight')
+    with pytest.raises(ValueError):
+        Move.from_uci('e2e9')
+
+
+def test_self_play_game_and_tournament():
+    """Games end with a scored result, and the pool streams every game of the match."""
+
+    record = play_game(0, ('A', {'max_depth': 1, 'time_limit': None}),
+                       ('B', {'max_depth': 1, 'time_limit': None}), max_plies=20, random_plies=2)
+    assert record['plies'] == len(record['moves']) == len(record['move_seconds']) <= 20
+    assert record['result'] in RESULT_POINTS
+
+    engines = {'A': {'max_depth': 1, 'time_limit': None}, 'B': {'max_depth': 1, 'time_limit': None}}
+    records = list(run_tournament(engines, 2, workers=1, max_plies=10))
+    assert sorted((r['game'], r['white']) for r in records) == [(0, 'A'), (1, 'B')]
+    summary = summarize(records, 1.0)
+    assert summary['games'] == 2
+    assert sum(row['points'] for row in summary['engines'].values()) == 2.0
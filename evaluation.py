@@ -0,0 +1,213 @@
+from bishop import Bishop
+from chess_piece import BISHOP, KING, KNIGHT, PAWN, QUEEN, ROOK, ChessPiece
+from king import King
+from knight import Knight
+from pawn import Pawn
+from player import Player
+from queen import Queen
+from rook import Rook
+
+#middlegame and endgame halves of a score share one integer, the endgame half above this bit
+SCORE_SHIFT = 32
+_HALF = 1 << SCORE_SHIFT - 1
+_MASK = (1 << SCORE_SHIFT) - 1
+
+#game phase each piece is worth, summing to PHASE_TOTAL with every piece on the board
+PHASE_WEIGHTS = (0, 0, 1, 1, 2, 4, 0)
+PHASE_TOTAL = 24
+
+#piece values in centipawns for the middlegame and the endgame, by type code
+MIDDLEGAME_VALUES = (0, 82, 337, 365, 477, 1025, 0)
+ENDGAME_VALUES = (0, 94, 281, 297, 512, 936, 0)
+
+#bonuses in centipawns for white pieces, laid out as the board is printed with rank 8 first
+_PAWN_MIDDLEGAME = (
+    0, 0, 0, 0, 0, 0, 0, 0,
+    50, 50, 50, 50, 50, 50, 50, 50,
+    10, 10, 20, 30, 30, 20, 10, 10,
+    5, 5, 10, 25, 25, 10, 5, 5,
+    0, 0, 0, 20, 20, 0, 0, 0,
+    5, -5, -10, 0, 0, -10, -5, 5,
+    5, 10, 10, -20, -20, 10, 10, 5,
+    0, 0, 0, 0, 0, 0, 0, 0,
+)
+_PAWN_ENDGAME = (
+    0, 0, 0, 0, 0, 0, 0, 0,
+    80, 80, 80, 80, 80, 80, 80, 80,
+    50, 50, 50, 50, 50, 50, 50, 50,
+    30, 30, 30, 30, 30, 30, 30, 30,
+    15, 15, 15, 15, 15, 15, 15, 15,
+    5, 5, 5, 5, 5, 5, 5, 5,
+    0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0,
+)
+_KNIGHT = (
+    -50, -40, -30, -30, -30, -30, -40, -50,
+    -40, -20, 0, 0, 0, 0, -20, -40,
+    -30, 0, 10, 15, 15, 10, 0, -30,
+    -30, 5, 15, 20, 20, 15, 5, -30,
+    -30, 0, 15, 20, 20, 15, 0, -30,
+    -30, 5, 10, 15, 15, 10, 5, -30,
+    -40, -20, 0, 5, 5, 0, -20, -40,
+    -50, -40, -30, -30, -30, -30, -40, -50,
+)
+_BISHOP = (
+    -20, -10, -10, -10, -10, -10, -10, -20,
+    -10, 0, 0, 0, 0, 0, 0, -10,
+    -10, 0, 5, 10, 10, 5, 0, -10,
+    -10, 5, 5, 10, 10, 5, 5, -10,
+    -10, 0, 10, 10, 10, 10, 0, -10,
+    -10, 10, 10, 10, 10, 10, 10, -10,
+    -10, 5, 0, 0, 0, 0, 5, -10,
+    -20, -10, -10, -10, -10, -10, -10, -20,
+)
+_ROOK = (
+    0, 0, 0, 0, 0, 0, 0, 0,
+    5, 10, 10, 10, 10, 10, 10, 5,
+    -5, 0, 0, 0, 0, 0, 0, -5,
+    -5, 0, 0, 0, 0, 0, 0, -5,
+    -5, 0, 0, 0, 0, 0, 0, -5,
+    -5, 0, 0, 0, 0, 0, 0, -5,
+    -5, 0, 0, 0, 0, 0, 0, -5,
+    0, 0, 0, 5, 5, 0, 0, 0,
+)
+_QUEEN = (
+    -20, -10, -10, -5, -5, -10, -10, -20,
+    -10, 0, 0, 0, 0, 0, 0, -10,
+    -10, 0, 5, 5, 5, 5, 0, -10,
+    -5, 0, 5, 5, 5, 5, 0, -5,
+    0, 0, 5, 5, 5, 5, 0, -5,
+    -10, 5, 5, 5, 5, 5, 0, -10,
+    -10, 0, 5, 0, 0, 0, 0, -10,
+    -20, -10, -10, -5, -5, -10, -10, -20,
+)
+_KING_MIDDLEGAME = (
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -20, -30, -30, -40, -40, -30, -30, -20,
+    -10, -20, -20, -20, -20, -20, -20, -10,
+    20, 20, 0, 0, 0, 0, 20, 20,
+    20, 30, 10, 0, 0, 10, 30, 20,
+)
+_KING_ENDGAME = (
+    -50, -40, -30, -20, -20, -30, -40, -50,
+    -30, -20, -10, 0, 0, -10, -20, -30,
+    -30, -10, 20, 30, 30, 20, -10, -30,
+    -30, -10, 30, 40, 40, 30, -10, -30,
+    -30, -10, 30, 40, 40, 30, -10, -30,
+    -30, -10, 20, 30, 30, 20, -10, -30,
+    -30, -30, 0, 0, 0, 0, -30, -30,
+    -50, -30, -30, -30, -30, -30, -30, -50,
+)
+
+#middlegame and endgame square tables by type code, pieces other than pawns and kings share one
+PIECE_SQUARE_TABLES = {
+    PAWN: (_PAWN_MIDDLEGAME, _PAWN_ENDGAME),
+    KNIGHT: (_KNIGHT, _KNIGHT),
+    BISHOP: (_BISHOP, _BISHOP),
+    ROOK: (_ROOK, _ROOK),
+    QUEEN: (_QUEEN, _QUEEN),
+    KING: (_KING_MIDDLEGAME, _KING_ENDGAME),
+}
+
+
+def pack_score(middlegame: int, endgame: int) -> int:
+    """Combine middlegame and endgame scores into one integer that adds like a score.
+
+    Args:
+        middlegame (int): Middlegame score in centipawns.
+        endgame (int): Endgame score in centipawns.
+
+    Returns:
+        int: The packed score.
+    """
+    return (endgame << SCORE_SHIFT) + middlegame
+
+
+def unpack_score(score: int) -> tuple[int, int]:
+    """Split a packed score back into its middlegame and endgame halves.
+
+    Args:
+        score (int): A packed score, or a sum of them.
+
+    Returns:
+        tuple[int, int]: The middlegame and endgame scores in centipawns.
+    """
+    middlegame = ((score + _HALF) & _MASK) - _HALF
+    return middlegame, (score - middlegame) >> SCORE_SHIFT
+
+
+def _square_scores(player: Player, code: int) -> tuple[int, ...]:
+    """Build the packed score of a piece on every square, positive for white.
+
+    Args:
+        player (Player): Owner of the piece.
+        code (int): Type code of the piece.
+
+    Returns:
+        tuple[int, ...]: Packed scores indexed by ''row * 8 + col''.
+    """
+    middlegame, endgame = PIECE_SQUARE_TABLES[code]
+    #black's tables are white's turned upside down, and count against white
+    flip, sign = (0, 1) if player == Player.WHITE else (56, -1)
+    return tuple(sign * pack_score(MIDDLEGAME_VALUES[code] + middlegame[sq ^ flip],
+                                   ENDGAME_VALUES[code] + endgame[sq ^ flip])
+                 for sq in range(64))
+
+
+#keyed by the flyweight pieces themselves, which hash far faster than player and code pairs
+PIECE_SCORES = {piece_class(player): _square_scores(player, piece_class.code)
+                for piece_class in (Pawn, Knight, Bishop, Rook, Queen, King) for player in Player}
+
+
+def piece_score(piece: ChessPiece, row: int, col: int) -> int:
+    """Return the packed score a piece standing on a square adds to the position.
+
+    Args:
+        piece (ChessPiece): The piece on the square.
+        row (int): Row index of the square.
+        col (int): Column index of the square.
+
+    Returns:
+        int: The packed score, positive for white, or ''0'' for pieces that are not
+        standard chess pieces.
+    """
+    scores = PIECE_SCORES.get(piece)
+    if scores is None:
+        return 0
+    return scores[row * 8 + col]
+
+
+def taper(score: int, phase: int) -> int:
+    """Blend a packed score between its middlegame and endgame halves.
+
+    Args:
+        score (int): Packed score of the position.
+        phase (int): Sum of ''PHASE_WEIGHTS'' over the pieces on the board.
+
+    Returns:
+        int: The score in centipawns, positive when white is better.
+    """
+    middlegame, endgame = unpack_score(score)
+    phase = min(phase, PHASE_TOTAL)
+    return (middlegame * phase + endgame * (PHASE_TOTAL - phase)) // PHASE_TOTAL
+
+
+def evaluate_board(board: list[list[ChessPiece | None]]) -> int:
+    """Score a board from scratch, as a check on the incrementally kept score.
+
+    Args:
+        board (list[list[ChessPiece | None]]): The board to score.
+
+    Returns:
+        int: The tapered score in centipawns, positive when white is better.
+    """
+    score = phase = 0
+    for row, pieces in enumerate(board):
+        for col, piece in enumerate(pieces):
+            if piece is not None:
+                score += piece_score(piece, row, col)
+                phase += PHASE_WEIGHTS[piece.code]
+    return taper(score, phase)
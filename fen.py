@@ -0,0 +1,97 @@
+from bishop import Bishop
+from chess_piece import ChessPiece
+from king import King
+from knight import Knight
+from pawn import Pawn
+from player import Player
+from queen import Queen
+from rook import Rook
+
+#the engine has no castling or en passant, so those fields are always written as '-'
+START_FEN = 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w - - 0 1'
+
+PIECE_LETTERS = {'p': Pawn, 'n': Knight, 'b': Bishop, 'r': Rook, 'q': Queen, 'k': King}
+CODE_LETTERS = {piece_class.code: letter for letter, piece_class in PIECE_LETTERS.items()}
+
+#every piece a placement field can name, built once and shared as flyweights
+_LETTER_PIECES = {letter: piece_class(Player.WHITE if letter.isupper() else Player.BLACK)
+                  for piece_letter, piece_class in PIECE_LETTERS.items()
+                  for letter in (piece_letter, piece_letter.upper())}
+
+
+def parse_fen(fen: str) -> tuple[list[list[ChessPiece | None]], Player, int, int]:
+    """Split a FEN record into a board, the side to move and the move counters.
+
+    The castling and en passant fields are accepted and ignored. Missing move counters
+    default to ''0'' and ''1'', so four-field EPD positions load as well.
+
+    Args:
+        fen (str): The FEN record.
+
+    Returns:
+        tuple[list[list[ChessPiece | None]], Player, int, int]: Rows of pieces from black's
+        back rank down, the side to move, the halfmove clock and the fullmove number.
+
+    Raises:
+        ValueError: If the record is not valid FEN.
+    """
+    fields = fen.split()
+    if len(fields) < 2:
+        raise ValueError(f'FEN needs a placement and a side to move: {fen!r}')
+    if fields[1] not in ('w', 'b'):
+        raise ValueError(f'FEN side to move must be w or b: {fen!r}')
+
+    ranks = fields[0].split('/')
+    if len(ranks) != 8:
+        raise ValueError(f'FEN placement needs 8 ranks: {fen!r}')
+    rows = []
+    for rank in ranks:
+        row = []
+        for char in rank:
+            if char in '12345678':
+                row.extend([None] * int(char))
+            elif char in _LETTER_PIECES:
+                row.append(_LETTER_PIECES[char])
+            else:
+                raise ValueError(f'unknown piece {char!r} in FEN: {fen!r}')
+        if len(row) != 8:
+            raise ValueError(f'FEN rank {rank!r} does not cover 8 squares')
+        rows.append(row)
+
+    halfmove = int(fields[4]) if len(fields) > 4 and fields[4].isdigit() else 0
+    fullmove = int(fields[5]) if len(fields) > 5 and fields[5].isdigit() else 1
+    player = Player.WHITE if fields[1] == 'w' else Player.BLACK
+    return rows, player, halfmove, fullmove
+
+
+def format_placement(board: list[list[ChessPiece | None]]) -> str:
+    """Write the piece placement field of a FEN record.
+
+    Args:
+        board (list[list[ChessPiece | None]]): Rows of pieces from black's back rank down.
+
+    Returns:
+        str: The placement field, ranks separated by ''/''.
+
+    Raises:
+        ValueError: If the board holds a piece outside the standard set.
+    """
+    ranks = []
+    for row in board:
+        rank = ''
+        empty = 0
+        for piece in row:
+            if piece is None:
+                empty += 1
+                continue
+            letter = CODE_LETTERS.get(piece.code)
+            if letter is None:
+                raise ValueError(f'{piece} has no FEN letter')
+            if empty:
+                rank += str(empty)
+                empty = 0
+            rank += letter.upper() if piece.player == Player.WHITE else letter
+        if empty:
+            rank += str(empty)
+        ranks.append(rank)
+    return '/'.join(ranks)
@@ -1,4 +1,5 @@
-from chess_piece import ChessPiece
+from attack_tables import KING_TARGETS
+from chess_piece import KING, ChessPiece
 from move import Move
 
 class King(ChessPiece):
@@ -7,13 +8,8 @@ class King(ChessPiece):
     Attributes:
         player (Player): Owner of the King.
     """
-    def __init__(self, player):
-        """Initialize a king chess piece.
-
-        Args:
-            player (Player): Owner of the king.
-        """
-        super().__init__(player)
+    __slots__ = ()
+    code = KING
 
     def __str__(self) -> str:
         """Returns the readable name of the king.
@@ -46,4 +42,17 @@ class King(ChessPiece):
 
         dr = abs(move.to_row - move.from_row)
         dc = abs(move.to_col - move.from_col)
-        return max(dr, dc) == 1
\ No newline at end of file
+        return max(dr, dc) == 1
+
+    def possible_moves(self, row: int, col: int, board: list[list[ChessPiece]]):
+        """Yield the pseudo-legal moves for a king standing on the given square.
+
+        Args:
+            row (int): Row index the king stands on.
+            col (int): Column index the king stands on.
+            board (list[list[ChessPiece]]): The current board state.
+
+        Yields:
+            Move: Each single step onto an empty or enemy square.
+        """
+        yield from self._step_moves(row, col, board, KING_TARGETS[row][col])
@@ -1,4 +1,5 @@
-from chess_piece import ChessPiece
+from attack_tables import KNIGHT_TARGETS
+from chess_piece import KNIGHT, ChessPiece
 from move import Move
 
 class Knight(ChessPiece):
@@ -7,13 +8,8 @@ class Knight(ChessPiece):
     Attributes:
         player (Player): Owner of the Knight.
     """
-    def __init__(self, player):
-        """Initialize a knight chess piece.
-
-        Args:
-            player (Player): Owner of the knight.
-        """
-        super().__init__(player)
+    __slots__ = ()
+    code = KNIGHT
 
     def __str__(self) -> str:
         """Return the readable name of the knight.
@@ -44,6 +40,17 @@ class Knight(ChessPiece):
         if not super().is_valid_move(move, board):
             return False
 
-        dr = abs(move.to_row - move.from_row)
-        dc = abs(move.to_col - move.from_col)
-        return (dr, dc) in {(2, 1), (1, 2)}
\ No newline at end of file
+        return (move.to_row, move.to_col) in KNIGHT_TARGETS[move.from_row][move.from_col]
+
+    def possible_moves(self, row: int, col: int, board: list[list[ChessPiece]]):
+        """Yield the pseudo-legal moves for a knight standing on the given square.
+
+        Args:
+            row (int): Row index the knight stands on.
+            col (int): Column index the knight stands on.
+            board (list[list[ChessPiece]]): The current board state.
+
+        Yields:
+            Move: Each L shaped jump onto an empty or enemy square.
+        """
+        yield from self._step_moves(row, col, board, KNIGHT_TARGETS[row][col])
@@ -1,5 +1,34 @@
+from array import array
+
+#promotion piece stored in the top four bits of a packed move, 0 means none
+PROMOTION_CODES = {None: 0, 'Knight': 1, 'Bishop': 2, 'Rook': 3, 'Queen': 4}
+PROMOTION_NAMES = {code: name for name, code in PROMOTION_CODES.items()}
+
+#coordinate notation: files a-h are columns 0-7 and rank 8 is row 0
+FILES = 'abcdefgh'
+PROMOTION_LETTERS = {'Knight': 'n', 'Bishop': 'b', 'Rook': 'r', 'Queen': 'q'}
+LETTER_PROMOTIONS = {letter: name for name, letter in PROMOTION_LETTERS.items()}
+
+#pieces a pawn may promote to, strongest first so move ordering tries the queen first
+PROMOTION_TYPES = ('Queen', 'Rook', 'Bishop', 'Knight')
+
 class Move:
-    def __init__(self, from_row, from_col, to_row, to_col):
+    """A move from one square to another.
+
+    Moves compare and hash by value, and pack into a 16-bit integer: the from-square
+    in bits 0-5, the to-square in bits 6-11 and the promotion piece in bits 12-15,
+    with squares numbered ''row * 8 + col''.
+
+    Attributes:
+        from_row (int): Starting index row.
+        from_col (int): Starting index column.
+        to_row (int): Destination row index.
+        to_col (int): Destination column index.
+        promotion (str | None): Piece type a pawn promotes to, or ''None'' for the default queen.
+    """
+    __slots__ = ('from_row', 'from_col', 'to_row', 'to_col', 'promotion')
+
+    def __init__(self, from_row, from_col, to_row, to_col, promotion=None):
         """Initialize a move description.
 
         Args:
@@ -7,11 +36,91 @@ class Move:
             from_col (int): Starting index column.
             to_row (int): Destination row index.
             to_col (int): Destination column index.
+            promotion (str | None): Piece type to promote to. Defaults to None.
         """
         self.from_row = from_row
         self.from_col = from_col
         self.to_row = to_row
         self.to_col = to_col
+        self.promotion = promotion
+
+    def __eq__(self, other):
+        """Compare two moves by their squares and promotion.
+
+        Args:
+            other (object): The object to compare with.
+
+        Returns:
+            bool: ''True'' if both moves describe the same move.
+        """
+        if not isinstance(other, Move):
+            return NotImplemented
+        return (self.from_row == other.from_row and self.from_col == other.from_col and
+                self.to_row == other.to_row and self.to_col == other.to_col and
+                self.promotion == other.promotion)
+
+    def __hash__(self):
+        """Hash the move by its packed form.
+
+        Returns:
+            int: The packed 16-bit move.
+        """
+        return self.pack()
+
+    def pack(self) -> int:
+        """Pack the move into a 16-bit integer.
+
+        Returns:
+            int: The packed move.
+        """
+        return ((self.from_row * 8 + self.from_col) | (self.to_row * 8 + self.to_col) << 6
+                | PROMOTION_CODES[self.promotion] << 12)
+
+    @classmethod
+    def unpack(cls, code: int) -> 'Move':
+        """Build a move from its packed 16-bit form.
+
+        Args:
+            code (int): A value returned by ''pack''.
+
+        Returns:
+            Move: The move the code describes.
+        """
+        from_sq = code & 0x3F
+        to_sq = (code >> 6) & 0x3F
+        return cls(from_sq >> 3, from_sq & 7, to_sq >> 3, to_sq & 7, PROMOTION_NAMES[code >> 12])
+
+    def uci(self) -> str:
+        """Write the move in coordinate notation, such as ''"e2e4"'' or ''"a7a8q"''.
+
+        Returns:
+            str: The from and to squares followed by the promotion letter, if any.
+        """
+        text = (f'{FILES[self.from_col]}{8 - self.from_row}'
+                f'{FILES[self.to_col]}{8 - self.to_row}')
+        if self.promotion is not None:
+            text += PROMOTION_LETTERS[self.promotion]
+        return text
+
+    @classmethod
+    def from_uci(cls, text: str) -> 'Move':
+        """Read a move written in coordinate notation.
+
+        Args:
+            text (str): Move such as ''"e2e4"'' or ''"a7a8q"''.
+
+        Returns:
+            Move: The move the text describes.
+
+        Raises:
+            ValueError: If the text is not a move in coordinate notation.
+        """
+        if (len(text) not in (4, 5) or text[0] not in FILES or text[2] not in FILES
+                or text[1] not in '12345678' or text[3] not in '12345678'
+                or (len(text) == 5 and text[4] not in LETTER_PROMOTIONS)):
+            raise ValueError(f'not a coordinate move: {text!r}')
+        promotion = LETTER_PROMOTIONS[text[4]] if len(text) == 5 else None
+        return cls(8 - int(text[1]), FILES.index(text[0]), 8 - int(text[3]), FILES.index(text[2]), promotion)
 
     def __str__(self):
         """Return a readable representation of the move.
@@ -21,4 +130,28 @@ class Move:
         """
         output = f'Move [from_row={self.from_row}, from_col={self.from_col}'
         output += f', to_row={self.to_row}, to_col={self.to_col}]'
-        return output	
+        return output
+
+
+def pack_moves(moves) -> array:
+    """Pack moves into a compact unsigned 16-bit buffer.
+
+    Args:
+        moves (Iterable[Move]): The moves to pack.
+
+    Returns:
+        array: An ''array('H')'' holding one packed move per entry.
+    """
+    return array('H', [move.pack() for move in moves])
+
+
+def unpack_moves(codes) -> list[Move]:
+    """Convert a buffer of packed moves back into move objects.
+
+    Args:
+        codes (Iterable[int]): Packed moves, such as an ''array('H')''.
+
+    Returns:
+        list[Move]: The moves, in the same order.
+    """
+    return [Move.unpack(code) for code in codes]
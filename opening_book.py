@@ -0,0 +1,254 @@
+import argparse
+import mmap
+import random
+import struct
+import sys
+from chess_model import ChessModel
+from fen import START_FEN
+from move import Move
+from pgn import read_games
+
+#file layout: an 8 byte magic string, then fixed size records sorted by key and move
+MAGIC = b'CHSBOOK1'
+RECORD = struct.Struct('<QHH') #position key, packed move, weight
+KEY = struct.Struct('<Q')
+
+#weights are stored in 16 bits
+MAX_WEIGHT = 0xFFFF
+
+
+class BookBuilder:
+    """Counts the moves played from each position and writes them as an opening book.
+
+    Positions are keyed by the engine's Zobrist hash, so a book only works with the
+    engine build that wrote it.
+
+    Attributes:
+        max_plies (int): Moves of each game that go into the book.
+    """
+    def __init__(self, max_plies: int = 16) -> None:
+        """Initialize an empty builder.
+
+        Args:
+            max_plies (int): Moves of each game that go into the book. Defaults to 16.
+        """
+        self.max_plies = max_plies
+        self._counts: dict[tuple[int, int], int] = {}
+        self._model = ChessModel(ai_player=None)
+
+    def add_moves(self, moves, fen: str = START_FEN) -> int:
+        """Add one game given as a sequence of moves.
+
+        The game is replayed until it ends, reaches ''max_plies'' or hits an illegal move.
+
+        Args:
+            moves (Iterable[Move]): The game's moves in order.
+            fen (str): Position the game starts from. Defaults to the standard opening.
+
+        Returns:
+            int: Number of moves added to the book.
+        """
+        model = self._model
+        model.load_fen(fen)
+        added = 0
+        for move in moves:
+            if added == self.max_plies or not model._assess_move(move)[0]:
+                break
+            entry = (model.zobrist_key, move.pack())
+            self._counts[entry] = self._counts.get(entry, 0) + 1
+            model._make_move(move)
+            added += 1
+        return added
+
+    def add_move_lists(self, lines) -> int:
+        """Add games written one per line as space separated coordinate moves, such as ''"e2e4 e7e5"''.
+
+        Args:
+            lines (Iterable[str]): The games, such as an open file. Blank lines and lines
+                starting with ''#'' are skipped.
+
+        Returns:
+            int: Number of games added.
+
+        Raises:
+            ValueError: If a line holds something other than coordinate moves.
+        """
+        games = 0
+        for line in lines:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            self.add_moves(Move.from_uci(text) for text in line.split())
+            games += 1
+        return games
+
+    def add_pgn(self, lines) -> int:
+        """Add every game of a PGN file, skipping games the engine cannot replay.
+
+        Args:
+            lines (Iterable[str]): Lines of PGN text, such as an open file.
+
+        Returns:
+            int: Number of games added.
+        """
+        games = 0
+        for tags, game in read_games(lines, skip_invalid=True):
+            self.add_moves(game.move_history, tags.get('FEN', START_FEN))
+            games += 1
+        return games
+
+    def write(self, path: str, min_count: int = 1) -> int:
+        """Write the book, sorted so readers can binary search it.
+
+        Args:
+            path (str): File to create.
+            min_count (int): Leave out moves played fewer times than this. Defaults to 1.
+
+        Returns:
+            int: Number of records written.
+        """
+        entries = sorted(entry for entry, count in self._counts.items() if count >= min_count)
+        with open(path, 'wb') as f:
+            f.write(MAGIC)
+            for key, code in entries:
+                f.write(RECORD.pack(key, code, min(self._counts[key, code], MAX_WEIGHT)))
+        return len(entries)
+
+
+class OpeningBook:
+    """Read-only opening book, memory-mapped and searched in place.
+
+    Records are never turned into Python objects until they match, so opening a book
+    is instant, and processes reading the same file share its pages.
+
+    Attributes:
+        path (str): The book file.
+        size (int): Number of records in the book.
+    """
+    def __init__(self, path: str) -> None:
+        """Map a book file into memory.
+
+        Args:
+            path (str): The book file.
+
+        Raises:
+            ValueError: If the file is not an opening book.
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f'{path} is not an opening book')
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.size = (len(self._map) - len(MAGIC)) // RECORD.size
+
+    def __reduce__(self):
+        """Reopen the book by path, so it can be sent to worker processes.
+
+        Returns:
+            tuple: The class and the constructor arguments.
+        """
+        return type(self), (self.path,)
+
+    def __enter__(self) -> 'OpeningBook':
+        """Return the book for use in a ''with'' block."""
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Unmap the book when the ''with'' block ends."""
+        self.close()
+
+    def close(self) -> None:
+        """Unmap the book file."""
+        self._map.close()
+
+    def entries(self, key: int) -> list[tuple[Move, int]]:
+        """Look up the book moves of a position.
+
+        Args:
+            key (int): Zobrist key of the position.
+
+        Returns:
+            list[tuple[Move, int]]: Each book move with its weight, empty if the position is
+            not in the book.
+        """
+        data = self._map
+        low, high = 0, self.size
+        #find the first record whose key is not below the one wanted
+        while low < high:
+            middle = (low + high) // 2
+            if KEY.unpack_from(data, len(MAGIC) + middle * RECORD.size)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+        found = []
+        while low < self.size:
+            record_key, code, weight = RECORD.unpack_from(data, len(MAGIC) + low * RECORD.size)
+            if record_key != key:
+                break
+            found.append((Move.unpack(code), weight))
+            low += 1
+        return found
+
+    def choose(self, key: int, rng: random.Random | None = None) -> Move | None:
+        """Pick a book move for a position.
+
+        Args:
+            key (int): Zobrist key of the position.
+            rng (random.Random | None): Source of randomness to pick moves in proportion to
+                their weight, or ''None'' to always pick the most played move.
+
+        Returns:
+            Move | None: The chosen move, or ''None'' if the position is not in the book.
+        """
+        found = self.entries(key)
+        if not found:
+            return None
+        if rng is None:
+            return max(found, key=lambda entry: entry[1])[0]
+        return rng.choices([move for move, _ in found], weights=[weight for _, weight in found])[0]
+
+
+def main(argv=None) -> int:
+    """Build or query an opening book from the command line.
+
+    Args:
+        argv (list[str] | None): Command line arguments, defaults to ''sys.argv''.
+
+    Returns:
+        int: Process exit status.
+    """
+    parser = argparse.ArgumentParser(description='Opening book tools.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help='compile a book from PGN files or move lists')
+    build.add_argument('book', help='book file to write')
+    build.add_argument('--pgn', action='append', default=[], help='PGN file to read, may repeat')
+    build.add_argument('--moves', action='append', default=[],
+                       help='file of games, one per line as coordinate moves, may repeat')
+    build.add_argument('--max-plies', type=int, default=16, help='moves of each game to keep')
+    build.add_argument('--min-count', type=int, default=1, help='leave out rarer moves')
+    probe = commands.add_parser('probe', help='list the book moves of a position')
+    probe.add_argument('book', help='book file to read')
+    probe.add_argument('fen', nargs='?', default=START_FEN, help='position to look up')
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        builder = BookBuilder(args.max_plies)
+        games = 0
+        for path in args.pgn:
+            with open(path) as f:
+                games += builder.add_pgn(f)
+        for path in args.moves:
+            with open(path) as f:
+                games += builder.add_move_lists(f)
+        records = builder.write(args.book, args.min_count)
+        print(f'{games} games, {records} book moves written to {args.book}')
+        return 0
+
+    with OpeningBook(args.book) as book:
+        for move, weight in book.entries(ChessModel.from_fen(args.fen).zobrist_key):
+            print(f'{move.uci()} {weight}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,23 +1,19 @@
-from chess_piece import ChessPiece
-from move import Move
+from attack_tables import PAWN_ATTACKS
+from chess_piece import PAWN, ChessPiece
+from move import PROMOTION_TYPES, Move
 from player import Player
 
 class Pawn(ChessPiece):
     """Represents a Pawn piece.
 
+    A pawn still has its first move, and with it the double step, while it stands on
+    its starting rank.
+
     Attributes:
         player (Player): Owner of the Pawn.
-        first_move (bool): Whether the Pawn is on the first move.
     """
-    def __init__(self, player: Player, first_move: bool = True):
-        """Initialize a pawn chess piece.
-
-        Args:
-            player (Player): Owner of the Pawn.
-            first_move (bool): Whether the pawn has moved before. Defaults to True.
-        """
-        super().__init__(player)
-        self.first_move = first_move
+    __slots__ = ()
+    code = PAWN
 
     def __str__(self) -> str:
         """Returns the readable name of the pawn.
@@ -35,6 +31,17 @@ class Pawn(ChessPiece):
         """
         return "Pawn"
 
+    def start_row(self, board: list[list[ChessPiece]]) -> int:
+        """Return the row the pawn starts on, where it may still make its double step.
+
+        Args:
+            board (list[list[ChessPiece]]): The board the pawn plays on.
+
+        Returns:
+            int: The second row from the pawn's own side of the board.
+        """
+        return len(board) - 2 if self.player == Player.WHITE else 1
+
     def is_valid_move(self, move: Move, board: list[list[ChessPiece]]) -> bool:
         """Determine whether a move is legal for a pawn.
 
@@ -61,22 +68,62 @@ class Pawn(ChessPiece):
 
             #moving 1 square forward
             if dr == direction:
-                self.first_move = False
                 return True
 
             #2 squares forward only if its pawns first move and path is clear
-            if self.first_move and dr == 2 * direction:
+            if move.from_row == self.start_row(board) and dr == 2 * direction:
                 mid_row = move.from_row + direction
                 if board[mid_row][move.from_col] is None:
-                    self.first_move = False
                     return True
             return False
 
         #diagonal capture
         if abs(dc) == 1 and dr == direction:
             if dest_piece is not None and dest_piece.player != self.player:
-                self.first_move = False
                 return True
 
         #just a catch all
         return False
+
+    def possible_moves(self, row: int, col: int, board: list[list[ChessPiece]]):
+        """Yield the pseudo-legal moves for a pawn standing on the given square.
+
+        Args:
+            row (int): Row index the pawn stands on.
+            col (int): Column index the pawn stands on.
+            board (list[list[ChessPiece]]): The current board state.
+
+        Yields:
+            Move: Each forward push or diagonal capture available to the pawn, once for every
+            promotion piece when it reaches the far rank.
+        """
+        rows = len(board)
+        direction = -1 if self.player == Player.WHITE else 1
+        ahead = row + direction
+        if not 0 <= ahead < rows:
+            return
+
+        #a move onto the far rank is a separate move for every piece the pawn may become
+        if ahead in (0, rows - 1):
+            if board[ahead][col] is None:
+                for promotion in PROMOTION_TYPES:
+                    yield Move(row, col, ahead, col, promotion)
+            for tr, tc in PAWN_ATTACKS[self.player][row][col]:
+                target = board[tr][tc]
+                if target is not None and target.player != self.player:
+                    for promotion in PROMOTION_TYPES:
+                        yield Move(row, col, tr, tc, promotion)
+            return
+
+        #forward pushes need empty squares
+        if board[ahead][col] is None:
+            yield Move(row, col, ahead, col)
+            two_ahead = ahead + direction
+            if row == self.start_row(board) and board[two_ahead][col] is None:
+                yield Move(row, col, two_ahead, col)
+
+        #diagonal captures need an enemy piece
+        for tr, tc in PAWN_ATTACKS[self.player][row][col]:
+            target = board[tr][tc]
+            if target is not None and target.player != self.player:
+                yield Move(row, col, tr, tc)
@@ -0,0 +1,314 @@
+import re
+from chess_model import ChessModel
+from chess_piece import BISHOP, KING, KNIGHT, PAWN, QUEEN, ROOK
+from fen import START_FEN
+from move import FILES, Move
+from player import Player
+
+#SAN letters of the pieces, pawns have none
+PIECE_SAN = {KNIGHT: 'N', BISHOP: 'B', ROOK: 'R', QUEEN: 'Q', KING: 'K'}
+SAN_PIECES = {letter: code for code, letter in PIECE_SAN.items()}
+PROMOTION_SAN = {'Knight': 'N', 'Bishop': 'B', 'Rook': 'R', 'Queen': 'Q'}
+SAN_PROMOTIONS = {letter: name for name, letter in PROMOTION_SAN.items()}
+
+RESULTS = ('1-0', '0-1', '1/2-1/2', '*')
+
+#the seven tag roster every exported game starts with, in this order
+SEVEN_TAG_ROSTER = (('Event', '?'), ('Site', '?'), ('Date', '????.??.??'), ('Round', '?'),
+                    ('White', '?'), ('Black', '?'), ('Result', '*'))
+
+#longest movetext line written, as the PGN standard recommends
+LINE_LENGTH = 79
+
+_SAN = re.compile(r'([NBRQK])?([a-h])?([1-8])?x?([a-h][1-8])(?:=?([NBRQ]))?')
+_TAG = re.compile(r'\[\s*(\w+)\s+"((?:[^"\\]|\\.)*)"\s*\]')
+_TOKEN = re.compile(r'\{[^}]*\}?|;.*|\[\s*\w+\s+"(?:[^"\\]|\\.)*"\s*\]|[()]|[^\s{}();\[\]]+')
+_MOVE_NUMBER = re.compile(r'^\d+\.+')
+
+
+def square_name(row: int, col: int) -> str:
+    """Name a square in algebraic notation.
+
+    Args:
+        row (int): Row index, row 0 being rank 8.
+        col (int): Column index, column 0 being file a.
+
+    Returns:
+        str: The square name, such as ''"e4"''.
+    """
+    return f'{FILES[col]}{8 - row}'
+
+
+def move_to_san(model: ChessModel, move: Move) -> str:
+    """Write a legal move in standard algebraic notation.
+
+    Args:
+        model (ChessModel): The game, positioned before the move.
+        move (Move): A legal move for the side to move.
+
+    Returns:
+        str: The move in SAN, including a ''+'' or ''#'' suffix when it gives check or mate.
+    """
+    fr, fc, tr, tc = move.from_row, move.from_col, move.to_row, move.to_col
+    board = model.board
+    piece = board[fr][fc]
+    capture = board[tr][tc] is not None
+
+    if piece.code == PAWN:
+        san = f'{FILES[fc]}x' if capture else ''
+        san += square_name(tr, tc)
+        if tr == (0 if piece.player == Player.WHITE else model.nrows - 1):
+            san += '=' + PROMOTION_SAN[move.promotion or 'Queen']
+    else:
+        #name the from file, rank or both when another piece of the same type could go there
+        rivals = [(m.from_row, m.from_col) for m in model._legal_moves()
+                  if m.to_row == tr and m.to_col == tc and (m.from_row, m.from_col) != (fr, fc)
+                  and board[m.from_row][m.from_col].code == piece.code]
+        disambiguation = ''
+        if rivals:
+            if all(col != fc for _, col in rivals):
+                disambiguation = FILES[fc]
+            elif all(row != fr for row, _ in rivals):
+                disambiguation = str(8 - fr)
+            else:
+                disambiguation = square_name(fr, fc)
+        san = PIECE_SAN[piece.code] + disambiguation + ('x' if capture else '') + square_name(tr, tc)
+
+    model._make_move(move)
+    try:
+        if model.in_check(model.current_player):
+            san += '#' if model.is_complete() else '+'
+    finally:
+        model._unmake_move()
+    return san
+
+
+def san_to_move(model: ChessModel, san: str) -> Move:
+    """Find the legal move a SAN string describes.
+
+    Args:
+        model (ChessModel): The game, positioned before the move.
+        san (str): The move in SAN. Check marks and annotations such as ''!?'' are ignored.
+
+    Returns:
+        Move: The matching legal move.
+
+    Raises:
+        ValueError: If the text is not SAN, describes castling, which the engine does not
+            support, or does not match exactly one legal move.
+    """
+    text = san.rstrip('+#!?')
+    if text in ('O-O', 'O-O-O', '0-0', '0-0-0'):
+        raise ValueError(f'castling is not supported: {san!r}')
+    match = _SAN.fullmatch(text)
+    if match is None:
+        raise ValueError(f'not a SAN move: {san!r}')
+
+    letter, from_file, from_rank, destination, promotion = match.groups()
+    code = SAN_PIECES[letter] if letter else PAWN
+    tr, tc = 8 - int(destination[1]), FILES.index(destination[0])
+    fc = FILES.index(from_file) if from_file else None
+    fr = 8 - int(from_rank) if from_rank else None
+
+    #a promotion without a named piece is taken as a queen
+    piece_name = SAN_PROMOTIONS[promotion] if promotion else 'Queen'
+    board = model.board
+    candidates = [m for m in model._legal_moves()
+                  if m.to_row == tr and m.to_col == tc and board[m.from_row][m.from_col].code == code
+                  and (fc is None or m.from_col == fc) and (fr is None or m.from_row == fr)
+                  and m.promotion in (None, piece_name)]
+    if len(candidates) != 1:
+        problem = 'ambiguous' if candidates else 'illegal'
+        raise ValueError(f'{problem} move {san!r} in {model.to_fen()}')
+
+    move = candidates[0]
+    if promotion is not None and move.promotion is None:
+        raise ValueError(f'{san!r} promotes a piece that cannot promote')
+    return move
+
+
+def game_result(model: ChessModel) -> str:
+    """Score the game as it stands.
+
+    Args:
+        model (ChessModel): The game.
+
+    Returns:
+        str: ''"1-0"'' or ''"0-1"'' after checkmate, ''"1/2-1/2"'' after stalemate and
+        ''"*"'' while the game goes on.
+    """
+    if not model.is_complete():
+        return '*'
+    if not model.in_check(model.current_player):
+        return '1/2-1/2'
+    return '0-1' if model.current_player == Player.WHITE else '1-0'
+
+
+def game_to_pgn(model: ChessModel, tags: dict[str, str] | None = None, result: str | None = None) -> str:
+    """Export the game played on a model as PGN.
+
+    The model itself is left untouched. Games that did not start from the standard
+    position get ''SetUp'' and ''FEN'' tags.
+
+    Args:
+        model (ChessModel): The game to export.
+        tags (dict[str, str] | None): Tags to add to or override the seven tag roster.
+        result (str | None): Result to record, or ''None'' to score the final position.
+
+    Returns:
+        str: The PGN text of the game, ending with a newline.
+    """
+    replay = model.copy()
+    history = replay.move_history
+    for _ in history:
+        replay._unmake_move()
+
+    if result is None:
+        result = game_result(model)
+    headers = dict(SEVEN_TAG_ROSTER)
+    headers.update(tags or {})
+    headers['Result'] = result
+    start_fen = replay.to_fen()
+    if start_fen != START_FEN:
+        headers['SetUp'] = '1'
+        headers['FEN'] = start_fen
+
+    tokens = []
+    number = replay._fen_start[1]
+    for move in history:
+        if replay.current_player == Player.WHITE:
+            tokens.append(f'{number}.')
+        elif not tokens:
+            tokens.append(f'{number}...')
+        tokens.append(move_to_san(replay, move))
+        replay._make_move(move)
+        if replay.current_player == Player.WHITE:
+            number += 1
+    tokens.append(result)
+
+    lines = []
+    line = ''
+    for token in tokens:
+        if line and len(line) + 1 + len(token) > LINE_LENGTH:
+            lines.append(line)
+            line = token
+        else:
+            line = f'{line} {token}' if line else token
+    lines.append(line)
+
+    escaped = {name: value.replace('\\', '\\\\').replace('"', '\\"') for name, value in headers.items()}
+    header = ''.join(f'[{name} "{value}"]\n' for name, value in escaped.items())
+    return header + '\n' + '\n'.join(lines) + '\n'
+
+
+def write_pgn(out, model: ChessModel, tags: dict[str, str] | None = None, result: str | None = None) -> None:
+    """Append the game played on a model to a PGN file.
+
+    Args:
+        out (TextIO): Open text file to write to.
+        model (ChessModel): The game to export.
+        tags (dict[str, str] | None): Tags to add to or override the seven tag roster.
+        result (str | None): Result to record, or ''None'' to score the final position.
+    """
+    out.write(game_to_pgn(model, tags, result))
+    out.write('\n')
+
+
+def _tokens(lines):
+    """Split PGN text into tag pairs, moves and symbols, dropping comments.
+
+    Args:
+        lines (Iterable[str]): Lines of PGN text.
+
+    Yields:
+        str: Each token in order.
+    """
+    in_comment = False
+    for line in lines:
+        if in_comment:
+            end = line.find('}')
+            if end < 0:
+                continue
+            line = line[end + 1:]
+            in_comment = False
+        elif line.startswith('%'):
+            continue
+        for match in _TOKEN.finditer(line):
+            token = match.group()
+            if token[0] == ';':
+                break
+            if token[0] == '{':
+                #a comment without its closing brace runs on to later lines
+                in_comment = not token.endswith('}')
+                continue
+            yield token
+
+
+def read_games(lines, model: ChessModel | None = None, skip_invalid: bool = False):
+    """Stream the games of a PGN file, replaying each one into a reused model.
+
+    The text is read a line at a time and only the current game is held, so memory
+    use does not grow with the file. Comments, variations and annotation glyphs are
+    skipped. The same model is yielded for every game, positioned after its last move,
+    so read what you need from it before asking for the next game.
+
+    Args:
+        lines (Iterable[str]): Lines of PGN text, such as an open file.
+        model (ChessModel | None): Model to replay into, or ''None'' to create one without an AI.
+        skip_invalid (bool): Skip games with a move the engine cannot play, such as castling,
+            instead of raising. Defaults to False.
+
+    Yields:
+        tuple[dict[str, str], ChessModel]: The game's tags and the model holding the game.
+
+    Raises:
+        ValueError: If a move cannot be played and ''skip_invalid'' is not set.
+    """
+    if model is None:
+        model = ChessModel(ai_player=None)
+    tags = {}
+    in_movetext = False
+    failed = False
+    depth = 0
+
+    for token in _tokens(lines):
+        if token[0] == '[':
+            #a tag after movetext starts a new game even if the last one had no result
+            if in_movetext:
+                if not failed:
+                    yield tags, model
+                tags, in_movetext = {}, False
+            name, value = _TAG.fullmatch(token).groups()
+            tags[name] = value.replace('\\"', '"').replace('\\\\', '\\')
+            continue
+
+        if not in_movetext:
+            model.load_fen(tags.get('FEN', START_FEN))
+            in_movetext, failed, depth = True, False, 0
+
+        if token == '(':
+            depth += 1
+        elif token == ')':
+            depth = max(0, depth - 1)
+        elif depth or token[0] == '$':
+            continue
+        elif token in RESULTS:
+            tags.setdefault('Result', token)
+            if not failed:
+                yield tags, model
+            tags, in_movetext = {}, False
+        elif not failed:
+            san = _MOVE_NUMBER.sub('', token, count=1)
+            if not san:
+                continue
+            try:
+                move = san_to_move(model, san)
+            except ValueError:
+                if not skip_invalid:
+                    raise
+                failed = True
+                continue
+            model._make_move(move)
+
+    if in_movetext and not failed:
+        yield tags, model
@@ -1,4 +1,5 @@
-from chess_piece import ChessPiece
+from attack_tables import QUEEN_RAYS
+from chess_piece import QUEEN, ChessPiece
 from move import Move
 
 class Queen(ChessPiece):
@@ -7,13 +8,8 @@ class Queen(ChessPiece):
     Attributes:
         player (Player): Owner of the Queen.
     """
-    def __init__(self, player):
-        """Initialize a queen chess piece.
-
-        Args:
-            player (Player): Owner of the queen.
-        """
-        super().__init__(player)
+    __slots__ = ()
+    code = QUEEN
 
     def __str__(self) -> str:
         """Returns the readable name of the queen.
@@ -65,3 +61,16 @@ class Queen(ChessPiece):
 
         # our destination is either empty or enemy
         return True
+
+    def possible_moves(self, row: int, col: int, board: list[list[ChessPiece]]):
+        """Yield the pseudo-legal moves for a queen standing on the given square.
+
+        Args:
+            row (int): Row index the queen stands on.
+            col (int): Column index the queen stands on.
+            board (list[list[ChessPiece]]): The current board state.
+
+        Yields:
+            Move: Each straight or diagonal move up to and including the first blocker.
+        """
+        yield from self._slide_moves(row, col, board, QUEEN_RAYS[row][col])
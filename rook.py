@@ -1,4 +1,5 @@
-from chess_piece import ChessPiece
+from attack_tables import STRAIGHT_RAYS
+from chess_piece import ROOK, ChessPiece
 from move import Move
 
 class Rook(ChessPiece):
@@ -7,13 +8,8 @@ class Rook(ChessPiece):
     Attributes:
         player (Player): Owner of the Rook.
     """
-    def __init__(self, player):
-        """Initialize a rook chess piece.
-
-        Args:
-            player (Player): Owner of the rook.
-        """
-        super().__init__(player)
+    __slots__ = ()
+    code = ROOK
 
     def __str__(self) -> str:
         """Return the readable name of the rook.
@@ -65,3 +61,16 @@ class Rook(ChessPiece):
 
         # our destination is either empty or enemy
         return True
+
+    def possible_moves(self, row: int, col: int, board: list[list[ChessPiece]]):
+        """Yield the pseudo-legal moves for a rook standing on the given square.
+
+        Args:
+            row (int): Row index the rook stands on.
+            col (int): Column index the rook stands on.
+            board (list[list[ChessPiece]]): The current board state.
+
+        Yields:
+            Move: Each straight move up to and including the first blocker.
+        """
+        yield from self._slide_moves(row, col, board, STRAIGHT_RAYS[row][col])
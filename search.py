@@ -0,0 +1,386 @@
+import time
+from chess_piece import TYPE_CODES
+from move import Move
+from transposition import EXACT, LOWER, UPPER, TranspositionTable
+
+#scores are in centipawns from the side to move's point of view
+MATE_SCORE = 1000000
+INFINITY = MATE_SCORE + 1
+
+#scores beyond this are mates, stored relative to the node rather than the root
+MATE_BOUND = MATE_SCORE - 1000
+
+#how many nodes to visit between clock reads
+CLOCK_INTERVAL = 256
+
+#ordering bands: the stored best move, then captures, killer moves and quiet moves by history
+HASH_MOVE_ORDER = 1 << 31
+CAPTURE_ORDER = 1 << 30
+KILLER_ORDER = 1 << 29
+
+
+class SearchAborted(Exception):
+    """Exception raised inside the search when its time or node budget runs out."""
+
+
+class Search:
+    """Negamax alpha-beta search with iterative deepening over a chess model.
+
+    The search plays candidate moves on the model itself and takes every one back
+    before returning, so the position is unchanged once ''best_move'' finishes.
+
+    Attributes:
+        max_depth (int): Deepest iteration to attempt.
+        time_limit (float | None): Wall-clock budget in seconds, or ''None'' for no limit.
+        max_nodes (int | None): Node budget, or ''None'' for no limit.
+        ordering (bool): Whether moves are ordered by MVV-LVA, killers and history.
+        tt (TranspositionTable | None): Table of earlier results, or ''None'' to search without one.
+        nodes (int): Positions visited by the most recent search.
+        depth (int): Deepest iteration the most recent search completed.
+        score (int): Score of the chosen move in centipawns for the side to move.
+        stopped (bool): Set by ''stop'' to end the search early, and cleared by ''bind''.
+    """
+    def __init__(self, model, piece_values: dict[str, int], max_depth: int = 32,
+                 time_limit: float | None = 1.0, max_nodes: int | None = None,
+                 ordering: bool = True, tt: TranspositionTable | None = None) -> None:
+        """Initialize a search over a model.
+
+        Args:
+            model (ChessModel): The game to search.
+            piece_values (dict[str, int]): Value in pawns of each piece type, used to order captures.
+            max_depth (int): Deepest iteration to attempt. Defaults to 32.
+            time_limit (float | None): Wall-clock budget in seconds. Defaults to 1.0.
+            max_nodes (int | None): Node budget. Defaults to ''None''.
+            ordering (bool): Whether to order moves before searching them. Defaults to True.
+            tt (TranspositionTable | None): Table to share results between nodes. Defaults to ''None''.
+        """
+        self._model = model
+        #values indexed by type code so move ordering avoids name lookups
+        self._values = [0] * (max(TYPE_CODES.values()) + 1)
+        for name, value in piece_values.items():
+            if name in TYPE_CODES:
+                self._values[TYPE_CODES[name]] = value
+        self.max_depth = max_depth
+        self.time_limit = time_limit
+        self.max_nodes = max_nodes
+        self.ordering = ordering
+        self.tt = tt
+        self.nodes = 0
+        self.depth = 0
+        self.score = 0
+        self._deadline = None
+        self._can_abort = False
+        self._root_best = None
+        self.stopped = False
+
+        #two quiet moves per ply that recently caused a beta cutoff
+        self._killers: list[list[int]] = []
+        #bonus for quiet moves that caused cutoffs anywhere in the tree
+        self._history: dict[int, int] = {}
+
+    def bind(self, model) -> None:
+        """Point the search at another game, keeping its history and transposition table.
+
+        Args:
+            model (ChessModel): The game to search from now on.
+        """
+        self._model = model
+        self.stopped = False
+
+    def stop(self) -> None:
+        """Ask a running search to give up as soon as it visits its next node.
+
+        This may be called from another thread. The stopped search still returns a
+        move, but it should be treated as cancelled and its result thrown away.
+        """
+        self.stopped = True
+
+    def best_move(self) -> Move | None:
+        """Search the current position and return the best move found.
+
+        Each iteration searches one ply deeper than the last. When the budget runs out
+        the unfinished iteration is thrown away and the best move of the last completed
+        depth is returned. The first iteration can only be cut short once one root move
+        has been scored, and then the best move it has scored is returned.
+
+        Returns:
+            Move | None: The chosen move, or ''None'' if the side to move has no legal move.
+        """
+        moves = self._model.legal_moves()
+        if not moves:
+            return None
+
+        self.nodes = 0
+        self.depth = 0
+        self.score = 0
+        self._can_abort = False
+        self._root_best = None
+        self._deadline = None if self.time_limit is None else time.perf_counter() + self.time_limit
+
+        #killers only describe the last tree, history is halved so old results fade
+        self._killers = []
+        for key in self._history:
+            self._history[key] >>= 1
+        if self.tt is not None:
+            self.tt.new_search()
+        moves = self._order(moves, 0)
+
+        best = moves[0]
+        for depth in range(1, self.max_depth + 1):
+            try:
+                move, score = self._search_root(moves, depth)
+            except SearchAborted:
+                if self.depth == 0 and self._root_best is not None:
+                    best, self.score = self._root_best
+                break
+            best, self.score, self.depth = move, score, depth
+
+            #search the previous best move first on the next iteration
+            moves.remove(move)
+            moves.insert(0, move)
+
+            #a forced mate will not get any better by searching deeper
+            if abs(score) >= MATE_SCORE - depth:
+                break
+        return best
+
+    def _search_root(self, moves: list[Move], depth: int) -> tuple[Move, int]:
+        """Search every root move to a fixed depth.
+
+        Args:
+            moves (list[Move]): The legal moves of the root position.
+            depth (int): Remaining depth in plies.
+
+        Returns:
+            tuple[Move, int]: The best move and its score.
+        """
+        model = self._model
+        alpha = -INFINITY
+        best = moves[0]
+        for move in moves:
+            model._make_move(move)
+            try:
+                score = -self._negamax(depth - 1, -INFINITY, -alpha, 1)
+            finally:
+                model._unmake_move()
+            if score > alpha:
+                alpha, best = score, move
+                self._root_best = best, alpha
+            #once a move has been scored there is something to play, so the budget may end the search
+            self._can_abort = True
+        return best, alpha
+
+    def _negamax(self, depth: int, alpha: int, beta: int, ply: int) -> int:
+        """Score a position with alpha-beta pruning.
+
+        Args:
+            depth (int): Remaining depth in plies.
+            alpha (int): Score the side to move is already guaranteed.
+            beta (int): Score above which the opponent will avoid this line.
+            ply (int): Distance from the root, used to prefer faster mates.
+
+        Returns:
+            int: The position's score for the side to move.
+        """
+        if depth <= 0:
+            return self._quiesce(alpha, beta)
+        self._visit()
+
+        model = self._model
+        tt = self.tt
+        key = model.zobrist_key
+        hash_move = 0
+        if tt is not None:
+            entry = tt.probe(key)
+            if entry is not None:
+                stored_depth, score, bound, hash_move = entry
+                if stored_depth >= depth:
+                    score = _score_from_table(score, ply)
+                    if bound == EXACT:
+                        return score
+                    if bound == LOWER and score >= beta:
+                        return score
+                    if bound == UPPER and score <= alpha:
+                        return score
+
+        moves = model.legal_moves()
+        if not moves:
+            #checkmate scores worse the sooner it happens, stalemate is a draw
+            if model.in_check(model.current_player):
+                return -(MATE_SCORE - ply)
+            return 0
+
+        original_alpha = alpha
+        best = -INFINITY
+        best_move = 0
+        board = model.board
+        for move in self._order(moves, ply, hash_move):
+            quiet = board[move.to_row][move.to_col] is None
+            model._make_move(move)
+            try:
+                score = -self._negamax(depth - 1, -beta, -alpha, ply + 1)
+            finally:
+                model._unmake_move()
+            if score > best:
+                best = score
+                best_move = move.pack()
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        if quiet:
+                            self._record_cutoff(best_move, depth, ply)
+                        break
+
+        if tt is not None:
+            if best <= original_alpha:
+                bound = UPPER
+            elif best >= beta:
+                bound = LOWER
+            else:
+                bound = EXACT
+            tt.store(key, depth, _score_to_table(best, ply), bound, best_move)
+        return best
+
+    def _quiesce(self, alpha: int, beta: int) -> int:
+        """Extend the search through captures so leaves are not scored mid-exchange.
+
+        Args:
+            alpha (int): Score the side to move is already guaranteed.
+            beta (int): Score above which the opponent will avoid this line.
+
+        Returns:
+            int: The position's score for the side to move once it is quiet.
+        """
+        self._visit()
+        best = self.evaluate()
+        if best >= beta:
+            return best
+        if best > alpha:
+            alpha = best
+
+        model = self._model
+        for move in self._order(list(model._iter_legal_moves(captures_only=True)), None):
+            model._make_move(move)
+            try:
+                score = -self._quiesce(-beta, -alpha)
+            finally:
+                model._unmake_move()
+            if score > best:
+                best = score
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+        return best
+
+    def _order(self, moves: list[Move], ply: int | None, hash_move: int = 0) -> list[Move]:
+        """Sort moves so the ones most likely to cause a cutoff are searched first.
+
+        The best move stored in the transposition table goes first. Captures follow,
+        most valuable victim then least valuable attacker. Killer moves for the ply come
+        next, and the remaining quiet moves are ranked by history.
+
+        Args:
+            moves (list[Move]): The moves to order.
+            ply (int | None): Distance from the root, or ''None'' to skip killer moves.
+            hash_move (int): Packed best move from the transposition table, or ''0''.
+
+        Returns:
+            list[Move]: The same moves, best candidates first.
+        """
+        if not self.ordering:
+            return moves
+
+        board = self._model.board
+        values = self._values
+        killers = self._killers[ply] if ply is not None and ply < len(self._killers) else ()
+        history = self._history
+
+        def order_key(move: Move) -> int:
+            key = move.pack()
+            if key == hash_move:
+                return HASH_MOVE_ORDER
+            victim = board[move.to_row][move.to_col]
+            if victim is not None:
+                attacker = board[move.from_row][move.from_col]
+                return CAPTURE_ORDER + values[victim.code] * 1024 - values[attacker.code]
+            if key in killers:
+                return KILLER_ORDER
+            return history.get(key, 0)
+
+        return sorted(moves, key=order_key, reverse=True)
+
+    def _record_cutoff(self, key: int, depth: int, ply: int) -> None:
+        """Remember a quiet move that caused a beta cutoff.
+
+        Args:
+            key (int): Packed form of the quiet move that refuted the opponent's last move.
+            depth (int): Remaining depth when the cutoff happened.
+            ply (int): Distance from the root.
+        """
+        while len(self._killers) <= ply:
+            self._killers.append([])
+        killers = self._killers[ply]
+        if key not in killers:
+            killers.insert(0, key)
+            del killers[2:]
+        self._history[key] = self._history.get(key, 0) + depth * depth
+
+    def evaluate(self) -> int:
+        """Score the current position by material and piece placement.
+
+        Returns:
+            int: Tapered score in centipawns from the side to move's point of view.
+        """
+        return self._model.evaluate()
+
+    def _visit(self) -> None:
+        """Count a node and stop the search once the budget is spent.
+
+        Raises:
+            SearchAborted: If the search was stopped or the time or node budget has run out.
+        """
+        self.nodes += 1
+        if self.stopped:
+            raise SearchAborted()
+        if not self._can_abort:
+            return
+        if self.max_nodes is not None and self.nodes >= self.max_nodes:
+            raise SearchAborted()
+        if self._deadline is not None and self.nodes % CLOCK_INTERVAL == 0:
+            if time.perf_counter() >= self._deadline:
+                raise SearchAborted()
+
+
+def _score_to_table(score: int, ply: int) -> int:
+    """Convert a mate score from distance-to-root into distance-to-node for storage.
+
+    Args:
+        score (int): Score as seen from the root.
+        ply (int): Distance of the node from the root.
+
+    Returns:
+        int: Score that stays correct wherever the position is reached again.
+    """
+    if score > MATE_BOUND:
+        return score + ply
+    if score < -MATE_BOUND:
+        return score - ply
+    return score
+
+
+def _score_from_table(score: int, ply: int) -> int:
+    """Convert a stored mate score back to distance-to-root.
+
+    Args:
+        score (int): Score read from the transposition table.
+        ply (int): Distance of the node from the root.
+
+    Returns:
+        int: Score as seen from the root.
+    """
+    if score > MATE_BOUND:
+        return score - ply
+    if score < -MATE_BOUND:
+        return score + ply
+    return score
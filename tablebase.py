@@ -0,0 +1,375 @@
+import argparse
+import mmap
+import os
+import sys
+from attack_tables import KING_MASKS, PAWN_ATTACK_MASKS
+from bitboard_model import (NEGATIVE_DIAGONALS, NEGATIVE_STRAIGHTS, POSITIVE_DIAGONALS, POSITIVE_STRAIGHTS,
+                            slider_attacks)
+from chess_model import ChessModel
+from chess_piece import KING, PAWN, QUEEN, ROOK
+from move import Move
+from player import Player
+
+#endings covered, named by the stronger side's material, with the piece it has besides its king
+ENDINGS = {'KQK': QUEEN, 'KRK': ROOK, 'KPK': PAWN}
+
+#tables a pawn ending promotes into, by promotion piece
+PROMOTION_ENDINGS = {'Queen': 'KQK', 'Rook': 'KRK'}
+
+#side to move slot of a table index
+STRONG, WEAK = 0, 1
+
+#one byte per position: side to move, strong king, strong piece, weak king
+TABLE_SIZE = 2 * 64 * 64 * 64
+WEAK_OFFSET = TABLE_SIZE // 2
+
+#outcomes for the side to move
+WIN, DRAW, LOSS = 1, 0, -1
+
+#score of a winning move before its distance to mate is taken off
+MATE_SCORE = 1000
+
+_SLIDES = {QUEEN: (POSITIVE_DIAGONALS + POSITIVE_STRAIGHTS, NEGATIVE_DIAGONALS + NEGATIVE_STRAIGHTS),
+           ROOK: (POSITIVE_STRAIGHTS, NEGATIVE_STRAIGHTS)}
+
+
+def table_index(stm: int, strong_king: int, strong_piece: int, weak_king: int) -> int:
+    """Compute where a position is stored in a table.
+
+    Squares are bit indexes, ''row * 8 + col'', with the stronger side playing white.
+
+    Args:
+        stm (int): ''STRONG'' or ''WEAK'', the side to move.
+        strong_king (int): Square of the stronger side's king.
+        strong_piece (int): Square of the stronger side's other piece.
+        weak_king (int): Square of the lone king.
+
+    Returns:
+        int: Offset of the position's byte.
+    """
+    return ((stm * 64 + strong_king) * 64 + strong_piece) * 64 + weak_king
+
+
+def _strong_attacks(code: int, strong_king: int, strong_piece: int) -> int:
+    """Compute the squares the stronger side attacks, looking through the lone king.
+
+    Leaving the lone king off the board keeps a king that steps back along a checking
+    line from counting the square behind it as safe.
+
+    Args:
+        code (int): Type code of the stronger side's piece.
+        strong_king (int): Square of the stronger side's king.
+        strong_piece (int): Square of the stronger side's other piece.
+
+    Returns:
+        int: Bitboard of attacked squares.
+    """
+    attacks = KING_MASKS[strong_king]
+    if code == PAWN:
+        return attacks | PAWN_ATTACK_MASKS[Player.WHITE][strong_piece]
+    positive, negative = _SLIDES[code]
+    return attacks | slider_attacks(strong_piece, 1 << strong_king, positive, negative)
+
+
+def generate(name: str, promotions: dict[str, bytes] | None = None) -> bytearray:
+    """Solve an ending by retrograde analysis.
+
+    Checkmates are found first, then the analysis walks backwards a ply at a time: a
+    position where the stronger side can reach a lost position for the lone king is won,
+    and a position where every move of the lone king reaches a won position is lost.
+    Whatever is never reached is a draw. Each byte holds ''0'' for a draw or impossible
+    position, or the distance to mate in plies plus one, an odd distance meaning the side
+    to move mates and an even one that it is mated.
+
+    Args:
+        name (str): Ending to solve, a key of ''ENDINGS''.
+        promotions (dict[str, bytes] | None): Solved tables by ending name, needed for
+            ''KPK'' to score promotions.
+
+    Returns:
+        bytearray: The table, ''TABLE_SIZE'' bytes long.
+
+    Raises:
+        ValueError: If the ending is unknown or a promotion table is missing.
+    """
+    if name not in ENDINGS:
+        raise ValueError(f'no tablebase for {name}')
+    code = ENDINGS[name]
+    pawn = code == PAWN
+    if pawn and not all(ending in (promotions or {}) for ending in PROMOTION_ENDINGS.values()):
+        raise ValueError(f'{name} needs the {", ".join(PROMOTION_ENDINGS.values())} tables')
+
+    values = bytearray(TABLE_SIZE)
+    legal = bytearray(TABLE_SIZE)
+    #moves of the lone king not yet known to lose
+    counts = bytearray(TABLE_SIZE)
+    #positions waiting to be scored, by distance to mate, which a byte caps below 255
+    pending: list[list[int]] = [[] for _ in range(255)]
+
+    for sk in range(64):
+        for sp in range(64):
+            if sp == sk or pawn and sp // 8 in (0, 7):
+                continue
+            attacks = _strong_attacks(code, sk, sp)
+            base = table_index(WEAK, sk, sp, 0)
+            for wk in range(64):
+                if wk == sk or wk == sp or KING_MASKS[sk] >> wk & 1:
+                    continue
+                index = base + wk
+                legal[index] = 1
+                #taking an unguarded piece counts as a move, it draws at once
+                counts[index] = (KING_MASKS[wk] & ~attacks).bit_count()
+                in_check = attacks >> wk & 1
+                if in_check:
+                    if not counts[index]:
+                        pending[0].append(index)
+                else:
+                    legal[index - WEAK_OFFSET] = 1
+
+    if pawn:
+        #a pawn reaching the last row wins when the promoted ending is lost for the lone king
+        for sk in range(64):
+            for sp in range(8, 16):
+                to = sp - 8
+                for wk in range(64):
+                    index = table_index(STRONG, sk, sp, wk)
+                    if not legal[index] or to in (sk, wk):
+                        continue
+                    best = None
+                    for ending in PROMOTION_ENDINGS.values():
+                        value = promotions[ending][table_index(WEAK, sk, to, wk)]
+                        if value and value % 2 and (best is None or value < best):
+                            best = value
+                    if best is not None:
+                        pending[best].append(index)
+
+    positive, negative = _SLIDES.get(code, ((), ()))
+    for distance in range(len(pending) - 1):
+        following = pending[distance + 1]
+        for index in pending[distance]:
+            if values[index]:
+                continue
+            values[index] = distance + 1
+            wk = index & 63
+            sp = index >> 6 & 63
+            sk = index >> 12 & 63
+            occupied = 1 << sk | 1 << sp | 1 << wk
+            if index >= WEAK_OFFSET:
+                #the lone king is lost here, so every strong move into it wins
+                found = []
+                moved = index - WEAK_OFFSET - (sk << 12)
+                origins = KING_MASKS[sk] & ~occupied
+                while origins:
+                    found.append(moved + ((origins & -origins).bit_length() - 1 << 12))
+                    origins &= origins - 1
+                moved = index - WEAK_OFFSET - (sp << 6)
+                if pawn:
+                    if sp < 48 and not occupied >> sp + 8 & 1:
+                        found.append(moved + (sp + 8 << 6))
+                        if sp // 8 == 4 and not occupied >> sp + 16 & 1:
+                            found.append(moved + (sp + 16 << 6))
+                else:
+                    origins = slider_attacks(sp, occupied, positive, negative) & ~occupied
+                    while origins:
+                        found.append(moved + ((origins & -origins).bit_length() - 1 << 6))
+                        origins &= origins - 1
+                for previous in found:
+                    if legal[previous] and not values[previous]:
+                        following.append(previous)
+            else:
+                #the stronger side wins here, so one more lone king move runs out of escapes
+                moved = index + WEAK_OFFSET - wk
+                origins = KING_MASKS[wk] & ~occupied
+                while origins:
+                    previous = moved + (origins & -origins).bit_length() - 1
+                    origins &= origins - 1
+                    if legal[previous] and not values[previous]:
+                        counts[previous] -= 1
+                        if not counts[previous]:
+                            following.append(previous)
+    return values
+
+
+def generate_all(directory: str) -> list[str]:
+    """Solve every ending and write each table to a ''<name>.tb'' file.
+
+    Args:
+        directory (str): Folder to write into, created if missing.
+
+    Returns:
+        list[str]: Paths of the written tables.
+    """
+    os.makedirs(directory, exist_ok=True)
+    tables = {}
+    paths = []
+    #pawn endings are solved last as they score promotions with the other tables
+    for name in sorted(ENDINGS, key=lambda ending: ENDINGS[ending] == PAWN):
+        tables[name] = generate(name, tables)
+        path = os.path.join(directory, f'{name}.tb')
+        with open(path, 'wb') as f:
+            f.write(tables[name])
+        paths.append(path)
+    return paths
+
+
+class Tablebase:
+    """Endgame tables, memory-mapped and probed in place.
+
+    Positions where one side has a king and a queen, rook or pawn against a bare king
+    are looked up instead of searched. Tables missing from the folder are skipped.
+
+    Attributes:
+        directory (str): Folder holding the ''<name>.tb'' files.
+        endings (tuple[str, ...]): Names of the endings found.
+    """
+    def __init__(self, directory: str) -> None:
+        """Map every table in a folder into memory.
+
+        Args:
+            directory (str): Folder holding the ''<name>.tb'' files.
+
+        Raises:
+            ValueError: If a table file has the wrong size.
+        """
+        self.directory = directory
+        self._maps: dict[int, mmap.mmap] = {}
+        for name, code in ENDINGS.items():
+            path = os.path.join(directory, f'{name}.tb')
+            if not os.path.exists(path):
+                continue
+            with open(path, 'rb') as f:
+                table = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            if len(table) != TABLE_SIZE:
+                table.close()
+                raise ValueError(f'{path} is not a {name} table')
+            self._maps[code] = table
+        self.endings = tuple(name for name, code in ENDINGS.items() if code in self._maps)
+
+    def __reduce__(self):
+        """Reopen the tables by folder, so they can be sent to worker processes.
+
+        Returns:
+            tuple: The class and the constructor arguments.
+        """
+        return type(self), (self.directory,)
+
+    def __enter__(self) -> 'Tablebase':
+        """Return the tablebase for use in a ''with'' block."""
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Unmap the tables when the ''with'' block ends."""
+        self.close()
+
+    def close(self) -> None:
+        """Unmap every table file."""
+        for table in self._maps.values():
+            table.close()
+        self._maps.clear()
+
+    def probe(self, model: ChessModel) -> tuple[int, int] | None:
+        """Look up the position on the board.
+
+        Args:
+            model (ChessModel): The game to look up.
+
+        Returns:
+            tuple[int, int] | None: ''WIN'', ''DRAW'' or ''LOSS'' for the side to move and the
+            distance to mate in plies, ''0'' for a draw, or ''None'' if no table covers the
+            material on the board.
+        """
+        pieces = {p: [(code, square) for code, squares in model._piece_index[p].items() for square in squares]
+                  for p in Player}
+        white, black = len(pieces[Player.WHITE]), len(pieces[Player.BLACK])
+        if white == black == 1:
+            return DRAW, 0
+        if sorted((white, black)) != [1, 2]:
+            return None
+        strong = Player.WHITE if white == 2 else Player.BLACK
+        found = {code: square for code, square in pieces[strong]}
+        code = next(code for code in found if code != KING)
+        table = self._maps.get(code)
+        if table is None or KING not in found:
+            return None
+
+        #the stronger side always plays white in the table, so black's squares are mirrored
+        flip = 0 if strong == Player.WHITE else 56
+        (weak_code, (row, col)), = pieces[strong.next()]
+        if weak_code != KING:
+            return None
+        squares = [(r * 8 + c) ^ flip for r, c in (found[KING], found[code], (row, col))]
+        stm = STRONG if model.current_player == strong else WEAK
+        value = table[table_index(stm, *squares)]
+        if not value:
+            return DRAW, 0
+        return (WIN if value % 2 == 0 else LOSS), value - 1
+
+    def best_move(self, model: ChessModel) -> Move | None:
+        """Pick the move that mates soonest when winning, resists longest when losing, and
+        keeps the draw otherwise.
+
+        Args:
+            model (ChessModel): The game, with the side to move to play.
+
+        Returns:
+            Move | None: The best move, or ''None'' if no table covers the position or no
+            move is legal.
+        """
+        if self.probe(model) is None:
+            return None
+        best, best_score = None, None
+        #promotions to a bishop or knight have no table and are skipped, a queen or rook
+        #always does at least as well
+        for move in model.legal_moves():
+            model._make_move(move)
+            try:
+                reply = self.probe(model)
+            finally:
+                model._unmake_move()
+            if reply is None:
+                continue
+            outcome, plies = reply
+            score = 0 if outcome == DRAW else -outcome * (MATE_SCORE - plies)
+            if best_score is None or score > best_score:
+                best, best_score = move, score
+        return best
+
+
+def main(argv=None) -> int:
+    """Generate or probe endgame tables from the command line.
+
+    Args:
+        argv (list[str] | None): Command line arguments, defaults to ''sys.argv''.
+
+    Returns:
+        int: Process exit status.
+    """
+    parser = argparse.ArgumentParser(description='Endgame tablebase tools.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('generate', help='solve every ending and write the tables')
+    build.add_argument('directory', help='folder to write the tables to')
+    probe = commands.add_parser('probe', help='look up a position')
+    probe.add_argument('directory', help='folder holding the tables')
+    probe.add_argument('fen', help='position to look up')
+    args = parser.parse_args(argv)
+
+    if args.command == 'generate':
+        for path in generate_all(args.directory):
+            print(f'wrote {path}')
+        return 0
+
+    model = ChessModel.from_fen(args.fen)
+    with Tablebase(args.directory) as tablebase:
+        result = tablebase.probe(model)
+        if result is None:
+            print('not in the tablebase')
+            return 1
+        outcome, plies = result
+        move = tablebase.best_move(model)
+        label = {WIN: f'win, mate in {plies} plies', DRAW: 'draw', LOSS: f'loss, mated in {plies} plies'}[outcome]
+        print(f'{label}, best move {move.uci() if move else "none"}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,192 @@
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+from chess_model import AI, ChessModel
+from player import Player
+
+#search settings each engine uses unless overridden, kept small so games finish quickly
+DEFAULT_ENGINE = {'max_depth': 2, 'time_limit': None, 'tt_size_mb': 1}
+
+#points for white and black by game result
+RESULT_POINTS = {'1-0': (1.0, 0.0), '0-1': (0.0, 1.0), '1/2-1/2': (0.5, 0.5)}
+
+
+def play_game(index: int, white: tuple[str, dict], black: tuple[str, dict], max_plies: int = 200,
+              random_plies: int = 0, seed: int = 0) -> dict:
+    """Play one headless game between two AI configurations.
+
+    Args:
+        index (int): Number of the game within its tournament.
+        white (tuple[str, dict]): Name of the white engine and its ''AI'' keyword arguments.
+        black (tuple[str, dict]): Name of the black engine and its ''AI'' keyword arguments.
+        max_plies (int): Plies after which the game is scored as a draw. Defaults to 200.
+        random_plies (int): Opening plies chosen at random so games differ. Defaults to 0.
+        seed (int): Seed for the random opening plies. Defaults to 0.
+
+    Returns:
+        dict: The game record with engines, result, termination, plies, moves in coordinate
+        notation and seconds spent on each move.
+    """
+    model = ChessModel(ai_player=None)
+    engines = {Player.WHITE: AI(model, Player.WHITE, **white[1]),
+               Player.BLACK: AI(model, Player.BLACK, **black[1])}
+    rng = random.Random(seed)
+    moves = []
+    move_seconds = []
+    result, termination = '1/2-1/2', 'move-limit'
+    seen = {model.zobrist_key: 1}
+
+    start = time.perf_counter()
+    while len(moves) < max_plies:
+        legal = model.legal_moves()
+        if not legal:
+            if model.in_check(model.current_player):
+                result = '0-1' if model.current_player == Player.WHITE else '1-0'
+                termination = 'checkmate'
+            else:
+                termination = 'stalemate'
+            break
+        #two bare kings can never mate
+        if sum(len(squares) for p in Player for squares in model._piece_index[p].values()) == 2:
+            termination = 'insufficient-material'
+            break
+
+        began = time.perf_counter()
+        if len(moves) < random_plies:
+            move = rng.choice(legal)
+        else:
+            move = engines[model.current_player].choose_move()
+        move_seconds.append(round(time.perf_counter() - began, 6))
+        model.move(move)
+        moves.append(move.uci())
+
+        key = model.zobrist_key
+        seen[key] = seen.get(key, 0) + 1
+        if seen[key] == 3:
+            termination = 'repetition'
+            break
+
+    return {'game': index, 'white': white[0], 'black': black[0], 'result': result,
+            'termination': termination, 'plies': len(moves), 'moves': moves,
+            'move_seconds': move_seconds, 'seconds': round(time.perf_counter() - start, 6)}
+
+
+def _play_game_task(task: tuple) -> dict:
+    """Unpack a pool task into ''play_game'' arguments.
+
+    Args:
+        task (tuple): Positional arguments for ''play_game''.
+
+    Returns:
+        dict: The game record.
+    """
+    return play_game(*task)
+
+
+def run_tournament(engines: dict[str, dict], games: int, workers: int | None = None,
+                   max_plies: int = 200, random_plies: int = 2, seed: int = 0):
+    """Play a match between two engines over a process pool.
+
+    The engines swap colours every game, and every game gets its own seed so the
+    random opening plies differ.
+
+    Args:
+        engines (dict[str, dict]): Exactly two engine names mapped to their ''AI'' keyword arguments.
+        games (int): Number of games to play.
+        workers (int | None): Worker processes, or ''None'' for one per CPU. Defaults to ''None''.
+        max_plies (int): Plies after which a game is scored as a draw. Defaults to 200.
+        random_plies (int): Opening plies chosen at random in every game. Defaults to 2.
+        seed (int): Base seed for the random opening plies. Defaults to 0.
+
+    Yields:
+        dict: Each game record as soon as its game finishes, in completion order.
+
+    Raises:
+        ValueError: If ''engines'' does not name exactly two engines.
+    """
+    if len(engines) != 2:
+        raise ValueError('a tournament needs exactly two engines')
+    first, second = engines.items()
+    tasks = []
+    for index in range(games):
+        white, black = (first, second) if index % 2 == 0 else (second, first)
+        tasks.append((index, white, black, max_plies, random_plies, seed + index))
+
+    with multiprocessing.Pool(workers) as pool:
+        yield from pool.imap_unordered(_play_game_task, tasks)
+
+
+def summarize(records: list[dict], seconds: float) -> dict:
+    """Aggregate game records into a score table.
+
+    Args:
+        records (list[dict]): Game records from ''play_game''.
+        seconds (float): Wall-clock time the tournament took.
+
+    Returns:
+        dict: Games played, games per second, and wins, draws, losses and points per engine.
+    """
+    table = {}
+    for record in records:
+        white_points, black_points = RESULT_POINTS[record['result']]
+        for name, points in ((record['white'], white_points), (record['black'], black_points)):
+            row = table.setdefault(name, {'wins': 0, 'draws': 0, 'losses': 0, 'points': 0.0})
+            row['points'] += points
+            row['wins' if points == 1.0 else 'draws' if points == 0.5 else 'losses'] += 1
+    return {'games': len(records), 'seconds': seconds,
+            'games_per_second': len(records) / seconds if seconds > 0 else 0.0, 'engines': table}
+
+
+def main(argv=None) -> int:
+    """Run a tournament from the command line.
+
+    Args:
+        argv (list[str] | None): Command line arguments, defaults to ''sys.argv''.
+
+    Returns:
+        int: Process exit status.
+    """
+    parser = argparse.ArgumentParser(description='Play AI configurations against each other.')
+    parser.add_argument('--games', type=int, default=10, help='number of games to play')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes, one per CPU by default')
+    parser.add_argument('--max-plies', type=int, default=200, help='plies before a game is scored as a draw')
+    parser.add_argument('--random-plies', type=int, default=2, help='random opening plies per game')
+    parser.add_argument('--seed', type=int, default=0, help='base seed for the random opening plies')
+    parser.add_argument('--engine-a', type=json.loads, default={}, help='JSON object of AI options for engine A')
+    parser.add_argument('--engine-b', type=json.loads, default={}, help='JSON object of AI options for engine B')
+    parser.add_argument('--output', default='-', help='JSONL file for game records, - for standard output')
+    args = parser.parse_args(argv)
+
+    engines = {'A': {**DEFAULT_ENGINE, **args.engine_a}, 'B': {**DEFAULT_ENGINE, **args.engine_b}}
+    out = sys.stdout if args.output == '-' else open(args.output, 'w')
+    #keep the summary apart from the records when they share standard output
+    report = sys.stderr if out is sys.stdout else sys.stdout
+
+    records = []
+    start = time.perf_counter()
+    try:
+        for record in run_tournament(engines, args.games, args.workers, args.max_plies,
+                                     args.random_plies, args.seed):
+            records.append(record)
+            out.write(json.dumps(record) + '\n')
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    summary = summarize(records, time.perf_counter() - start)
+    workers = args.workers or os.cpu_count()
+    print(f'{summary["games"]} games in {summary["seconds"]:.1f}s on {workers} workers '
+          f'({summary["games_per_second"]:.2f} games/s)', file=report)
+    print(f'{"engine":<8}{"wins":>6}{"draws":>7}{"losses":>8}{"points":>8}', file=report)
+    for name, row in sorted(summary['engines'].items()):
+        print(f'{name:<8}{row["wins"]:>6}{row["draws"]:>7}{row["losses"]:>8}{row["points"]:>8.1f}', file=report)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
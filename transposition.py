@@ -0,0 +1,94 @@
+from array import array
+
+#bound types stored with each score, 0 marks an empty slot
+EXACT = 1
+LOWER = 2
+UPPER = 3
+
+#each slot is two unsigned 64-bit words: the full position key and the packed data
+ENTRY_BYTES = 16
+
+#layout of the data word
+DEPTH_SHIFT = 16
+BOUND_SHIFT = 24
+AGE_SHIFT = 26
+SCORE_SHIFT = 32
+SCORE_OFFSET = 1 << 31
+AGE_MASK = 0x3F
+
+
+class TranspositionTable:
+    """Fixed size table of search results keyed by Zobrist hash.
+
+    Entries live in two preallocated ''array('Q')'' buffers, so the memory used is
+    set once by the megabyte budget and never grows. A slot is overwritten when it
+    is empty, holds the same position, was written by an older search, or was
+    searched to a depth no greater than the new result.
+
+    Attributes:
+        size (int): Number of slots, always a power of two.
+    """
+    def __init__(self, size_mb: float = 8) -> None:
+        """Allocate a table that fits within a memory budget.
+
+        Args:
+            size_mb (float): Memory budget in megabytes. Defaults to 8.
+        """
+        slots = max(1, int(size_mb * (1 << 20)) // ENTRY_BYTES)
+        self.size = 1 << (slots.bit_length() - 1)
+        self._mask = self.size - 1
+        self._keys = array('Q', bytes(8 * self.size))
+        self._data = array('Q', bytes(8 * self.size))
+        self._age = 0
+
+    def new_search(self) -> None:
+        """Start a new search so entries from earlier searches become replaceable."""
+        self._age = (self._age + 1) & AGE_MASK
+
+    def clear(self) -> None:
+        """Empty every slot without reallocating the buffers."""
+        empty = bytes(8 * self.size)
+        #writing through a byte view zeroes the arrays in place
+        memoryview(self._keys).cast('B')[:] = empty
+        memoryview(self._data).cast('B')[:] = empty
+
+    def probe(self, key: int) -> tuple[int, int, int, int] | None:
+        """Look up a position.
+
+        Args:
+            key (int): Zobrist key of the position.
+
+        Returns:
+            tuple[int, int, int, int] | None: ''(depth, score, bound, move)'' where ''move''
+            is the packed best move or ''0'', or ''None'' if the position is not stored.
+        """
+        slot = key & self._mask
+        if self._keys[slot] != key:
+            return None
+        data = self._data[slot]
+        if not data:
+            return None
+        return ((data >> DEPTH_SHIFT) & 0xFF,
+                (data >> SCORE_SHIFT) - SCORE_OFFSET,
+                (data >> BOUND_SHIFT) & 0x3,
+                data & 0xFFFF)
+
+    def store(self, key: int, depth: int, score: int, bound: int, move: int = 0) -> None:
+        """Record a search result, subject to the replacement policy.
+
+        Args:
+            key (int): Zobrist key of the position.
+            depth (int): Depth the position was searched to.
+            score (int): Score found for the side to move.
+            bound (int): One of ''EXACT'', ''LOWER'' or ''UPPER''.
+            move (int): Packed best move, or ''0'' if there is none.
+        """
+        slot = key & self._mask
+        old = self._data[slot]
+        if old and self._keys[slot] != key:
+            #keep deeper results from the current search
+            if (old >> AGE_SHIFT) & AGE_MASK == self._age and (old >> DEPTH_SHIFT) & 0xFF > depth:
+                return
+        self._keys[slot] = key
+        self._data[slot] = ((score + SCORE_OFFSET) << SCORE_SHIFT | self._age << AGE_SHIFT
+                            | bound << BOUND_SHIFT | min(depth, 0xFF) << DEPTH_SHIFT | move)
@@ -0,0 +1,48 @@
+import random
+from chess_piece import KING, PAWN, ChessPiece
+from player import Player
+
+#keys come from a fixed seed so the same position hashes the same way in every process
+_rng = random.Random(0x5A0B121)
+
+#pawns keep their double step while on their starting rank, so piece and square cover it
+PIECE_KEYS = {(player, code): tuple(_rng.getrandbits(64) for _ in range(64))
+              for player in Player for code in range(PAWN, KING + 1)}
+
+#toggled in whenever black is the side to move
+SIDE_KEY = _rng.getrandbits(64)
+
+
+def piece_key(piece: ChessPiece, row: int, col: int) -> int:
+    """Return the key contributed by a piece standing on a square.
+
+    Args:
+        piece (ChessPiece): The piece on the square.
+        row (int): Row index of the square.
+        col (int): Column index of the square.
+
+    Returns:
+        int: The 64-bit key, or ''0'' for pieces that are not standard chess pieces.
+    """
+    keys = PIECE_KEYS.get((piece.player, piece.code))
+    if keys is None:
+        return 0
+    return keys[row * 8 + col]
+
+
+def hash_board(board: list[list[ChessPiece | None]], player: Player) -> int:
+    """Compute the hash of a position from scratch.
+
+    Args:
+        board (list[list[ChessPiece | None]]): The board to hash.
+        player (Player): The side to move.
+
+    Returns:
+        int: The 64-bit Zobrist key of the position.
+    """
+    key = SIDE_KEY if player == Player.BLACK else 0
+    for row, pieces in enumerate(board):
+        for col, piece in enumerate(pieces):
+            if piece is not None:
+                key ^= piece_key(piece, row, col)
+    return key